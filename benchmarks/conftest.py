@@ -0,0 +1,94 @@
+import os
+import tracemalloc
+import uuid
+
+import pytest
+from Cryptodome.PublicKey import RSA
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from lti_store.cache import configuration_cache
+from lti_store.keys import generate_public_jwk, key_memo, parsed_key_cache
+from lti_store.models import ExternalLtiConfiguration, LTIVersion
+
+# Override with a comma-separated list, e.g. LTI_STORE_BENCHMARK_SIZES=10,1000
+SIZES = [
+    int(size)
+    for size in os.environ.get("LTI_STORE_BENCHMARK_SIZES", "10,1000,50000").split(",")
+]
+
+KEY_OBJ = RSA.generate(2048)
+PRIVATE_KEY = KEY_OBJ.export_key().decode()
+PUBLIC_KEY = KEY_OBJ.publickey().export_key().decode()
+PUBLIC_JWK = generate_public_jwk(PRIVATE_KEY, "kid")
+
+
+def build_configuration(index):
+    """Return an unsaved configuration, every other one being an LTI 1.3 tool."""
+    fields = {"name": f"Tool {index}", "slug": f"tool-{index}"}
+    if index % 2:
+        private_key_id = str(uuid.uuid4())
+        return ExternalLtiConfiguration(
+            **fields,
+            version=LTIVersion.LTI_1P3,
+            lti_1p3_client_id=str(uuid.uuid4()),
+            lti_1p3_private_key=PRIVATE_KEY,
+            lti_1p3_private_key_id=private_key_id,
+            lti_1p3_tool_public_key=PUBLIC_KEY,
+            lti_1p3_public_jwk={
+                "keys": [{**PUBLIC_JWK["keys"][0], "kid": private_key_id}]
+            },
+            lti_1p3_launch_url="https://tool.example.com/launch",
+            lti_1p3_oidc_url="https://tool.example.com/login",
+        )
+    return ExternalLtiConfiguration(
+        **fields,
+        version=LTIVersion.LTI_1P1,
+        lti_1p1_launch_url="https://tool.example.com/launch",
+        lti_1p1_client_key="key",
+        lti_1p1_client_secret="secret",
+    )
+
+
+def clear_caches():
+    cache.clear()
+    configuration_cache.reset()
+    key_memo.clear()
+    parsed_key_cache.clear()
+
+
+@pytest.fixture(params=SIZES, ids=lambda size: f"{size}-configs")
+def configurations(request, db):  # pylint: disable=unused-argument
+    """Seed the database with a mix of LTI 1.1 and 1.3 configurations."""
+    ExternalLtiConfiguration.objects.bulk_create(
+        (build_configuration(index) for index in range(request.param)),
+        batch_size=1000,
+    )
+    clear_caches()
+    yield request.param
+    clear_caches()
+
+
+@pytest.fixture
+def measure(benchmark):
+    """
+    Record the DB queries and the peak memory of one extra call of a benchmarked function.
+
+    Both are reported in the `extra_info` of the benchmark.
+    """
+
+    def _measure(func, setup=None):
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["queries"] = len(queries)
+        benchmark.extra_info["peak_memory_kib"] = round(peak / 1024, 1)
+
+    return _measure
@@ -0,0 +1,46 @@
+import pytest
+from Cryptodome.PublicKey import RSA
+
+from lti_store.models import ExternalLtiConfiguration
+
+from .conftest import clear_caches
+
+OTHER_PRIVATE_KEY = RSA.generate(2048).export_key().decode()
+
+
+@pytest.fixture
+def lti_1p3_config(configurations):
+    return ExternalLtiConfiguration.objects.get(slug="tool-1")
+
+
+def test_save_without_key_change(benchmark, measure, lti_1p3_config):
+    def run():
+        lti_1p3_config.description = "Updated description"
+        lti_1p3_config.save()
+
+    measure(run)
+    benchmark(run)
+
+
+def test_save_with_key_change(benchmark, measure, lti_1p3_config):
+    private_keys = [lti_1p3_config.lti_1p3_private_key, OTHER_PRIVATE_KEY]
+
+    def run():
+        private_keys.reverse()
+        lti_1p3_config.lti_1p3_private_key = private_keys[0]
+        lti_1p3_config.save()
+
+    measure(run, clear_caches)
+    benchmark.pedantic(run, setup=clear_caches, rounds=20)
+
+
+@pytest.mark.parametrize("memoized", [False, True], ids=["cold", "memoized"])
+def test_full_clean(benchmark, measure, lti_1p3_config, memoized):
+    def setup():
+        if not memoized:
+            clear_caches()
+
+    setup()
+    lti_1p3_config.full_clean()
+    measure(lti_1p3_config.full_clean, setup)
+    benchmark.pedantic(lti_1p3_config.full_clean, setup=setup, rounds=20)
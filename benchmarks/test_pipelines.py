@@ -0,0 +1,50 @@
+from unittest.mock import Mock
+
+import pytest
+
+from lti_store.apps import LtiStoreConfig as App
+from lti_store.pipelines import GetLtiConfigurations
+
+from .conftest import clear_caches
+
+FILTER_TYPE = "org.openedx.xblock.lti_consumer.configuration.listed.v1"
+
+
+@pytest.fixture
+def filter_step():
+    return GetLtiConfigurations(FILTER_TYPE, Mock("Pipeline"))
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["uncached", "cached"])
+def test_run_filter_single(benchmark, measure, filter_step, configurations, cached):
+    config_id = f"{App.name}:tool-{configurations // 2}"
+
+    def setup():
+        if not cached:
+            clear_caches()
+
+    def run():
+        return filter_step.run_filter({}, config_id, {})
+
+    setup()
+    run()
+    measure(run, setup)
+    benchmark.pedantic(run, setup=setup, rounds=50, warmup_rounds=1)
+
+
+@pytest.mark.parametrize("summary", [False, True], ids=["full", "summary"])
+@pytest.mark.parametrize("cached", [False, True], ids=["uncached", "cached"])
+def test_run_filter_listing(
+    benchmark, measure, filter_step, configurations, cached, summary
+):
+    def setup():
+        if not cached:
+            clear_caches()
+
+    def run():
+        return filter_step.run_filter({}, "", {}, summary=summary)
+
+    setup()
+    run()
+    measure(run, setup)
+    benchmark.pedantic(run, setup=setup, rounds=5 if configurations > 1000 else 20)
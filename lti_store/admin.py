@@ -1,17 +1,73 @@
+from django import forms
 from django.contrib import admin
 
-from .models import ExternalLtiConfiguration
+from .models import ExternalLtiConfiguration, ExternalLtiKeyMaterial
 from .apps import LtiStoreConfig as App
 
+# Key material fields edited along with the configuration, in form order.
+KEY_MATERIAL_FORM_FIELDS = [
+    "lti_1p3_private_key",
+    "lti_1p3_private_key_id",
+    "lti_1p3_tool_public_key",
+]
+
+
+class LtiConfigurationForm(forms.ModelForm):
+    """Configuration form, including the key material stored in its own table."""
+
+    class Meta:
+        model = ExternalLtiConfiguration
+        fields = "__all__"
+
+    lti_1p3_private_key = ExternalLtiKeyMaterial._meta.get_field(
+        "lti_1p3_private_key"
+    ).formfield()
+    lti_1p3_private_key_id = ExternalLtiKeyMaterial._meta.get_field(
+        "lti_1p3_private_key_id"
+    ).formfield()
+    lti_1p3_tool_public_key = ExternalLtiKeyMaterial._meta.get_field(
+        "lti_1p3_tool_public_key"
+    ).formfield()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            for name in KEY_MATERIAL_FORM_FIELDS:
+                self.initial.setdefault(name, getattr(self.instance, name))
+
+    def clean_lti_1p3_redirect_uris(self):
+        # The JSON form field cleans a blank value to None, which can't be stored.
+        redirect_uris = self.cleaned_data["lti_1p3_redirect_uris"]
+        return [] if redirect_uris is None else redirect_uris
+
+    def _post_clean(self):
+        # Set the key material before the instance is validated, so the model
+        # validators apply to it.
+        for name in KEY_MATERIAL_FORM_FIELDS:
+            if name in self.cleaned_data:
+                setattr(self.instance, name, self.cleaned_data[name])
+        super()._post_clean()
+
 
 class LtiConfigurationAdmin(admin.ModelAdmin):
+    form = LtiConfigurationForm
     list_display = ("id", "name", "version", "filter_key")
     list_filter = ("version",)
     prepopulated_fields = {"slug": ("name",)}
-    readonly_fields = ("lti_1p3_public_jwk",)
+    readonly_fields = ("lti_1p3_public_jwk", "created", "modified")
 
     def filter_key(self, obj):
         return f"{App.name}:{obj.slug}"
 
+    def get_fields(self, request, obj=None):
+        # Show the key material where it was before it moved to its own table.
+        fields = [
+            field
+            for field in super().get_fields(request, obj)
+            if field not in KEY_MATERIAL_FORM_FIELDS
+        ]
+        index = fields.index("lti_1p3_launch_url") + 1
+        return fields[:index] + KEY_MATERIAL_FORM_FIELDS + fields[index:]
+
 
 admin.site.register(ExternalLtiConfiguration, LtiConfigurationAdmin)
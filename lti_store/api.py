@@ -0,0 +1,320 @@
+"""
+Python API to resolve the configurations stored in the LTI store.
+"""
+
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from lti_store.apps import LtiStoreConfig
+from lti_store.cache import (
+    ALL_CONFIGURATIONS_KEY,
+    SUMMARIES_KEY,
+    configuration_cache,
+    configuration_key,
+)
+from lti_store.jwks import get_keyset_fetcher
+from lti_store.keys import parsed_key_cache
+from lti_store.models import (
+    ExternalLtiConfiguration,
+    LtiConfigurationTombstone,
+    LTIVersion,
+)
+from lti_store.payload import decode_payload
+from lti_store.records import ConfigurationRecord
+
+PLUGIN_PREFIX = LtiStoreConfig.name
+
+# Fields of the configuration summaries, enough to list the tools to pick from.
+SUMMARY_FIELDS = ("slug", "name", "version")
+
+# How far back the sync cursors go, so rows committed out of order aren't missed.
+DEFAULT_SYNC_OVERLAP = 5
+
+
+def parse_config_id(config_id):
+    """Return the slug of a `lti_store:<slug>` config ID, or None if it is malformed."""
+    _, separator, slug = config_id.partition(":")
+    if not separator or not slug:
+        return None
+    return slug
+
+
+def serialize_configuration(config):
+    """Return a configuration as a dict, including its key material."""
+    return config.serialize()
+
+
+def configuration_record(config):
+    """Return a configuration as the `ConfigurationRecord` cached and shared by the lookups."""
+    return ConfigurationRecord(serialize_configuration(config))
+
+
+def _decode_payloads(rows):
+    """
+    Return the records of `(pk, payload, payload_version)` rows, in order.
+
+    Rows with a stale payload (see `lti_store.payload`) are left as their pk,
+    to be replaced by `_hydrate_stale`.
+    """
+    version = ExternalLtiConfiguration.get_payload_version()
+    return [
+        (
+            ConfigurationRecord({"id": pk, **decode_payload(payload)})
+            if payload is not None and payload_version == version
+            else pk
+        )
+        for pk, payload, payload_version in rows
+    ]
+
+
+def _hydrate_stale(records, hydrated):
+    """Replace the pks left by `_decode_payloads` by their `hydrated` records."""
+    return [
+        hydrated[record] if isinstance(record, int) else record
+        for record in records
+        if not isinstance(record, int) or record in hydrated
+    ]
+
+
+def load_records(config_objs):
+    """
+    Return the records of the configurations of a queryset, in order.
+
+    Only their payload is read and decoded. The configurations with a stale
+    payload are loaded and serialized instead.
+    """
+    records = _decode_payloads(
+        config_objs.values_list("pk", "payload__data", "payload__version")
+    )
+    stale = [record for record in records if isinstance(record, int)]
+    if not stale:
+        return records
+    hydrated = ExternalLtiConfiguration.objects.with_key_material().filter(pk__in=stale)
+    return _hydrate_stale(records, {c.pk: configuration_record(c) for c in hydrated})
+
+
+async def aload_records(config_objs):
+    """Async version of `load_records`."""
+    rows = config_objs.values_list("pk", "payload__data", "payload__version")
+    records = _decode_payloads([row async for row in rows])
+    stale = [record for record in records if isinstance(record, int)]
+    if not stale:
+        return records
+    hydrated = ExternalLtiConfiguration.objects.with_key_material().filter(pk__in=stale)
+    return _hydrate_stale(
+        records, {c.pk: configuration_record(c) async for c in hydrated}
+    )
+
+
+def get_configuration(slug):
+    """
+    Return the serialized configuration with the given slug, or None if it doesn't exist.
+
+    Configurations are returned as read-only `ConfigurationRecord`s, shared by
+    every caller. Use `copy()` or `to_dict()` to get a copy to modify.
+    """
+
+    def load():
+        records = load_records(ExternalLtiConfiguration.objects.filter(slug=slug))
+        return records[0] if records else None
+
+    return configuration_cache.get(configuration_key(slug), load)
+
+
+async def aget_configuration(slug):
+    """Async version of `get_configuration`."""
+
+    async def load():
+        records = await aload_records(
+            ExternalLtiConfiguration.objects.filter(slug=slug)
+        )
+        return records[0] if records else None
+
+    return await configuration_cache.aget(configuration_key(slug), load)
+
+
+def get_all_configurations():
+    """Return the list of every serialized configuration."""
+
+    def load():
+        return load_records(ExternalLtiConfiguration.objects.order_by("pk"))
+
+    return configuration_cache.get(ALL_CONFIGURATIONS_KEY, load)
+
+
+async def aget_all_configurations():
+    """Async version of `get_all_configurations`."""
+
+    async def load():
+        return await aload_records(ExternalLtiConfiguration.objects.order_by("pk"))
+
+    return await configuration_cache.aget(ALL_CONFIGURATIONS_KEY, load)
+
+
+def get_configuration_summaries():
+    """
+    Return the list of every configuration summary.
+
+    Summaries only hold the `SUMMARY_FIELDS`, so listing the tools never loads
+    their keys, secrets or descriptions.
+    """
+
+    def load():
+        summaries = ExternalLtiConfiguration.objects.values(*SUMMARY_FIELDS)
+        return [ConfigurationRecord(summary) for summary in summaries]
+
+    return configuration_cache.get(SUMMARIES_KEY, load)
+
+
+async def aget_configuration_summaries():
+    """Async version of `get_configuration_summaries`."""
+
+    async def load():
+        summaries = ExternalLtiConfiguration.objects.values(*SUMMARY_FIELDS)
+        return [ConfigurationRecord(summary) async for summary in summaries]
+
+    return await configuration_cache.aget(SUMMARIES_KEY, load)
+
+
+def get_configurations(config_ids):
+    """
+    Resolve several `lti_store:<slug>` config IDs with a single query.
+
+    Returns a `(configurations, missing)` tuple, where `configurations` maps the
+    config IDs found to their serialized configuration, in input order, and
+    `missing` lists the config IDs that are malformed or don't exist.
+    """
+    config_ids = list(dict.fromkeys(config_ids))
+    keys = {}
+    slugs = {}
+    for config_id in config_ids:
+        slug = parse_config_id(config_id)
+        if slug is not None:
+            keys[config_id] = configuration_key(slug)
+            slugs[keys[config_id]] = slug
+
+    def load(missing_keys):
+        config_objs = ExternalLtiConfiguration.objects.filter(
+            slug__in=[slugs[key] for key in missing_keys]
+        )
+        return {
+            configuration_key(record["slug"]): record
+            for record in load_records(config_objs)
+        }
+
+    found = configuration_cache.get_many(keys.values(), load)
+
+    configurations = {}
+    missing = []
+    for config_id in config_ids:
+        serialized = found.get(keys.get(config_id))
+        if serialized is None:
+            missing.append(config_id)
+        else:
+            configurations[config_id] = serialized
+    return configurations, missing
+
+
+def parse_cursor(cursor):
+    """Return the datetime of a sync cursor, raising ValueError if it is malformed."""
+    if isinstance(cursor, datetime):
+        parsed = cursor
+    else:
+        parsed = parse_datetime(cursor) if isinstance(cursor, str) else None
+        if parsed is None:
+            raise ValueError(f"Invalid sync cursor: {cursor!r}")
+    if settings.USE_TZ and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def _get_change_queries(since):
+    """Return the `(cursor, configurations, tombstones)` of a sync since a cursor."""
+    overlap = getattr(settings, "LTI_STORE_SYNC_OVERLAP", DEFAULT_SYNC_OVERLAP)
+    # Taken before querying, so changes made meanwhile are returned next time.
+    cursor = (timezone.now() - timedelta(seconds=overlap)).isoformat()
+    config_objs = ExternalLtiConfiguration.objects.order_by("modified", "pk")
+    tombstones = LtiConfigurationTombstone.objects.none()
+    if since is not None:
+        since = parse_cursor(since)
+        config_objs = config_objs.changed_since(since)
+        tombstones = LtiConfigurationTombstone.objects.deleted_since(since)
+    return cursor, config_objs, tombstones.values_list("slug", flat=True)
+
+
+def get_changes(since=None, summary=False):
+    """
+    Return the configurations changed since a cursor, to sync copies of them.
+
+    Returns a dict holding the serialized `configurations` (or their summaries)
+    created or modified since `since`, the slugs `deleted` since then, and the
+    `cursor` to pass as `since` to get the next changes. Without `since`, every
+    configuration is returned.
+
+    Cursors overlap by `LTI_STORE_SYNC_OVERLAP` seconds, so a change may be
+    returned twice and must be applied idempotently. Changes are never cached.
+    """
+    cursor, config_objs, deleted = _get_change_queries(since)
+    if summary:
+        configurations = list(config_objs.values(*SUMMARY_FIELDS))
+    else:
+        configurations = load_records(config_objs)
+    return {
+        "configurations": configurations,
+        "deleted": list(deleted),
+        "cursor": cursor,
+    }
+
+
+async def aget_changes(since=None, summary=False):
+    """Async version of `get_changes`."""
+    cursor, config_objs, deleted = _get_change_queries(since)
+    if summary:
+        configurations = [c async for c in config_objs.values(*SUMMARY_FIELDS)]
+    else:
+        configurations = await aload_records(config_objs)
+    return {
+        "configurations": configurations,
+        "deleted": [slug async for slug in deleted],
+        "cursor": cursor,
+    }
+
+
+def get_platform_signing_key(slug):
+    """
+    Return the `RSAKey` used to sign the LTI 1.3 launches of a configuration.
+
+    Returns None if the configuration doesn't exist or has no private key.
+    """
+    config = get_configuration(slug)
+    if not config or config["version"] != LTIVersion.LTI_1P3:
+        return None
+    if not config["lti_1p3_private_key"]:
+        return None
+    kid = config["lti_1p3_private_key_id"]
+    return parsed_key_cache.get(
+        ("platform", kid), config["lti_1p3_private_key"], kid=kid
+    )
+
+
+def get_tool_public_key(slug, kid=None):
+    """
+    Return the `RSAKey` used to verify the messages sent by the tool of a configuration.
+
+    For tools publishing a keyset, the key with the given kid is looked up in the
+    cached keyset (see `lti_store.jwks`), which raises `KeysetError` if the keyset
+    can't be fetched. Returns None if the configuration doesn't exist or no key
+    is found.
+    """
+    config = get_configuration(slug)
+    if not config or config["version"] != LTIVersion.LTI_1P3:
+        return None
+    if config["lti_1p3_tool_public_key"]:
+        return parsed_key_cache.get(("tool", slug), config["lti_1p3_tool_public_key"])
+    if config["lti_1p3_tool_keyset_url"]:
+        return get_keyset_fetcher().get_key(config["lti_1p3_tool_keyset_url"], kid)
+    return None
@@ -1,7 +1,57 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
+
+log = logging.getLogger(__name__)
+
+WARM_UP_DISPATCH_UID = "lti_store.warm_up_on_first_request"
 
 
 class LtiStoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "lti_store"
-    plugin_app = {}
+    plugin_app = {
+        "url_config": {
+            "lms.djangoapp": {
+                "namespace": "lti_store",
+                "regex": r"^api/lti_store/",
+                "relative_path": "urls",
+            },
+        },
+    }
+
+    def ready(self):
+        # Connect the signal receivers.
+        from lti_store import signals  # noqa: F401
+
+        if getattr(settings, "LTI_STORE_WARM_UP_ON_STARTUP", False):
+            # Querying the database while the apps are being set up is discouraged,
+            # and management commands (e.g. migrate) don't serve configurations, so
+            # the cache is warmed up by the first request of the process instead.
+            request_started.connect(
+                self.warm_up_on_first_request, dispatch_uid=WARM_UP_DISPATCH_UID
+            )
+
+    def warm_up_on_first_request(self, **kwargs):  # pylint: disable=unused-argument
+        """Warm the configuration cache up, on the first request of the process only."""
+        # Only the request that disconnects the receiver warms the cache up.
+        if request_started.disconnect(dispatch_uid=WARM_UP_DISPATCH_UID):
+            self.warm_up_cache()
+
+    def warm_up_cache(self):
+        """Warm the configuration cache up, never failing the request."""
+        from lti_store.warmup import warm_up_cache
+
+        try:
+            result = warm_up_cache()
+        except Exception:  # pylint: disable=broad-except
+            # E.g. the migrations haven't run yet.
+            log.warning("Could not warm the LTI store cache up.", exc_info=True)
+            return
+        log.info(
+            "Warmed the LTI store cache up with %d configurations (complete: %s).",
+            result.configurations,
+            result.complete,
+        )
@@ -0,0 +1,493 @@
+"""
+Caching of serialized LTI configurations.
+
+Configurations are cached in two tiers: a small per-process LRU with a TTL,
+in front of a Django cache shared by every process. Keys in the shared tier
+are namespaced by a version that is replaced whenever a configuration is saved
+or deleted, so stale entries are simply never read again.
+
+This version is the store-wide generation of the configurations: every process
+compares it with the version its local tier was filled at, once per request (or
+every `LTI_STORE_GENERATION_CHECK_INTERVAL` seconds outside of requests), and
+clears its local tier when it moved. An edit made on one node is then visible
+on every node from their next request, instead of once the local TTL expires.
+
+On top of both tiers, everything resolved while handling a request is
+memoized until the request ends (see `lti_store.middleware`).
+
+Keys whose loader finds nothing, like the slugs of deleted configurations still
+referenced by some blocks, are cached as missing for a shorter time. Creating
+the configuration invalidates them like any other save.
+"""
+
+import contextvars
+import secrets
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+from lti_store.instrumentation import track_cache_miss
+
+ALL_CONFIGURATIONS_KEY = "all"
+ALL_JWKS_KEY = "jwks"
+SUMMARIES_KEY = "summaries"
+VERSION_KEY = "lti_store:version"
+
+DEFAULT_CACHE_ALIAS = "default"
+DEFAULT_CACHE_TIMEOUT = 300
+DEFAULT_LOCAL_CACHE_SIZE = 1024
+DEFAULT_LOCAL_CACHE_TTL = 60
+DEFAULT_NEGATIVE_CACHE_TTL = 30
+DEFAULT_GENERATION_CHECK_INTERVAL = 1
+
+MISSING = object()
+# Memoized once the local tier was revalidated during the current request.
+REVALIDATED = object()
+# Cached in both tiers for the keys the loader found nothing for.
+NOT_FOUND = "lti_store:not-found"
+
+_request_memo = contextvars.ContextVar("lti_store_request_memo", default=None)
+
+
+def configuration_key(slug):
+    """Return the cache key of a single configuration."""
+    return f"config:{slug}"
+
+
+def jwks_key(slug):
+    """Return the cache key of the public JWK keyset of a single configuration."""
+    return f"jwks:{slug}"
+
+
+def _new_version():
+    """
+    Return a version of the shared tier namespace that was never used before.
+
+    The version is replaced by a plain `set` instead of being incremented, since
+    `incr` isn't atomic on every cache backend (e.g. the file and database ones):
+    two concurrent invalidations could then leave it at the same number. Unique
+    versions always move, on any backend, including after being evicted.
+    """
+    return secrets.token_hex(16)
+
+
+@contextmanager
+def request_memo():
+    """
+    Memoize every value resolved by the configuration cache within this block.
+
+    The memo lives in a context variable, so it is private to the current thread
+    or asyncio task (and the sync/async hops of that task), and it is dropped as
+    soon as the block exits.
+    """
+    token = _request_memo.set({})
+    try:
+        yield
+    finally:
+        _request_memo.reset(token)
+
+
+class LocalLRUCache:
+    """Thread-safe LRU cache bounded in size, with a TTL on every entry."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store `value`, for `ttl` seconds if shorter than the TTL of the cache."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ConfigurationCache:
+    """
+    Two-tier cache of serialized LTI configurations.
+
+    Settings:
+
+        LTI_STORE_CACHE_ALIAS: Django cache used as the shared tier ("default").
+        LTI_STORE_CACHE_TIMEOUT: Timeout of the shared tier, in seconds (300).
+        LTI_STORE_LOCAL_CACHE_SIZE: Maximum number of entries in the local tier (1024).
+        LTI_STORE_LOCAL_CACHE_TTL: TTL of the local tier entries, in seconds (60).
+        LTI_STORE_NEGATIVE_CACHE_TTL: How long keys without a value are cached as
+            missing, in seconds (30). 0 disables the negative cache.
+        LTI_STORE_GENERATION_CHECK_INTERVAL: How often the local tier is revalidated
+            outside of requests, in seconds (1).
+    """
+
+    STAT_NAMES = ("request_hits", "local_hits", "shared_hits", "misses")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = None
+        self._generation = 0
+        # Shared version the local tier was filled at.
+        self._local_version = None
+        self._next_revalidation = 0
+        self._stats = dict.fromkeys(self.STAT_NAMES, 0)
+        self._negative_hits = Counter()
+
+    @property
+    def local(self):
+        if self._local is None:
+            self._local = LocalLRUCache(
+                max_size=getattr(
+                    settings, "LTI_STORE_LOCAL_CACHE_SIZE", DEFAULT_LOCAL_CACHE_SIZE
+                ),
+                ttl=getattr(
+                    settings, "LTI_STORE_LOCAL_CACHE_TTL", DEFAULT_LOCAL_CACHE_TTL
+                ),
+            )
+        return self._local
+
+    @property
+    def shared(self):
+        return caches[getattr(settings, "LTI_STORE_CACHE_ALIAS", DEFAULT_CACHE_ALIAS)]
+
+    @property
+    def timeout(self):
+        return getattr(settings, "LTI_STORE_CACHE_TIMEOUT", DEFAULT_CACHE_TIMEOUT)
+
+    @property
+    def negative_timeout(self):
+        return getattr(
+            settings, "LTI_STORE_NEGATIVE_CACHE_TTL", DEFAULT_NEGATIVE_CACHE_TTL
+        )
+
+    def get_version(self):
+        """Return the current version of the shared tier namespace."""
+        version = self.shared.get(VERSION_KEY)
+        if version is None:
+            self.shared.add(VERSION_KEY, _new_version(), timeout=None)
+            version = self.shared.get(VERSION_KEY)
+        return version
+
+    async def aget_version(self):
+        """Async version of `get_version`."""
+        version = await self.shared.aget(VERSION_KEY)
+        if version is None:
+            await self.shared.aadd(VERSION_KEY, _new_version(), timeout=None)
+            version = await self.shared.aget(VERSION_KEY)
+        return version
+
+    def revalidate(self, version=None):
+        """
+        Clear the local tier if the shared version moved since it was filled.
+
+        Costs a single get from the shared cache, unless `version` is given.
+        """
+        if version is None:
+            version = self.get_version()
+        self._set_local_version(version)
+
+    async def arevalidate(self):
+        """Async version of `revalidate`."""
+        self._set_local_version(await self.aget_version())
+
+    def _set_local_version(self, version):
+        with self._lock:
+            if version == self._local_version:
+                return
+            if self._local_version is not None:
+                # Values being loaded at the old version aren't stored locally.
+                self._generation += 1
+                self.local.clear()
+            self._local_version = version
+
+    def _is_revalidation_due(self):
+        """Return True once per request, or once per check interval outside of requests."""
+        memo = _request_memo.get()
+        if memo is not None:
+            if REVALIDATED in memo:
+                return False
+            memo[REVALIDATED] = True
+            return True
+
+        now = time.monotonic()
+        if now < self._next_revalidation:
+            return False
+        self._next_revalidation = now + getattr(
+            settings,
+            "LTI_STORE_GENERATION_CHECK_INTERVAL",
+            DEFAULT_GENERATION_CHECK_INTERVAL,
+        )
+        return True
+
+    def versioned_key(self, key, version=None):
+        if version is None:
+            version = self.get_version()
+        return f"lti_store:v{version}:{key}"
+
+    def get(self, key, loader):
+        """
+        Return the value cached under `key`, calling `loader` to fill the cache on a miss.
+
+        A None returned by `loader` is cached as missing for `LTI_STORE_NEGATIVE_CACHE_TTL`.
+        """
+        memo = _request_memo.get()
+        if memo is not None and key in memo:
+            self._count("request_hits")
+            return memo[key]
+
+        if self._is_revalidation_due():
+            self.revalidate()
+        value = self._get_from_tiers(key, loader)
+        if memo is not None:
+            memo[key] = value
+        return value
+
+    async def aget(self, key, loader):
+        """
+        Async version of `get`, `loader` being a coroutine function.
+
+        The local tier and the request memo are shared with `get`, and the shared
+        tier is accessed through the async API of the Django cache.
+        """
+        memo = _request_memo.get()
+        if memo is not None and key in memo:
+            self._count("request_hits")
+            return memo[key]
+
+        if self._is_revalidation_due():
+            await self.arevalidate()
+        value = await self._aget_from_tiers(key, loader)
+        if memo is not None:
+            memo[key] = value
+        return value
+
+    def get_many(self, keys, loader):
+        """
+        Return a dict of the values cached under `keys`.
+
+        `loader` is called once, with the list of keys missing from every tier,
+        and must return a dict of the values it found. Keys without a value are
+        left out of the result.
+        """
+        memo = _request_memo.get()
+        values = {}
+        pending = []
+        if self._is_revalidation_due():
+            self.revalidate()
+        for key in dict.fromkeys(keys):
+            if memo is not None and key in memo:
+                self._count("request_hits")
+                if memo[key] is not None:
+                    values[key] = memo[key]
+                continue
+            value = self.local.get(key, MISSING)
+            if value is MISSING:
+                pending.append(key)
+                continue
+            self._count("local_hits")
+            if self._found(key, value) is not None:
+                values[key] = value
+
+        if pending:
+            values.update(self._get_many_from_shared_tier(pending, loader))
+        if memo is not None:
+            memo.update({key: values.get(key) for key in keys})
+        return values
+
+    def fill(self, loader):
+        """
+        Store every value of the dict returned by `loader` in both tiers.
+
+        Used to warm the cache up. Values loaded while the cache is invalidated
+        are not stored in the current namespace. Returns the loaded dict.
+        """
+        generation = self._generation
+        version = self.get_version()
+        values = loader()
+        self.shared.set_many(
+            {self.versioned_key(key, version): value for key, value in values.items()},
+            timeout=self.timeout,
+        )
+        if generation == self._generation:
+            for key, value in values.items():
+                self.local.set(key, value)
+        return values
+
+    def _get_many_from_shared_tier(self, keys, loader):
+        generation = self._generation
+        version = self.get_version()
+        versioned_keys = {key: self.versioned_key(key, version) for key in keys}
+        cached = self.shared.get_many(list(versioned_keys.values()))
+        self._count("shared_hits", len(cached))
+
+        missing = [key for key in keys if versioned_keys[key] not in cached]
+        loaded = {}
+        if missing:
+            self._count("misses", len(missing))
+            loaded = loader(missing)
+            self.shared.set_many(
+                {versioned_keys[key]: value for key, value in loaded.items()},
+                timeout=self.timeout,
+            )
+            not_found = [key for key in missing if key not in loaded]
+            if not_found and self.negative_timeout > 0:
+                self.shared.set_many(
+                    {versioned_keys[key]: NOT_FOUND for key in not_found},
+                    timeout=self.negative_timeout,
+                )
+            loaded.update(dict.fromkeys(not_found, NOT_FOUND))
+
+        values = {}
+        for key in keys:
+            value = loaded[key] if key in loaded else cached[versioned_keys[key]]
+            self._set_local(generation, key, value)
+            if key in loaded:
+                if value != NOT_FOUND:
+                    values[key] = value
+            elif self._found(key, value) is not None:
+                values[key] = value
+        return values
+
+    def _get_from_tiers(self, key, loader):
+        value = self.local.get(key, MISSING)
+        if value is not MISSING:
+            self._count("local_hits")
+            return self._found(key, value)
+
+        generation = self._generation
+        versioned_key = self.versioned_key(key)
+        value = self.shared.get(versioned_key, MISSING)
+        if value is not MISSING:
+            self._count("shared_hits")
+        else:
+            self._count("misses")
+            value = loader()
+            self._store(generation, key, versioned_key, value)
+            return value
+
+        self._set_local(generation, key, value)
+        return self._found(key, value)
+
+    async def _aget_from_tiers(self, key, loader):
+        value = self.local.get(key, MISSING)
+        if value is not MISSING:
+            self._count("local_hits")
+            return self._found(key, value)
+
+        generation = self._generation
+        versioned_key = self.versioned_key(key, await self.aget_version())
+        value = await self.shared.aget(versioned_key, MISSING)
+        if value is not MISSING:
+            self._count("shared_hits")
+        else:
+            self._count("misses")
+            value = await loader()
+            if value is None:
+                if self.negative_timeout > 0:
+                    await self.shared.aset(
+                        versioned_key, NOT_FOUND, timeout=self.negative_timeout
+                    )
+            else:
+                await self.shared.aset(versioned_key, value, timeout=self.timeout)
+            self._set_local(generation, key, NOT_FOUND if value is None else value)
+            return value
+
+        self._set_local(generation, key, value)
+        return self._found(key, value)
+
+    def _store(self, generation, key, versioned_key, value):
+        """Store a loaded value in both tiers, None being cached as missing."""
+        if value is None:
+            if self.negative_timeout > 0:
+                self.shared.set(versioned_key, NOT_FOUND, timeout=self.negative_timeout)
+            value = NOT_FOUND
+        else:
+            self.shared.set(versioned_key, value, timeout=self.timeout)
+        self._set_local(generation, key, value)
+
+    def _set_local(self, generation, key, value):
+        # Don't fill the local tier with a value loaded before an invalidation.
+        if generation != self._generation:
+            return
+        if value == NOT_FOUND:
+            self.local.set(key, value, ttl=self.negative_timeout)
+        else:
+            self.local.set(key, value)
+
+    def _found(self, key, value):
+        """Return a cached value, or None for the keys cached as missing."""
+        if value != NOT_FOUND:
+            return value
+        with self._lock:
+            self._negative_hits[key] += 1
+        return None
+
+    def invalidate(self):
+        """Drop every cached configuration from both tiers and the request memo."""
+        memo = _request_memo.get()
+        if memo is not None:
+            memo.clear()
+        with self._lock:
+            self._generation += 1
+            self.local.clear()
+        self.shared.set(VERSION_KEY, _new_version(), timeout=None)
+
+    def stats(self):
+        """Return a copy of the hit and miss counters."""
+        with self._lock:
+            return dict(self._stats)
+
+    def negative_hits(self):
+        """
+        Return how many times each key was served as missing from the cache.
+
+        E.g. `{"config:deleted-tool": 12}` points to blocks still referencing
+        a configuration that doesn't exist.
+        """
+        with self._lock:
+            return dict(self._negative_hits)
+
+    def reset(self):
+        """Forget the local tier, the settings it was built with and the counters."""
+        with self._lock:
+            self._generation += 1
+            self._local = None
+            self._local_version = None
+            self._next_revalidation = 0
+            self._stats = dict.fromkeys(self.STAT_NAMES, 0)
+            self._negative_hits.clear()
+
+    def _count(self, stat, count=1):
+        with self._lock:
+            self._stats[stat] += count
+        if stat == "misses":
+            track_cache_miss(count)
+
+
+configuration_cache = ConfigurationCache()
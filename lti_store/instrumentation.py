@@ -0,0 +1,210 @@
+"""
+Instrumentation of the configuration lookups.
+
+Every call of the pipeline step produces a `Measurement`, handed over to the
+instrumentation configured with the `LTI_STORE_INSTRUMENTATION` setting: the
+dotted path of a callable returning an `Instrumentation`. Without it, nothing
+is measured at all.
+
+Example usage, with a statsd or OpenTelemetry client wrapped in an exporter
+providing `increment(name, value, tags)` and `histogram(name, value, tags)`:
+
+    def lti_store_instrumentation():
+        return MetricsInstrumentation(MyExporter())
+
+    LTI_STORE_INSTRUMENTATION = "myproject.metrics.lti_store_instrumentation"
+"""
+
+import contextvars
+import time
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+MODE_SINGLE = "single"
+MODE_LIST = "list"
+MODE_SUMMARY = "summary"
+MODE_SYNC = "sync"
+
+_current_tracker = contextvars.ContextVar("lti_store_lookup_tracker", default=None)
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """Measurements of one configuration lookup."""
+
+    mode: str
+    count: int
+    queries: int
+    cache_hit: bool
+    duration: float
+
+
+class Instrumentation:
+    """No-op instrumentation, the base of every other one."""
+
+    enabled = False
+
+    def record(self, measurement):
+        """Handle the measurement of a lookup."""
+
+
+class MetricsInstrumentation(Instrumentation):
+    """
+    Report measurements to a metrics exporter.
+
+    The exporter must provide `increment(name, value, tags)` and
+    `histogram(name, value, tags)`, `tags` being a dict. Durations are
+    reported in milliseconds.
+    """
+
+    enabled = True
+
+    def __init__(self, exporter, prefix="lti_store.lookup"):
+        self.exporter = exporter
+        self.prefix = prefix
+
+    def record(self, measurement):
+        tags = {
+            "mode": measurement.mode,
+            "cache": "hit" if measurement.cache_hit else "miss",
+        }
+        self.exporter.increment(f"{self.prefix}.calls", 1, tags)
+        self.exporter.histogram(
+            f"{self.prefix}.configurations", measurement.count, tags
+        )
+        self.exporter.histogram(f"{self.prefix}.queries", measurement.queries, tags)
+        self.exporter.histogram(
+            f"{self.prefix}.duration", measurement.duration * 1000, tags
+        )
+
+
+class InMemoryExporter:
+    """Metrics exporter keeping every reported value in memory, for tests and debugging."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def increment(self, name, value=1, tags=None):
+        self.metrics.append(("increment", name, value, tags or {}))
+
+    def histogram(self, name, value, tags=None):
+        self.metrics.append(("histogram", name, value, tags or {}))
+
+    def values(self, name):
+        """Return every value reported for a metric."""
+        return [value for _, metric, value, _ in self.metrics if metric == name]
+
+
+_NOOP_INSTRUMENTATION = Instrumentation()
+_instrumentations = {}
+
+
+def get_instrumentation():
+    """Return the instrumentation configured with `LTI_STORE_INSTRUMENTATION`."""
+    path = getattr(settings, "LTI_STORE_INSTRUMENTATION", None)
+    if not path:
+        return _NOOP_INSTRUMENTATION
+    if path not in _instrumentations:
+        _instrumentations[path] = import_string(path)()
+    return _instrumentations[path]
+
+
+class _Tracker:
+    """Collect the events of the lookup in progress."""
+
+    def __init__(self):
+        self.count = 0
+        self.queries = 0
+        self.cache_misses = 0
+
+    def count_query(self, execute, sql, params, many, context):
+        # The connections of a thread can be shared by the async lookups running
+        # at the same time: only count the queries of this lookup.
+        if _current_tracker.get() is self:
+            self.queries += 1
+        return execute(sql, params, many, context)
+
+    def track_queries(self):
+        """Count the queries made through the connections of the current thread."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self.count_query))
+        return stack
+
+
+def track_cache_miss(count=1):
+    """Record cache misses for the lookup in progress, if any."""
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        tracker.cache_misses += count
+
+
+@contextmanager
+def measure_lookup(mode):
+    """
+    Measure a lookup of configurations.
+
+    The body must set the `count` attribute of the yielded tracker to the number
+    of configurations returned. Lookups raising an exception are not recorded.
+    """
+    instrumentation = get_instrumentation()
+    tracker = _Tracker()
+    if not instrumentation.enabled:
+        yield tracker
+        return
+
+    token = _current_tracker.set(tracker)
+    started = time.perf_counter()
+    try:
+        with tracker.track_queries():
+            yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+    _record(instrumentation, mode, tracker, started)
+
+
+@asynccontextmanager
+async def ameasure_lookup(mode):
+    """
+    Async version of `measure_lookup`.
+
+    The async ORM runs the queries in the thread-sensitive thread of the request,
+    whose connections differ from the ones of the event loop thread, so the
+    queries are counted from that thread.
+    """
+    instrumentation = get_instrumentation()
+    tracker = _Tracker()
+    if not instrumentation.enabled:
+        yield tracker
+        return
+
+    token = _current_tracker.set(tracker)
+    started = time.perf_counter()
+    try:
+        queries = await sync_to_async(tracker.track_queries)()
+        try:
+            yield tracker
+        finally:
+            await sync_to_async(queries.close)()
+    finally:
+        _current_tracker.reset(token)
+
+    _record(instrumentation, mode, tracker, started)
+
+
+def _record(instrumentation, mode, tracker, started):
+    instrumentation.record(
+        Measurement(
+            mode=mode,
+            count=tracker.count,
+            queries=tracker.queries,
+            cache_hit=tracker.cache_misses == 0,
+            duration=time.perf_counter() - started,
+        )
+    )
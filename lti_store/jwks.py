@@ -0,0 +1,286 @@
+"""
+Fetching of the JWKS published by LTI 1.3 tools.
+
+Tools configured with `lti_1p3_tool_keyset_url` publish their public keys as a
+JWKS. Keysets are cached per process following the Cache-Control headers of
+the tool: fresh keysets are served from memory, stale ones are served while
+being refreshed in the background (stale-while-revalidate), and expired ones
+are revalidated with conditional requests. Concurrent fetches of the same URL
+are deduplicated, so only one request per URL is in flight at any time.
+"""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from jwkest import JWKESTException
+from jwkest.jwk import KEYS
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 5
+DEFAULT_MAX_AGE = 300
+DEFAULT_STALE_WHILE_REVALIDATE = 3600
+DEFAULT_MIN_REFRESH_INTERVAL = 60
+DEFAULT_POOL_SIZE = 10
+
+CACHE_CONTROL_DIRECTIVE = re.compile(r"\s*([\w-]+)\s*(?:=\s*\"?(\d+)\"?)?\s*")
+
+
+class KeysetError(Exception):
+    """Raised when a keyset can't be fetched or parsed."""
+
+
+def parse_cache_control(header):
+    """Return the directives of a Cache-Control header as a dict, with None for flags."""
+    directives = {}
+    for directive in (header or "").split(","):
+        match = CACHE_CONTROL_DIRECTIVE.fullmatch(directive)
+        if match:
+            name, value = match.groups()
+            directives[name.lower()] = int(value) if value is not None else None
+    return directives
+
+
+class Keyset:
+    """Keys of a JWKS indexed by kid, along with the HTTP caching metadata."""
+
+    def __init__(self, keys, etag=None, last_modified=None):
+        self.keys = {key.kid: key for key in keys}
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = 0
+        self.fresh_until = 0
+        self.stale_until = 0
+
+    def get_key(self, kid=None):
+        """Return the key with the given kid, or the only key of the keyset if kid is None."""
+        if kid is None and len(self.keys) == 1:
+            return next(iter(self.keys.values()))
+        return self.keys.get(kid)
+
+
+class _Flight:
+    """A fetch in progress, awaited by every concurrent caller."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.keyset = None
+        self.error = None
+
+
+class KeysetFetcher:
+    """
+    Fetch and cache tool keysets.
+
+    Arguments:
+        timeout: Timeout of the HTTP requests, in seconds.
+        default_max_age: How long a keyset is fresh when the tool sends no max-age.
+        stale_while_revalidate: How long a stale keyset may be served while it is
+            refreshed in the background, when the tool doesn't send this directive.
+        min_refresh_interval: Minimum time between two refreshes triggered by an
+            unknown kid, so forged kids can't be used to flood the tool.
+        pool_size: Maximum number of pooled connections per host.
+    """
+
+    def __init__(
+        self,
+        timeout=DEFAULT_TIMEOUT,
+        default_max_age=DEFAULT_MAX_AGE,
+        stale_while_revalidate=DEFAULT_STALE_WHILE_REVALIDATE,
+        min_refresh_interval=DEFAULT_MIN_REFRESH_INTERVAL,
+        pool_size=DEFAULT_POOL_SIZE,
+    ):
+        self.timeout = timeout
+        self.default_max_age = default_max_age
+        self.stale_while_revalidate = stale_while_revalidate
+        self.min_refresh_interval = min_refresh_interval
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._keysets = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="lti_store_jwks"
+        )
+
+    def get_keyset(self, url):
+        """Return the keyset published at `url`, raising KeysetError if it can't be fetched."""
+        keyset = self._keysets.get(url)
+        now = time.monotonic()
+        if keyset is not None and now < keyset.fresh_until:
+            return keyset
+        if keyset is not None and now < keyset.stale_until:
+            self.refresh_in_background(url)
+            return keyset
+        return self.refresh(url)
+
+    def get_key(self, url, kid=None):
+        """
+        Return the key with the given kid from the keyset published at `url`.
+
+        An unknown kid triggers a refresh, as the tool may have rotated its keys,
+        unless the keyset was fetched less than `min_refresh_interval` ago.
+        Returns None if the key can't be found.
+        """
+        keyset = self.get_keyset(url)
+        key = keyset.get_key(kid)
+        if (
+            key is None
+            and time.monotonic() - keyset.fetched_at >= self.min_refresh_interval
+        ):
+            key = self.refresh(url).get_key(kid)
+        return key
+
+    def refresh(self, url):
+        """Fetch the keyset now, or wait for the fetch already in progress."""
+        with self._lock:
+            flight = self._flights.get(url)
+            leader = flight is None
+            if leader:
+                flight = self._flights[url] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+        else:
+            self._fly(url, flight)
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.keyset
+
+    def refresh_in_background(self, url):
+        """Refresh the keyset in a worker thread, unless a fetch is already in progress."""
+        with self._lock:
+            if url in self._flights:
+                return None
+            # Registered before submitting, so a burst of callers queues a single fetch.
+            flight = self._flights[url] = _Flight()
+        try:
+            return self._executor.submit(self._fly_quietly, url, flight)
+        except RuntimeError:
+            with self._lock:
+                del self._flights[url]
+            flight.done.set()
+            raise
+
+    def clear(self):
+        with self._lock:
+            self._keysets.clear()
+
+    def _fly(self, url, flight):
+        """Fetch the keyset of a registered flight, and land it."""
+        try:
+            flight.keyset = self._fetch(url)
+        except KeysetError as exc:
+            flight.error = exc
+        finally:
+            with self._lock:
+                del self._flights[url]
+            flight.done.set()
+
+    def _fly_quietly(self, url, flight):
+        self._fly(url, flight)
+        if flight.error is not None:
+            log.error(
+                "Background refresh of the keyset %s failed: %s", url, flight.error
+            )
+
+    def _fetch(self, url):
+        previous = self._keysets.get(url)
+        headers = {}
+        if previous is not None and previous.etag:
+            headers["If-None-Match"] = previous.etag
+        if previous is not None and previous.last_modified:
+            headers["If-Modified-Since"] = previous.last_modified
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304 and previous is not None:
+                keyset = previous
+            else:
+                response.raise_for_status()
+                keys = KEYS()
+                keys.load_jwks(response.text)
+                keyset = Keyset(
+                    keys,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
+        except (
+            requests.RequestException,
+            JWKESTException,
+            ValueError,
+            KeyError,
+            TypeError,
+        ) as exc:
+            if previous is not None:
+                # Keep serving the last known keys rather than failing every launch,
+                # and back off before trying to fetch them again.
+                log.warning(
+                    "Failed to fetch the keyset %s, serving stale keys: %s", url, exc
+                )
+                previous.fresh_until = time.monotonic() + self.min_refresh_interval
+                return previous
+            raise KeysetError(f"Failed to fetch the keyset {url}: {exc}") from exc
+
+        self._update_freshness(keyset, response.headers.get("Cache-Control"))
+        with self._lock:
+            self._keysets[url] = keyset
+        return keyset
+
+    def _update_freshness(self, keyset, cache_control):
+        directives = parse_cache_control(cache_control)
+        if "no-store" in directives or "no-cache" in directives:
+            max_age = 0
+        else:
+            max_age = directives.get("max-age")
+            if max_age is None:
+                max_age = self.default_max_age
+        stale_while_revalidate = directives.get("stale-while-revalidate")
+        if stale_while_revalidate is None:
+            stale_while_revalidate = self.stale_while_revalidate
+
+        keyset.fetched_at = time.monotonic()
+        keyset.fresh_until = keyset.fetched_at + max_age
+        keyset.stale_until = keyset.fresh_until + stale_while_revalidate
+
+
+_keyset_fetcher = None
+_keyset_fetcher_lock = threading.Lock()
+
+
+def get_keyset_fetcher():
+    """
+    Return the keyset fetcher of the process, built from the settings.
+
+    Settings:
+
+        LTI_STORE_KEYSET_TIMEOUT: Timeout of the HTTP requests, in seconds (5).
+        LTI_STORE_KEYSET_MAX_AGE: Default freshness of a keyset, in seconds (300).
+        LTI_STORE_KEYSET_STALE_WHILE_REVALIDATE: Default stale window, in seconds (3600).
+    """
+    global _keyset_fetcher  # pylint: disable=global-statement
+    with _keyset_fetcher_lock:
+        if _keyset_fetcher is None:
+            _keyset_fetcher = KeysetFetcher(
+                timeout=getattr(settings, "LTI_STORE_KEYSET_TIMEOUT", DEFAULT_TIMEOUT),
+                default_max_age=getattr(
+                    settings, "LTI_STORE_KEYSET_MAX_AGE", DEFAULT_MAX_AGE
+                ),
+                stale_while_revalidate=getattr(
+                    settings,
+                    "LTI_STORE_KEYSET_STALE_WHILE_REVALIDATE",
+                    DEFAULT_STALE_WHILE_REVALIDATE,
+                ),
+            )
+        return _keyset_fetcher
@@ -0,0 +1,153 @@
+"""
+Parsing of the RSA keys stored in the LTI store.
+
+Parsing a PEM is expensive, and the same keys are validated by `full_clean()`
+and parsed again by `save()`. Parsed keys are memoized by a hash of their
+content, so each PEM is parsed at most once per process. The jwkest keys used
+to sign and verify launches are cached on top of them.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from Cryptodome.PublicKey import RSA
+from jwkest import jwk
+from jwkest.jwk import RSAKey
+
+DEFAULT_KEY_MEMO_SIZE = 256
+PRIVATE_KEY_SIZE = 2048
+
+
+class KeyMemo:
+    """Thread-safe LRU of parsed RSA keys, keyed by the SHA-256 of their PEM."""
+
+    def __init__(self, max_size=DEFAULT_KEY_MEMO_SIZE):
+        self.max_size = max_size
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def import_key(self, pem):
+        """Return the parsed key, raising ValueError if the PEM is invalid."""
+        digest = hashlib.sha256(pem.encode() if isinstance(pem, str) else pem).digest()
+        with self._lock:
+            key = self._keys.get(digest)
+            if key is not None:
+                self._keys.move_to_end(digest)
+                return key
+
+        key = RSA.import_key(pem)
+        with self._lock:
+            self._keys[digest] = key
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+        return key
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+
+key_memo = KeyMemo()
+
+
+def import_rsa_key(pem):
+    """Parse a PEM encoded RSA key, at most once per process."""
+    return key_memo.import_key(pem)
+
+
+def generate_private_key():
+    """Generate a new PEM encoded RSA private key for the platform."""
+    return RSA.generate(PRIVATE_KEY_SIZE).export_key().decode()
+
+
+def generate_public_jwk(private_key, kid):
+    """Return the public JWK keyset of a PEM encoded private key."""
+    return generate_public_jwks([(private_key, kid)])
+
+
+def generate_public_jwks(private_keys):
+    """Return the public JWK keyset of `(private_key, kid)` pairs of PEM encoded private keys."""
+    public_keys = jwk.KEYS()
+    for private_key, kid in private_keys:
+        public_keys.append(RSAKey(kid=kid, key=import_rsa_key(private_key)))
+    return json.loads(public_keys.dump_jwks())
+
+
+def serialize_jwks(jwks):
+    """Serialize a JWK keyset to canonical JSON bytes."""
+    return json.dumps(jwks, sort_keys=True, separators=(",", ":")).encode()
+
+
+def jwks_etag(jwks):
+    """Return the strong ETag value of a JWK keyset, without quotes."""
+    return hashlib.sha256(serialize_jwks(jwks)).hexdigest()
+
+
+def prepare_key_material(private_key, private_key_id, tool_public_key):
+    """
+    Validate the RSA keys of a configuration and generate its public JWK.
+
+    Returns a `(public_jwk, invalid_fields)` tuple, `public_jwk` being None when
+    there is no valid private key. This only depends on the crypto libraries,
+    so it can be run in worker processes.
+    """
+    invalid_fields = []
+    for field, pem in (
+        ("lti_1p3_private_key", private_key),
+        ("lti_1p3_tool_public_key", tool_public_key),
+    ):
+        if pem:
+            try:
+                import_rsa_key(pem)
+            except ValueError:
+                invalid_fields.append(field)
+
+    public_jwk = None
+    if private_key and "lti_1p3_private_key" not in invalid_fields:
+        public_jwk = generate_public_jwk(private_key, private_key_id)
+    return public_jwk, invalid_fields
+
+
+class ParsedKeyCache:
+    """
+    Thread-safe LRU of jwkest `RSAKey` objects built from a PEM.
+
+    Every entry remembers the PEM it was built from, so a key changed in another
+    process is rebuilt instead of being served stale.
+    """
+
+    def __init__(self, max_size=DEFAULT_KEY_MEMO_SIZE):
+        self.max_size = max_size
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def get(self, cache_key, pem, kid=None):
+        """Return the `RSAKey` of `pem`, raising ValueError if the PEM is invalid."""
+        with self._lock:
+            entry = self._keys.get(cache_key)
+            if entry is not None and entry[0] == pem:
+                self._keys.move_to_end(cache_key)
+                return entry[1]
+
+        key = RSAKey(kid=kid, key=import_rsa_key(pem))
+        with self._lock:
+            self._keys[cache_key] = (pem, key)
+            self._keys.move_to_end(cache_key)
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+        return key
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+
+parsed_key_cache = ParsedKeyCache()
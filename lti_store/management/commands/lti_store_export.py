@@ -0,0 +1,55 @@
+"""
+Export LTI configurations as JSON Lines.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from lti_store.api import serialize_configuration
+from lti_store.models import ExternalLtiConfiguration
+
+
+class Command(BaseCommand):
+    """
+    Stream every LTI configuration as one JSON object per line.
+
+    Example usage:
+
+        python manage.py lti_store_export --output configurations.jsonl
+    """
+
+    help = "Export LTI configurations as JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="Path of the file to write, or - for the standard output (default).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of configurations fetched from the database at once.",
+        )
+
+    def handle(self, *args, **options):
+        if options["output"] == "-":
+            self.export(self.stdout, options["batch_size"])
+        else:
+            with open(options["output"], "w", encoding="utf-8") as output:
+                count = self.export(output, options["batch_size"])
+            self.stderr.write(f"Exported {count} configurations.")
+
+    def export(self, output, batch_size):
+        count = 0
+        config_objs = ExternalLtiConfiguration.objects.with_key_material().order_by(
+            "pk"
+        )
+        for config in config_objs.iterator(chunk_size=batch_size):
+            record = serialize_configuration(config)
+            del record["id"]
+            output.write(json.dumps(record) + "\n")
+            count += 1
+        return count
@@ -0,0 +1,47 @@
+"""
+Fill the pool of pre-generated platform private keys.
+"""
+
+import os
+
+from django.core.management.base import BaseCommand
+
+from lti_store.models import PregeneratedRsaKey
+
+
+class Command(BaseCommand):
+    """
+    Generate platform private keys until the key pool is full.
+
+    Run it periodically (e.g. from cron) so creating LTI 1.3 configurations
+    without a private key never has to generate one on the spot.
+
+    Example usage:
+
+        python manage.py lti_store_fill_key_pool --size 100
+    """
+
+    help = "Fill the pool of pre-generated platform private keys."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=None,
+            help="Number of keys to fill the pool to (default: LTI_STORE_KEY_POOL_SIZE).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of processes generating keys, 0 to generate them in-process.",
+        )
+
+    def handle(self, *args, **options):
+        generated = PregeneratedRsaKey.objects.refill(
+            size=options["size"], workers=options["workers"]
+        )
+        self.stdout.write(
+            f"Generated {generated} keys, the pool holds "
+            f"{PregeneratedRsaKey.objects.count()} keys."
+        )
@@ -0,0 +1,312 @@
+"""
+Import LTI configurations from JSON Lines.
+"""
+
+import json
+import os
+import sys
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from lti_store.keys import (
+    generate_public_jwk,
+    generate_public_jwks,
+    jwks_etag,
+    prepare_key_material,
+)
+from lti_store.models import (
+    KEY_MATERIAL_FIELDS,
+    MESSAGES,
+    ExternalLtiConfiguration,
+    ExternalLtiKeyMaterial,
+    LTIVersion,
+    PregeneratedRsaKey,
+)
+from lti_store.signals import invalidate_configuration_cache
+
+KEY_FIELDS = ["lti_1p3_private_key", "lti_1p3_tool_public_key"]
+
+
+class Command(BaseCommand):
+    """
+    Create or update LTI configurations from JSON Lines, one configuration per line.
+
+    Configurations are matched by slug: existing ones are updated, the others are
+    created. RSA keys are validated and public JWKs generated in a process pool,
+    then every batch is written with `bulk_create`/`bulk_update`. Invalid lines
+    are reported and skipped.
+
+    Example usage:
+
+        python manage.py lti_store_import configurations.jsonl --batch-size 1000
+    """
+
+    help = "Import LTI configurations from JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "input", help="Path of the file to read, or - for the standard input."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of configurations written to the database at once.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of processes validating the keys, 0 to validate them in-process.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be a positive number.")
+
+        self.created = self.updated = self.skipped = 0
+        executor = None
+        if options["workers"] > 0:
+            executor = ProcessPoolExecutor(max_workers=options["workers"])
+
+        try:
+            if options["input"] == "-":
+                self.import_lines(sys.stdin, options["batch_size"], executor)
+            else:
+                with open(options["input"], encoding="utf-8") as lines:
+                    self.import_lines(lines, options["batch_size"], executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            # Bulk operations don't send model signals.
+            invalidate_configuration_cache(sender=ExternalLtiConfiguration)
+
+        self.stdout.write(
+            f"Created {self.created}, updated {self.updated}, skipped {self.skipped} configurations."
+        )
+
+    def import_lines(self, lines, batch_size, executor):
+        numbered_lines = (
+            (number, line) for number, line in enumerate(lines, 1) if line.strip()
+        )
+        while batch := list(islice(numbered_lines, batch_size)):
+            records = []
+            for number, line in batch:
+                try:
+                    records.append((number, self.parse_record(line)))
+                except ValueError as exc:
+                    self.skip(number, exc)
+
+            key_material = self.map_keys(
+                executor,
+                prepare_key_material,
+                *[
+                    [record.get(field, "") for _, record in records]
+                    for field in (
+                        "lti_1p3_private_key",
+                        "lti_1p3_private_key_id",
+                        "lti_1p3_tool_public_key",
+                    )
+                ],
+            )
+
+            configs = {}
+            for (number, record), (public_jwk, invalid_fields) in zip(
+                records, key_material
+            ):
+                try:
+                    config = self.build_config(record, public_jwk, invalid_fields)
+                except ValidationError as exc:
+                    self.skip(number, exc.message_dict)
+                    continue
+                # The last occurrence of a slug wins, like it does across batches.
+                configs[config.slug] = (number, config)
+
+            configs = self.check_names(configs.values())
+            self.take_private_keys(configs, executor)
+            self.write_batch(configs)
+
+    @staticmethod
+    def map_keys(executor, function, *arguments):
+        """Map a function of `lti_store.keys` over its arguments, in the workers if any."""
+        # `lti_store.keys` doesn't depend on Django, so the workers don't need to
+        # set it up, whatever the multiprocessing start method.
+        if executor is not None:
+            return executor.map(function, *arguments)
+        return map(function, *arguments)
+
+    def parse_record(self, line):
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("Should be a JSON object.")
+        record.pop("id", None)
+        for field in record:
+            if field in KEY_MATERIAL_FIELDS:
+                continue
+            try:
+                ExternalLtiConfiguration._meta.get_field(field)
+            except FieldDoesNotExist as exc:
+                raise ValueError(f"Unknown field {field!r}.") from exc
+
+        # Exports made before the redirect URIs were a JSON field hold a JSON string.
+        redirect_uris = record.get("lti_1p3_redirect_uris")
+        if isinstance(redirect_uris, str):
+            record["lti_1p3_redirect_uris"] = (
+                json.loads(redirect_uris) if redirect_uris.strip() else []
+            )
+
+        # Generate the IDs missing from LTI 1.3 configurations, like `save()` does.
+        if record.get("version") == LTIVersion.LTI_1P3:
+            for field in ("lti_1p3_client_id", "lti_1p3_private_key_id"):
+                if not record.get(field):
+                    record[field] = str(uuid.uuid4())
+        return record
+
+    def build_config(self, record, public_jwk, invalid_fields):
+        config = ExternalLtiConfiguration(**record)
+        errors = {field: [MESSAGES["invalid_rsa_key"]] for field in invalid_fields}
+        try:
+            # The keys were already validated by the workers.
+            config.full_clean(exclude=KEY_FIELDS, validate_unique=False)
+        except ValidationError as exc:
+            errors.update(exc.message_dict)
+        if errors:
+            raise ValidationError(errors)
+
+        # The JWK of configurations without a private key is set with their key.
+        if config.version == LTIVersion.LTI_1P3 and public_jwk is not None:
+            config.lti_1p3_public_jwk = public_jwk
+            config.lti_1p3_public_jwk_etag = jwks_etag(public_jwk)
+        return config
+
+    def check_names(self, numbered_configs):
+        """
+        Return the configurations whose name isn't used by another one.
+
+        Names are unique, so the configurations named like another one, in the
+        database or earlier in the batch, are reported and skipped.
+        """
+        numbered_configs = list(numbered_configs)
+        used_names = dict(
+            ExternalLtiConfiguration.objects.filter(
+                name__in=[config.name for _, config in numbered_configs]
+            ).values_list("name", "slug")
+        )
+        configs = []
+        for number, config in numbered_configs:
+            if used_names.setdefault(config.name, config.slug) != config.slug:
+                error = config.unique_error_message(ExternalLtiConfiguration, ["name"])
+                self.skip(number, {"name": error.messages})
+                continue
+            configs.append(config)
+        return configs
+
+    def take_private_keys(self, configs, executor):
+        """Take the keys of the valid LTI 1.3 configurations without one from the pool."""
+        keyless = [
+            config
+            for config in configs
+            if config.version == LTIVersion.LTI_1P3 and not config.lti_1p3_private_key
+        ]
+        if not keyless:
+            return
+        private_keys = PregeneratedRsaKey.objects.take_many(len(keyless))
+        public_jwks = self.map_keys(
+            executor,
+            generate_public_jwk,
+            private_keys,
+            [config.lti_1p3_private_key_id for config in keyless],
+        )
+        for config, private_key, public_jwk in zip(keyless, private_keys, public_jwks):
+            config.lti_1p3_private_key = private_key
+            config.lti_1p3_public_jwk = public_jwk
+            config.lti_1p3_public_jwk_etag = jwks_etag(public_jwk)
+
+    @transaction.atomic
+    def write_batch(self, configs):
+        existing = dict(
+            ExternalLtiConfiguration.objects.filter(
+                slug__in=[config.slug for config in configs]
+            ).values_list("slug", "pk")
+        )
+        to_create = []
+        to_update = []
+        for config in configs:
+            if config.slug in existing:
+                config.pk = existing[config.slug]
+                to_update.append(config)
+            else:
+                to_create.append(config)
+
+        ExternalLtiConfiguration.objects.bulk_create(to_create)
+        if to_update:
+            replaced = self.keep_published_keys(to_update)
+            fields = [
+                field.name
+                for field in ExternalLtiConfiguration._meta.concrete_fields
+                if not field.primary_key and field.name != "created"
+            ]
+            ExternalLtiConfiguration.objects.bulk_update(to_update, fields)
+            for config, previous_key in replaced:
+                config._sync_platform_keys(  # pylint: disable=protected-access
+                    previous_key
+                )
+
+        self.created += len(to_create)
+        self.updated += len(to_update)
+
+    def keep_published_keys(self, configs):
+        """
+        Keep publishing the platform keys of the existing LTI 1.3 configurations.
+
+        Configurations imported with their stored key keep their public JWK, which
+        also publishes their next and retired keys. The others publish their new
+        key along with these and the replaced key, like `save()` does, and are
+        returned with the replaced key, to record their platform keys once saved.
+        """
+        configs = {
+            config.pk: config
+            for config in configs
+            if config.version == LTIVersion.LTI_1P3
+        }
+        stored = ExternalLtiKeyMaterial.objects.filter(
+            configuration__in=list(configs)
+        ).values_list(
+            "configuration",
+            "lti_1p3_private_key",
+            "lti_1p3_private_key_id",
+            "lti_1p3_public_jwk",
+            "lti_1p3_public_jwk_etag",
+        )
+        replaced = []
+        for pk, private_key, private_key_id, public_jwk, public_jwk_etag in stored:
+            config = configs[pk]
+            if (private_key, private_key_id) == (
+                config.lti_1p3_private_key,
+                config.lti_1p3_private_key_id,
+            ):
+                config.lti_1p3_public_jwk = public_jwk
+                config.lti_1p3_public_jwk_etag = public_jwk_etag
+                continue
+            previous_key = (
+                (private_key, private_key_id)
+                if private_key and private_key_id
+                else None
+            )
+            config.lti_1p3_public_jwk = generate_public_jwks(
+                config._get_published_keys(  # pylint: disable=protected-access
+                    previous_key
+                )
+            )
+            config.lti_1p3_public_jwk_etag = jwks_etag(config.lti_1p3_public_jwk)
+            replaced.append((config, previous_key))
+        return replaced
+
+    def skip(self, number, error):
+        self.skipped += 1
+        self.stderr.write(f"Line {number} skipped: {error}")
@@ -0,0 +1,37 @@
+"""
+Refresh the stale payloads of the configurations.
+"""
+
+from django.core.management.base import BaseCommand
+
+from lti_store.models import ExternalLtiConfiguration
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the payloads missing or stored before the serialized fields changed.
+
+    The lookups rebuild the stale payloads they read on the fly, which is slower
+    than decoding them. Run it after upgrading, and after updating configurations
+    with `QuerySet.update()`, which clears their payload.
+
+    Example usage:
+
+        python manage.py lti_store_refresh_payloads --batch-size 500
+    """
+
+    help = "Refresh the stale payloads of the configurations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of configurations refreshed per query (default: 100).",
+        )
+
+    def handle(self, *args, **options):
+        refreshed = ExternalLtiConfiguration.objects.refresh_payloads(
+            batch_size=options["batch_size"]
+        )
+        self.stdout.write(f"Refreshed {refreshed} payloads.")
@@ -0,0 +1,109 @@
+"""
+Rotate the platform keys of LTI 1.3 configurations.
+"""
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from lti_store.models import (
+    ExternalLtiConfiguration,
+    LtiPlatformKey,
+    LTIVersion,
+    PregeneratedRsaKey,
+)
+
+
+class Command(BaseCommand):
+    """
+    Rotate the platform keys of LTI 1.3 configurations.
+
+    The next key of every configuration becomes its active key, and a new next
+    key is published. The keys are generated up front in a pool of worker
+    processes, then the configurations are rotated one transaction at a time.
+
+    With --prune, the keys aren't rotated: the retired keys whose overlap window
+    is over are dropped from the public JWK of every configuration instead.
+
+    Example usage:
+
+        python manage.py lti_store_rotate_keys --all --workers 4
+        python manage.py lti_store_rotate_keys my-tool other-tool
+        python manage.py lti_store_rotate_keys --prune
+    """
+
+    help = "Rotate the platform keys of LTI 1.3 configurations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "slugs", nargs="*", help="Slugs of the configurations to rotate."
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rotate every LTI 1.3 configuration.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of processes generating keys, 0 to generate them in-process.",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Drop the expired retired keys of every configuration instead of rotating.",
+        )
+
+    def handle(self, *args, **options):
+        if options["prune"]:
+            if options["slugs"] or options["all"]:
+                raise CommandError("--prune applies to every configuration.")
+            self.prune()
+            return
+        if bool(options["slugs"]) == options["all"]:
+            raise CommandError("Pass either configuration slugs or --all.")
+
+        configurations = ExternalLtiConfiguration.objects.filter(
+            version=LTIVersion.LTI_1P3
+        )
+        if options["slugs"]:
+            configurations = configurations.filter(slug__in=options["slugs"])
+            unknown = set(options["slugs"]) - set(
+                configurations.values_list("slug", flat=True)
+            )
+            if unknown:
+                raise CommandError(
+                    f"Unknown LTI 1.3 configurations: {', '.join(sorted(unknown))}."
+                )
+        configurations = list(configurations.order_by("pk"))
+
+        # Every rotation takes a new next key, plus the key to activate when the
+        # configuration has no next key yet.
+        with_next_key = (
+            LtiPlatformKey.objects.filter(
+                configuration__in=configurations, state=LtiPlatformKey.State.NEXT
+            )
+            .values("configuration")
+            .distinct()
+            .count()
+        )
+        needed = 2 * len(configurations) - with_next_key
+        PregeneratedRsaKey.objects.refill(
+            size=PregeneratedRsaKey.objects.count() + needed,
+            workers=options["workers"],
+        )
+
+        for configuration in configurations:
+            configuration.rotate_platform_key()
+
+        self.stdout.write(f"Rotated the keys of {len(configurations)} configurations.")
+
+    def prune(self):
+        configurations = list(
+            ExternalLtiConfiguration.objects.with_expired_platform_keys().order_by("pk")
+        )
+        for configuration in configurations:
+            configuration.prune_platform_keys()
+
+        self.stdout.write(f"Pruned the keys of {len(configurations)} configurations.")
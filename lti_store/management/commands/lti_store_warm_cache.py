@@ -0,0 +1,55 @@
+"""
+Warm the configuration cache up.
+"""
+
+from django.core.management.base import BaseCommand
+
+from lti_store.warmup import warm_up_cache
+
+
+class Command(BaseCommand):
+    """
+    Load the serialized configurations, and optionally their parsed keys, into the cache.
+
+    Run it after a deploy, before sending traffic to the new workers, to fill the
+    shared cache tier they read from. The limits default to the
+    `LTI_STORE_WARM_UP_*` settings.
+
+    Example usage:
+
+        python manage.py lti_store_warm_cache --limit 5000 --time-limit 30 --keys
+    """
+
+    help = "Warm the configuration cache up."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Maximum number of configurations to load (default: LTI_STORE_WARM_UP_LIMIT).",
+        )
+        parser.add_argument(
+            "--time-limit",
+            type=float,
+            default=None,
+            help="Time after which no more configurations are loaded, in seconds "
+            "(default: LTI_STORE_WARM_UP_TIME_LIMIT).",
+        )
+        parser.add_argument(
+            "--keys",
+            action="store_true",
+            default=None,
+            help="Also parse the LTI 1.3 keys (default: LTI_STORE_WARM_UP_KEYS).",
+        )
+
+    def handle(self, *args, **options):
+        result = warm_up_cache(
+            limit=options["limit"],
+            time_limit=options["time_limit"],
+            keys=options["keys"],
+        )
+        self.stdout.write(
+            f"Loaded {result.configurations} configurations and {result.keys} keys "
+            f"into the cache{'' if result.complete else ' (incomplete)'}."
+        )
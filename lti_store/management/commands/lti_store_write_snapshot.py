@@ -0,0 +1,45 @@
+"""
+Write a read-only snapshot of the configurations.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from lti_store.snapshot import (
+    FORMAT_CODES,
+    FORMAT_JSON,
+    SnapshotError,
+    write_snapshot,
+)
+
+
+class Command(BaseCommand):
+    """
+    Compile every configuration into a snapshot file the workers can serve from.
+
+    The file is replaced atomically, and the workers with `LTI_STORE_SNAPSHOT_PATH`
+    pointing to it reload it on their next lookups. Run it on a schedule, or after
+    changing the configurations, to keep the snapshot fresh.
+
+    Example usage:
+
+        python manage.py lti_store_write_snapshot /var/lib/lti_store/snapshot.bin
+        python manage.py lti_store_write_snapshot snapshot.bin --format msgpack
+    """
+
+    help = "Write a read-only snapshot of the configurations."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the snapshot file.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(FORMAT_CODES),
+            default=FORMAT_JSON,
+            help="Encoding of the configurations (msgpack requires the msgpack package).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            count = write_snapshot(options["path"], options["format"])
+        except SnapshotError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(f"Wrote {count} configurations to {options['path']}.")
@@ -0,0 +1,38 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from lti_store.cache import request_memo
+
+
+class RequestCacheMiddleware:
+    """
+    Memoize the LTI configurations resolved while handling a request.
+
+    A unit rendering many LTI blocks calls the configuration filter once per
+    block; with this middleware, every slug (and the full listing) is resolved
+    at most once per request. Works with both WSGI and ASGI handlers.
+
+    Example usage:
+
+        MIDDLEWARE = [
+            ...
+            "lti_store.middleware.RequestCacheMiddleware",
+        ]
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with request_memo():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with request_memo():
+            return await self.get_response(request)
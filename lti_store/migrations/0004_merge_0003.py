@@ -0,0 +1,16 @@
+# Generated by Django 4.2.30 on 2026-10-16 21:13
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "lti_store",
+            "0003_alter_externallticonfiguration_lti_1p1_client_key_and_more",
+        ),
+        ("lti_store", "0003_alter_externallticonfiguration_lti_1p3_public_jwk"),
+    ]
+
+    operations = []
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-16 21:13
+
+from django.db import migrations, models
+import lti_store.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lti_store", "0004_merge_0003"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PregeneratedRsaKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("private_key", models.TextField()),
+                ("created", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="externallticonfiguration",
+            name="lti_1p3_private_key",
+            field=models.TextField(
+                blank=True,
+                help_text="Platform's generated Private key. Keep this value secret.\n        If left blank, a new key will be generated automatically.",
+                validators=[lti_store.models.validate_rsa_key],
+                verbose_name="LTI 1.3 Private Key",
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.30 on 2026-10-16 21:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lti_store", "0005_key_pool"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LtiPlatformKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[
+                            ("active", "Active"),
+                            ("next", "Next"),
+                            ("retired", "Retired"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("private_key", models.TextField()),
+                ("private_key_id", models.CharField(max_length=255)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("retired_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "configuration",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="platform_keys",
+                        to="lti_store.externallticonfiguration",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="ltiplatformkey",
+            constraint=models.UniqueConstraint(
+                fields=("configuration", "private_key_id"),
+                name="unique_platform_key_id",
+            ),
+        ),
+    ]
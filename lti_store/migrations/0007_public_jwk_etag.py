@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-16 21:21
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+
+def compute_public_jwk_etags(apps, schema_editor):
+    ExternalLtiConfiguration = apps.get_model("lti_store", "ExternalLtiConfiguration")
+    configs = ExternalLtiConfiguration.objects.exclude(lti_1p3_public_jwk={})
+    for config in configs.iterator():
+        body = json.dumps(
+            config.lti_1p3_public_jwk, sort_keys=True, separators=(",", ":")
+        )
+        config.lti_1p3_public_jwk_etag = hashlib.sha256(body.encode()).hexdigest()
+        config.save(update_fields=["lti_1p3_public_jwk_etag"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lti_store", "0006_platform_keys"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="externallticonfiguration",
+            name="lti_1p3_public_jwk_etag",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Hash of the public JWK keyset, served as its ETag.",
+                max_length=64,
+                verbose_name="LTI 1.3 Public JWK ETag",
+            ),
+        ),
+        migrations.RunPython(compute_public_jwk_etags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,131 @@
+# Generated by Django 4.2.30 on 2026-10-16 21:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+import lti_store.models
+
+KEY_MATERIAL_FIELDS = (
+    "lti_1p3_private_key",
+    "lti_1p3_private_key_id",
+    "lti_1p3_tool_public_key",
+    "lti_1p3_public_jwk",
+    "lti_1p3_public_jwk_etag",
+)
+
+
+def copy_key_material(apps, schema_editor):
+    ExternalLtiConfiguration = apps.get_model("lti_store", "ExternalLtiConfiguration")
+    ExternalLtiKeyMaterial = apps.get_model("lti_store", "ExternalLtiKeyMaterial")
+    configs = ExternalLtiConfiguration.objects.values("pk", *KEY_MATERIAL_FIELDS)
+    batch = []
+    for config in configs.iterator():
+        pk = config.pop("pk")
+        if any(config.values()):
+            batch.append(ExternalLtiKeyMaterial(configuration_id=pk, **config))
+        if len(batch) >= 1000:
+            ExternalLtiKeyMaterial.objects.bulk_create(batch)
+            batch = []
+    ExternalLtiKeyMaterial.objects.bulk_create(batch)
+
+
+def restore_key_material(apps, schema_editor):
+    ExternalLtiConfiguration = apps.get_model("lti_store", "ExternalLtiConfiguration")
+    ExternalLtiKeyMaterial = apps.get_model("lti_store", "ExternalLtiKeyMaterial")
+    for key_material in ExternalLtiKeyMaterial.objects.iterator():
+        ExternalLtiConfiguration.objects.filter(
+            pk=key_material.configuration_id
+        ).update(
+            **{field: getattr(key_material, field) for field in KEY_MATERIAL_FIELDS}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lti_store", "0007_public_jwk_etag"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExternalLtiKeyMaterial",
+            fields=[
+                (
+                    "configuration",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="key_material",
+                        serialize=False,
+                        to="lti_store.externallticonfiguration",
+                    ),
+                ),
+                (
+                    "lti_1p3_private_key",
+                    models.TextField(
+                        blank=True,
+                        help_text="Platform's generated Private key. Keep this value secret.\n        If left blank, a new key will be generated automatically.",
+                        validators=[lti_store.models.validate_rsa_key],
+                        verbose_name="LTI 1.3 Private Key",
+                    ),
+                ),
+                (
+                    "lti_1p3_private_key_id",
+                    models.CharField(
+                        blank=True,
+                        help_text="Platform's generated Private key ID",
+                        max_length=255,
+                        verbose_name="LTI 1.3 Private Key ID",
+                    ),
+                ),
+                (
+                    "lti_1p3_tool_public_key",
+                    models.TextField(
+                        blank=True,
+                        help_text="This is the LTI Tool's public key.\n        This should be provided by the LTI Tool.\n        One of either lti_1p3_tool_public_key or\n        lti_1p3_tool_keyset_url must not be blank.",
+                        validators=[lti_store.models.validate_rsa_key],
+                        verbose_name="LTI 1.3 Tool Public Key",
+                    ),
+                ),
+                (
+                    "lti_1p3_public_jwk",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Platform's generated JWK keyset. This will be generated automatically, no need to fill out.",
+                        verbose_name="LTI 1.3 Public JWK",
+                    ),
+                ),
+                (
+                    "lti_1p3_public_jwk_etag",
+                    models.CharField(
+                        blank=True,
+                        editable=False,
+                        help_text="Hash of the public JWK keyset, served as its ETag.",
+                        max_length=64,
+                        verbose_name="LTI 1.3 Public JWK ETag",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(copy_key_material, restore_key_material),
+        migrations.RemoveField(
+            model_name="externallticonfiguration",
+            name="lti_1p3_private_key",
+        ),
+        migrations.RemoveField(
+            model_name="externallticonfiguration",
+            name="lti_1p3_private_key_id",
+        ),
+        migrations.RemoveField(
+            model_name="externallticonfiguration",
+            name="lti_1p3_public_jwk",
+        ),
+        migrations.RemoveField(
+            model_name="externallticonfiguration",
+            name="lti_1p3_public_jwk_etag",
+        ),
+        migrations.RemoveField(
+            model_name="externallticonfiguration",
+            name="lti_1p3_tool_public_key",
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.30 on 2026-10-16 21:40
+
+import json
+import re
+
+from django.db import migrations, models
+import lti_store.models
+
+
+def parse_redirect_uris(value):
+    """Return the redirect URIs stored in a text value as a list of strings."""
+    value = (value or "").strip()
+    if not value:
+        return []
+    try:
+        uris = json.loads(value)
+    except ValueError:
+        # Not JSON: URIs separated by whitespace or commas, or a malformed JSON list.
+        uris = (uri.strip("[]\"'") for uri in re.split(r"[\s,]+", value))
+        return [uri for uri in uris if uri]
+    if isinstance(uris, str):
+        uris = [uris]
+    if not isinstance(uris, list):
+        return []
+    return [str(uri) for uri in uris if uri]
+
+
+def copy_redirect_uris(apps, schema_editor):
+    ExternalLtiConfiguration = apps.get_model("lti_store", "ExternalLtiConfiguration")
+    configs = ExternalLtiConfiguration.objects.only("lti_1p3_redirect_uris")
+    for config in configs.iterator():
+        config.lti_1p3_redirect_uris_list = parse_redirect_uris(
+            config.lti_1p3_redirect_uris
+        )
+        config.save(update_fields=["lti_1p3_redirect_uris_list"])
+
+
+def restore_redirect_uris(apps, schema_editor):
+    ExternalLtiConfiguration = apps.get_model("lti_store", "ExternalLtiConfiguration")
+    configs = ExternalLtiConfiguration.objects.only("lti_1p3_redirect_uris_list")
+    for config in configs.iterator():
+        config.lti_1p3_redirect_uris = json.dumps(config.lti_1p3_redirect_uris_list)
+        config.save(update_fields=["lti_1p3_redirect_uris"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lti_store", "0008_key_material"),
+    ]
+
+    # The values are converted in Python rather than cast by the database, so
+    # values that aren't valid JSON are normalized instead of failing the migration.
+    operations = [
+        migrations.AddField(
+            model_name="externallticonfiguration",
+            name="lti_1p3_redirect_uris_list",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(copy_redirect_uris, restore_redirect_uris),
+        migrations.RemoveField(
+            model_name="externallticonfiguration",
+            name="lti_1p3_redirect_uris",
+        ),
+        migrations.RenameField(
+            model_name="externallticonfiguration",
+            old_name="lti_1p3_redirect_uris_list",
+            new_name="lti_1p3_redirect_uris",
+        ),
+        migrations.AlterField(
+            model_name="externallticonfiguration",
+            name="lti_1p3_redirect_uris",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Valid urls the Tool may request us to redirect the id token to.\n        The redirect uris are often the same as the launch url/deep linking url so if\n        this field is empty, it will use them as the default. If you need to use different\n        redirect uri's, enter them here. If you use this field you must enter all valid\n        redirect uri's the tool may request.",
+                validators=[lti_store.models.validate_list_field],
+                verbose_name="LTI 1.3 Redirect URIs",
+            ),
+        ),
+    ]
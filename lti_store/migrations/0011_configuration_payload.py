@@ -0,0 +1,76 @@
+# Generated by Django 4.2.30 on 2026-10-16 22:24
+
+import json
+import zlib
+
+from django.db import migrations, models
+from django.forms.models import model_to_dict
+import django.db.models.deletion
+
+# Copied from `lti_store.payload`, so this migration keeps working if it changes.
+PAYLOAD_FORMAT = 1
+
+
+def get_payload_version(fields):
+    signature = ",".join([str(PAYLOAD_FORMAT), *sorted(fields)])
+    return zlib.crc32(signature.encode()) & 0x7FFFFFFF
+
+
+def encode_payload(serialized):
+    return json.dumps(serialized, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def compute_payloads(apps, schema_editor):
+    ExternalLtiConfiguration = apps.get_model("lti_store", "ExternalLtiConfiguration")
+    ExternalLtiKeyMaterial = apps.get_model("lti_store", "ExternalLtiKeyMaterial")
+    ExternalLtiConfigurationPayload = apps.get_model(
+        "lti_store", "ExternalLtiConfigurationPayload"
+    )
+    configs = ExternalLtiConfiguration.objects.select_related("key_material")
+    batch = []
+    for config in configs.iterator(chunk_size=1000):
+        try:
+            key_material = config.key_material
+        except ExternalLtiKeyMaterial.DoesNotExist:
+            key_material = ExternalLtiKeyMaterial()
+        serialized = model_to_dict(config, exclude=["id"])
+        serialized.update(model_to_dict(key_material, exclude=["configuration"]))
+        batch.append(
+            ExternalLtiConfigurationPayload(
+                configuration_id=config.pk,
+                data=encode_payload(serialized),
+                version=get_payload_version(list(serialized)),
+            )
+        )
+        if len(batch) >= 1000:
+            ExternalLtiConfigurationPayload.objects.bulk_create(batch)
+            batch = []
+    ExternalLtiConfigurationPayload.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lti_store", "0010_sync_timestamps"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExternalLtiConfigurationPayload",
+            fields=[
+                (
+                    "configuration",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="payload",
+                        serialize=False,
+                        to="lti_store.externallticonfiguration",
+                    ),
+                ),
+                ("data", models.BinaryField()),
+                ("version", models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.RunPython(compute_payloads, migrations.RunPython.noop),
+    ]
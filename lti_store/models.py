@@ -1,13 +1,28 @@
 import uuid
-import json
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
 
-from Cryptodome.PublicKey import RSA
-from jwkest import jwk
-from jwkest.jwk import RSAKey
-from django.db import models
+from django.conf import settings
+from django.db import connection, models, transaction
 from django.core.exceptions import ValidationError
+from django.forms.models import model_to_dict
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from lti_store.cache import configuration_cache
+from lti_store.keys import (
+    generate_private_key,
+    generate_public_jwks,
+    import_rsa_key,
+    jwks_etag,
+)
+from lti_store.payload import encode_payload, get_payload_version
+from lti_store.routers import pin_primary
+
+log = logging.getLogger(__name__)
+
 MESSAGES = {
     "required": _("This field is required."),
     "required_pubkey_or_keyset": _("LTI 1.3 requires either a public key or a keyset URL."),
@@ -19,22 +34,113 @@ MESSAGES = {
 def validate_rsa_key(key):
     """Validate RSA key format."""
     try:
-        RSA.import_key(key)
+        import_rsa_key(key)
     except ValueError:
         raise ValidationError(MESSAGES["invalid_rsa_key"])
 
     return key
 
 
-def validate_list_field(string):
+def validate_list_field(value):
     """Validate list field format."""
-    try:
-        deserialized = json.loads(string)
-    except ValueError:
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
         raise ValidationError(MESSAGES["invalid_list_field"])
 
-    if not isinstance(deserialized, list):
-        raise ValidationError(MESSAGES["invalid_list_field"])
+
+class KeyPoolManager(models.Manager):
+    """
+    Manager of the pool of pre-generated platform private keys.
+
+    Settings:
+
+        LTI_STORE_KEY_POOL_SIZE: Number of keys the pool is refilled to (20).
+        LTI_STORE_KEY_POOL_LOW_WATER_MARK: Number of keys under which the pool
+            is refilled in the background, when enabled (5).
+        LTI_STORE_KEY_POOL_BACKGROUND_REFILL: Whether to refill the pool in a
+            background thread of the process taking keys (False). Otherwise, run
+            the `lti_store_fill_key_pool` management command periodically.
+    """
+
+    _refill_lock = threading.Lock()
+
+    def take(self):
+        """Take a private key from the pool."""
+        return self.take_many(1)[0]
+
+    def take_many(self, count):
+        """Take `count` private keys from the pool, generating the missing ones on the spot."""
+        with transaction.atomic(using=self.db):
+            keys = list(self.select_for_update(skip_locked=True).order_by("pk")[:count])
+            self.filter(pk__in=[key.pk for key in keys]).delete()
+
+        private_keys = [key.private_key for key in keys]
+        if len(private_keys) < count:
+            missing = count - len(private_keys)
+            log.warning(
+                "The key pool is empty, generating %d keys on the spot.", missing
+            )
+            private_keys += [generate_private_key() for _ in range(missing)]
+
+        if getattr(settings, "LTI_STORE_KEY_POOL_BACKGROUND_REFILL", False):
+            low_water_mark = getattr(settings, "LTI_STORE_KEY_POOL_LOW_WATER_MARK", 5)
+            if self.count() < low_water_mark:
+                self.refill_in_background()
+        return private_keys
+
+    def refill(self, size=None, workers=0):
+        """
+        Generate keys until the pool holds `size` of them, returning the number generated.
+
+        Keys are generated in a pool of `workers` processes, or in-process if 0.
+        """
+        if size is None:
+            size = getattr(settings, "LTI_STORE_KEY_POOL_SIZE", 20)
+        missing = max(size - self.count(), 0)
+        if workers > 0 and missing > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(generate_private_key) for _ in range(missing)
+                ]
+                private_keys = [future.result() for future in futures]
+        else:
+            private_keys = [generate_private_key() for _ in range(missing)]
+        self.bulk_create([self.model(private_key=key) for key in private_keys])
+        return missing
+
+    def refill_in_background(self):
+        """Refill the pool in a thread, unless a refill is already running."""
+        if not self._refill_lock.acquire(blocking=False):
+            return None
+
+        def refill():
+            try:
+                self.refill()
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Failed to refill the key pool.")
+            finally:
+                connection.close()
+                self._refill_lock.release()
+
+        thread = threading.Thread(target=refill, name="lti_store_key_pool", daemon=True)
+        thread.start()
+        return thread
+
+
+class PregeneratedRsaKey(models.Model):
+    """
+    Platform private key generated ahead of time.
+
+    LTI 1.3 configurations saved without a private key take one from this pool,
+    so creating them never waits for an RSA key to be generated.
+    """
+
+    private_key = models.TextField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    objects = KeyPoolManager()
+
+    def __str__(self):
+        return f"<PregeneratedRsaKey #{self.id}>"
 
 
 class LTIVersion(models.TextChoices):
@@ -48,6 +154,166 @@ class LTIAdvantageAGS(models.TextChoices):
     PROGRAMMATIC = "programmatic", _("Allow tools to manage and submit grade (programmatic)")
 
 
+# Fields of `ExternalLtiKeyMaterial` exposed as attributes of the configurations.
+KEY_MATERIAL_FIELDS = (
+    "lti_1p3_private_key",
+    "lti_1p3_private_key_id",
+    "lti_1p3_tool_public_key",
+    "lti_1p3_public_jwk",
+    "lti_1p3_public_jwk_etag",
+)
+
+
+def key_material_property(name):
+    """Return a property proxying a field of the key material of a configuration."""
+
+    def fget(self):
+        key_material = self.get_key_material()
+        if key_material is None:
+            return ExternalLtiKeyMaterial._meta.get_field(name).get_default()
+        return getattr(key_material, name)
+
+    def fset(self, value):
+        setattr(self.get_key_material(create=True), name, value)
+
+    return property(fget, fset)
+
+
+# Fields not part of the payloads of the configurations.
+NON_PAYLOAD_FIELDS = ("created", "modified")
+
+
+class ConfigurationQuerySet(models.QuerySet):
+    """Queries on the configurations, writing their key material and payload along with them."""
+
+    def with_key_material(self):
+        """Load the key material of the configurations in the same query."""
+        return self.select_related("key_material")
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        # Computed before inserting, so the key material of new configurations isn't queried.
+        payloads = [obj.get_payload() for obj in objs]
+        with transaction.atomic(using=self.db, savepoint=False):
+            created = super().bulk_create(objs, *args, **kwargs)
+            # Some backends don't return the primary keys of bulk inserted rows.
+            unsaved = {obj.slug: obj for obj in objs if obj.pk is None}
+            if unsaved:
+                pks = self.filter(slug__in=unsaved).values_list("slug", "pk")
+                for slug, pk in pks:
+                    unsaved[slug].pk = pk
+            self._write_key_material(objs)
+            self._write_payloads(payloads)
+            self._invalidate_cache()
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        now = timezone.now()
+        for obj in objs:
+            obj.modified = now
+        fields = [*fields, "modified"]
+        with transaction.atomic(using=self.db, savepoint=False):
+            updated = super().bulk_update(
+                objs, list(dict.fromkeys(fields)), *args, **kwargs
+            )
+            self._write_key_material(objs)
+            # Fields left out of `fields` may differ from the stored ones.
+            stored = (
+                self.model.objects.using(self.db)
+                .with_key_material()
+                .filter(pk__in=[obj.pk for obj in objs])
+            )
+            self._write_payloads([obj.get_payload() for obj in stored])
+            self._invalidate_cache()
+        return updated
+
+    def update(self, **kwargs):
+        kwargs.setdefault("modified", timezone.now())
+        if not set(kwargs) - set(NON_PAYLOAD_FIELDS):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            # The payloads can't be computed in SQL, they're rebuilt on read instead.
+            ExternalLtiConfigurationPayload.objects.using(self.db).filter(
+                configuration__in=self
+            ).delete()
+            self._invalidate_cache()
+            return super().update(**kwargs)
+
+    def stale_payloads(self):
+        """Configurations without a payload, or with a payload of another version."""
+        return self.filter(
+            models.Q(payload__isnull=True)
+            | ~models.Q(payload__version=ExternalLtiConfiguration.get_payload_version())
+        )
+
+    def refresh_payloads(self, batch_size=100):
+        """Rebuild the stale payloads, returning the number of configurations refreshed."""
+        refreshed = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                self.stale_payloads()
+                .with_key_material()
+                .filter(pk__gt=last_pk)
+                .order_by("pk")[:batch_size]
+            )
+            if not batch:
+                return refreshed
+            self._write_payloads([obj.get_payload() for obj in batch])
+            refreshed += len(batch)
+            last_pk = batch[-1].pk
+
+    def with_expired_platform_keys(self):
+        """Configurations with retired platform keys whose overlap window is over."""
+        return self.filter(
+            platform_keys__in=LtiPlatformKey.objects.expired()
+        ).distinct()
+
+    def changed_since(self, since):
+        """Configurations created or modified at or after `since`."""
+        return self.filter(modified__gte=since)
+
+    def _invalidate_cache(self):
+        """
+        Invalidate the cached configurations once the bulk write is committed.
+
+        Bulk writes don't send the model signals the cache is invalidated from.
+        """
+        transaction.on_commit(configuration_cache.invalidate, using=self.db)
+        transaction.on_commit(pin_primary, using=self.db)
+
+    def _write_key_material(self, objs):
+        """Insert or update the key material set on the given configurations."""
+        pending = [
+            (obj, obj._get_cached_key_material())  # pylint: disable=protected-access
+            for obj in objs
+        ]
+        pending = [(obj, key_material) for obj, key_material in pending if key_material]
+        if not pending:
+            return
+
+        for obj, key_material in pending:
+            key_material.configuration = obj
+        ExternalLtiKeyMaterial.objects.using(self.db).bulk_create(
+            [key_material for _, key_material in pending],
+            update_conflicts=True,
+            unique_fields=["configuration"],
+            update_fields=KEY_MATERIAL_FIELDS,
+        )
+        for _, key_material in pending:
+            key_material.reset_loaded_values()
+
+    def _write_payloads(self, payloads):
+        """Insert or update the given payloads of configurations."""
+        ExternalLtiConfigurationPayload.objects.using(self.db).bulk_create(
+            payloads,
+            update_conflicts=True,
+            unique_fields=["configuration"],
+            update_fields=["data", "version"],
+        )
+
+
 class ExternalLtiConfiguration(models.Model):
 
     name = models.CharField(max_length=80, unique=True)
@@ -107,27 +373,6 @@ class ExternalLtiConfiguration(models.Model):
         It represents the LTI resource to launch to or load in the second leg of the launch flow,
         when the resource is actually launched or loaded."""),
     )
-    lti_1p3_private_key = models.TextField(
-        "LTI 1.3 Private Key",
-        blank=True,
-        help_text=_("Platform's generated Private key. Keep this value secret."),
-        validators=[validate_rsa_key],
-    )
-    lti_1p3_private_key_id = models.CharField(
-        "LTI 1.3 Private Key ID",
-        max_length=255,
-        blank=True,
-        help_text=_("Platform's generated Private key ID"),
-    )
-    lti_1p3_tool_public_key = models.TextField(
-        "LTI 1.3 Tool Public Key",
-        blank=True,
-        help_text=_("""This is the LTI Tool's public key.
-        This should be provided by the LTI Tool.
-        One of either lti_1p3_tool_public_key or
-        lti_1p3_tool_keyset_url must not be blank."""),
-        validators=[validate_rsa_key],
-    )
     lti_1p3_tool_keyset_url = models.URLField(
         "LTI 1.3 Tool Keyset URL",
         max_length=255,
@@ -137,7 +382,7 @@ class ExternalLtiConfiguration(models.Model):
         Tool. One of either lti_1p3_tool_public_key or
         lti_1p3_tool_keyset_url must not be blank."""),
     )
-    lti_1p3_redirect_uris = models.TextField(
+    lti_1p3_redirect_uris = models.JSONField(
         "LTI 1.3 Redirect URIs",
         default=list,
         blank=True,
@@ -148,12 +393,6 @@ class ExternalLtiConfiguration(models.Model):
         redirect uri's the tool may request."""),
         validators=[validate_list_field],
     )
-    lti_1p3_public_jwk = models.JSONField(
-        "LTI 1.3 Public JWK",
-        default=dict,
-        blank=True,
-        help_text=_("Platform's generated JWK keyset. This will be generated automatically, no need to fill out."),
-    )
 
     # LTI 1.3 Advantage Related Variables
     lti_advantage_enable_nrps = models.BooleanField(
@@ -184,9 +423,206 @@ class ExternalLtiConfiguration(models.Model):
         create and link the grades.""")
     )
 
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Bumped by every write, including the ones to the key material.
+    modified = models.DateTimeField(auto_now=True, db_index=True)
+
+    # LTI 1.3 key material, stored in `ExternalLtiKeyMaterial` so it is only
+    # loaded along with the configurations that need it.
+    lti_1p3_private_key = key_material_property("lti_1p3_private_key")
+    lti_1p3_private_key_id = key_material_property("lti_1p3_private_key_id")
+    lti_1p3_tool_public_key = key_material_property("lti_1p3_tool_public_key")
+    lti_1p3_public_jwk = key_material_property("lti_1p3_public_jwk")
+    lti_1p3_public_jwk_etag = key_material_property("lti_1p3_public_jwk_etag")
+
+    objects = ConfigurationQuerySet.as_manager()
+
+    # Slug as loaded from the database, None for new instances.
+    _loaded_slug = None
+
     def __str__(self):
         return f"<ExternalLtiConfiguration #{self.id}: {self.slug}>"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_slug = instance.__dict__.get("slug")
+        return instance
+
+    def get_key_material(self, create=False):
+        """
+        Return the key material of the configuration, loading it if needed.
+
+        Returns None if the configuration has no key material, unless `create`
+        is True, in which case new key material is attached to the configuration
+        and saved along with it.
+        """
+        try:
+            return self.key_material
+        except ExternalLtiKeyMaterial.DoesNotExist:
+            if not create:
+                return None
+        key_material = ExternalLtiKeyMaterial()
+        key_material.configuration = self
+        return key_material
+
+    def serialize(self):
+        """Return the configuration, and its key material, as a dict."""
+        serialized = model_to_dict(self)
+        serialized.update(
+            model_to_dict(
+                self.get_key_material() or ExternalLtiKeyMaterial(),
+                exclude=["configuration"],
+            )
+        )
+        return serialized
+
+    @classmethod
+    def get_payload_version(cls):
+        """Return the version of the payloads of the current fields."""
+        try:
+            return cls._payload_version
+        except AttributeError:
+            fields = [field for field in cls().serialize() if field != "id"]
+            cls._payload_version = get_payload_version(fields)
+            return cls._payload_version
+
+    def get_payload(self):
+        """Return the payload of the configuration, without its ID, to be saved."""
+        serialized = self.serialize()
+        del serialized["id"]
+        return ExternalLtiConfigurationPayload(
+            configuration=self,
+            data=encode_payload(serialized),
+            version=get_payload_version(list(serialized)),
+        )
+
+    def _get_cached_key_material(self):
+        # Don't query the key material when it was never loaded nor set.
+        related = ExternalLtiKeyMaterial._meta.get_field("configuration").remote_field
+        return related.get_cached_value(self, default=None)
+
+    def has_key_material_changed(self):
+        """Return True if the key material changed since the instance was loaded."""
+        key_material = self._get_cached_key_material()
+        if key_material is None:
+            return self._state.adding
+        return key_material.has_key_material_changed()
+
+    def clean_fields(self, exclude=None):
+        errors = {}
+        try:
+            super().clean_fields(exclude=exclude)
+        except ValidationError as exc:
+            errors = exc.update_error_dict(errors)
+
+        key_material = self._get_cached_key_material()
+        if key_material is not None:
+            try:
+                key_material.clean_fields(exclude={"configuration", *(exclude or ())})
+            except ValidationError as exc:
+                errors = exc.update_error_dict(errors)
+
+        if errors:
+            raise ValidationError(errors)
+
+    def _get_previous_key(self):
+        """Return the `(private_key, kid)` pair loaded from the database, if any."""
+        key_material = self._get_cached_key_material()
+        if key_material is None:
+            return None
+        return key_material.get_loaded_key()
+
+    def _get_published_keys(self, previous_key=None):
+        """
+        Return the `(private_key, kid)` pairs to publish in the public JWK.
+
+        The current key comes first, followed by the next and retired platform
+        keys and the key being replaced, so launches it signed can still be verified.
+        The key being replaced defaults to the one loaded from the database.
+        """
+        keys = {self.lti_1p3_private_key_id: self.lti_1p3_private_key}
+        if self.pk is not None:
+            for key in LtiPlatformKey.objects.filter(configuration=self).published():
+                keys.setdefault(key.private_key_id, key.private_key)
+        if previous_key is None:
+            previous_key = self._get_previous_key()
+        if previous_key is not None:
+            keys.setdefault(previous_key[1], previous_key[0])
+        return [(private_key, kid) for kid, private_key in keys.items()]
+
+    def _sync_platform_keys(self, previous_key):
+        """Record the current key as the active platform key, retiring `previous_key`."""
+        now = timezone.now()
+        platform_keys = LtiPlatformKey.objects.filter(configuration=self)
+        if previous_key is not None:
+            retired = platform_keys.filter(state=LtiPlatformKey.State.ACTIVE).update(
+                state=LtiPlatformKey.State.RETIRED, retired_at=now
+            )
+            if not retired:
+                # Keys saved before the platform key table existed aren't recorded.
+                LtiPlatformKey.objects.create(
+                    configuration=self,
+                    private_key=previous_key[0],
+                    private_key_id=previous_key[1],
+                    state=LtiPlatformKey.State.RETIRED,
+                    retired_at=now,
+                )
+        platform_keys.expired().delete()
+        LtiPlatformKey.objects.update_or_create(
+            configuration=self,
+            private_key_id=self.lti_1p3_private_key_id,
+            defaults={
+                "private_key": self.lti_1p3_private_key,
+                "state": LtiPlatformKey.State.ACTIVE,
+                "retired_at": None,
+            },
+        )
+
+    def rotate_platform_key(self):
+        """
+        Rotate the platform key of a LTI 1.3 configuration.
+
+        The next key becomes the active one, the active key is retired and a new
+        next key is taken from the key pool. Next keys are published ahead of their
+        activation and retired keys stay published during the overlap window.
+        """
+        with transaction.atomic():
+            next_key = (
+                LtiPlatformKey.objects.filter(
+                    configuration=self, state=LtiPlatformKey.State.NEXT
+                )
+                .order_by("created")
+                .first()
+            )
+            if next_key is None:
+                next_key = LtiPlatformKey(
+                    private_key=PregeneratedRsaKey.objects.take(),
+                    private_key_id=str(uuid.uuid4()),
+                )
+            LtiPlatformKey.objects.create(
+                configuration=self,
+                private_key=PregeneratedRsaKey.objects.take(),
+                private_key_id=str(uuid.uuid4()),
+                state=LtiPlatformKey.State.NEXT,
+            )
+            self.lti_1p3_private_key = next_key.private_key
+            self.lti_1p3_private_key_id = next_key.private_key_id
+            self.save()
+
+    def prune_platform_keys(self):
+        """
+        Delete the retired platform keys whose overlap window is over.
+
+        They are dropped from the public JWK as well, instead of staying published
+        until the keys of the configuration change again.
+        """
+        with transaction.atomic():
+            LtiPlatformKey.objects.filter(configuration=self).expired().delete()
+            self.lti_1p3_public_jwk = generate_public_jwks(self._get_published_keys())
+            self.lti_1p3_public_jwk_etag = jwks_etag(self.lti_1p3_public_jwk)
+            self.save(update_fields=["lti_1p3_public_jwk", "lti_1p3_public_jwk_etag"])
+
     def clean(self):
         validation_errors = {}
 
@@ -201,11 +637,7 @@ class ExternalLtiConfiguration(models.Model):
                     validation_errors.update({field: _(MESSAGES["required"])})
 
         if self.version == LTIVersion.LTI_1P3:
-            if not self.lti_1p3_private_key:
-                # Raise ValidationError if private key is missing.
-                validation_errors.update(
-                    {"lti_1p3_private_key": _(MESSAGES["required"])},
-                )
+            # A missing private key is taken from the key pool on save.
             if not self.lti_1p3_tool_public_key and not self.lti_1p3_tool_keyset_url:
                 # Raise ValidationError if public key and keyset URL are missing.
                 validation_errors.update({
@@ -217,19 +649,308 @@ class ExternalLtiConfiguration(models.Model):
             raise ValidationError(validation_errors)
 
     def save(self, *args, **kwargs):
+        changed_fields = set()
+
         if self.version == LTIVersion.LTI_1P3:
             # Generate client ID or private key ID if missing.
             if not self.lti_1p3_client_id:
                 self.lti_1p3_client_id = str(uuid.uuid4())
+                changed_fields.add("lti_1p3_client_id")
+            if not self.lti_1p3_private_key:
+                self.lti_1p3_private_key = PregeneratedRsaKey.objects.take()
+                changed_fields.add("lti_1p3_private_key")
             if not self.lti_1p3_private_key_id:
                 self.lti_1p3_private_key_id = str(uuid.uuid4())
+                changed_fields.add("lti_1p3_private_key_id")
+
+            # Regenerate public JWK, only when the key material changed.
+            if self.has_key_material_changed() or not self.lti_1p3_public_jwk:
+                self.lti_1p3_public_jwk = generate_public_jwks(
+                    self._get_published_keys()
+                )
+                self.lti_1p3_public_jwk_etag = jwks_etag(self.lti_1p3_public_jwk)
+                changed_fields.update(("lti_1p3_public_jwk", "lti_1p3_public_jwk_etag"))
+
+        key_material = self._get_cached_key_material()
+        save_key_material = key_material is not None and key_material.has_changed()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields) | changed_fields
+            save_key_material = save_key_material and bool(
+                update_fields & set(KEY_MATERIAL_FIELDS)
+            )
+            # Writes to the key material only are still recorded as modifications.
+            kwargs["update_fields"] = (update_fields - set(KEY_MATERIAL_FIELDS)) | {
+                "modified"
+            }
+
+        # Computed before saving, so the key material of new configurations isn't
+        # queried. After a partial save, it's computed from the stored configuration.
+        payload = self.get_payload() if update_fields is None else None
+
+        sync_platform_keys = (
+            self.version == LTIVersion.LTI_1P3 and self.has_key_material_changed()
+        )
+        renamed = self._loaded_slug is not None and self._loaded_slug != self.slug
+        if not save_key_material and not sync_platform_keys and not renamed:
+            with transaction.atomic(using=kwargs.get("using"), savepoint=False):
+                super().save(*args, **kwargs)
+                self._save_payload(kwargs.get("using"), payload)
+            self._loaded_slug = self.slug
+            return
 
-            # Regenerate public JWK.
-            public_keys = jwk.KEYS()
-            public_keys.append(RSAKey(
-                kid=self.lti_1p3_private_key_id,
-                key=RSA.import_key(self.lti_1p3_private_key),
-            ))
-            self.lti_1p3_public_jwk = json.loads(public_keys.dump_jwks())
+        # The key being replaced, before the key material is saved.
+        previous_key = self._get_previous_key()
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+            if renamed:
+                # Synced copies stored under the previous slug must be removed.
+                LtiConfigurationTombstone.objects.db_manager(
+                    kwargs.get("using")
+                ).record(self._loaded_slug)
+            self._loaded_slug = self.slug
+            if save_key_material:
+                key_material.configuration = self
+                key_material.save(
+                    using=kwargs.get("using"),
+                    force_insert=key_material._state.adding,
+                )
+            if sync_platform_keys:
+                self._sync_platform_keys(previous_key)
+            self._save_payload(kwargs.get("using"), payload)
+
+    def _save_payload(self, using, payload=None):
+        """
+        Save the payload of the configuration, once its fields and key material are.
+
+        Without a `payload`, e.g. after a partial save whose fields left out may
+        differ from the stored ones, it is computed from the stored configuration.
+        """
+        config_objs = type(self).objects.using(using)
+        if payload is None:
+            payload = config_objs.with_key_material().get(pk=self.pk).get_payload()
+        config_objs._write_payloads([payload])  # pylint: disable=protected-access
+
+
+class ExternalLtiKeyMaterial(models.Model):
+    """
+    LTI 1.3 key material of a configuration.
+
+    Keys and keysets are much larger than the rest of a configuration, so they
+    are kept out of its table, and only loaded when a configuration is resolved.
+    Its fields are exposed as attributes of `ExternalLtiConfiguration`.
+    """
+
+    configuration = models.OneToOneField(
+        ExternalLtiConfiguration,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="key_material",
+    )
+    lti_1p3_private_key = models.TextField(
+        "LTI 1.3 Private Key",
+        blank=True,
+        help_text=_("""Platform's generated Private key. Keep this value secret.
+        If left blank, a new key will be generated automatically."""),
+        validators=[validate_rsa_key],
+    )
+    lti_1p3_private_key_id = models.CharField(
+        "LTI 1.3 Private Key ID",
+        max_length=255,
+        blank=True,
+        help_text=_("Platform's generated Private key ID"),
+    )
+    lti_1p3_tool_public_key = models.TextField(
+        "LTI 1.3 Tool Public Key",
+        blank=True,
+        help_text=_("""This is the LTI Tool's public key.
+        This should be provided by the LTI Tool.
+        One of either lti_1p3_tool_public_key or
+        lti_1p3_tool_keyset_url must not be blank."""),
+        validators=[validate_rsa_key],
+    )
+    lti_1p3_public_jwk = models.JSONField(
+        "LTI 1.3 Public JWK",
+        default=dict,
+        blank=True,
+        help_text=_("Platform's generated JWK keyset. This will be generated automatically, no need to fill out."),
+    )
+    lti_1p3_public_jwk_etag = models.CharField(
+        "LTI 1.3 Public JWK ETag",
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text=_("Hash of the public JWK keyset, served as its ETag."),
+    )
 
+    # Fields the public JWK is generated from.
+    JWK_SOURCE_FIELDS = ("lti_1p3_private_key", "lti_1p3_private_key_id")
+
+    # Field values as loaded from the database, None for new instances.
+    _loaded_values = None
+
+    def __str__(self):
+        return f"<ExternalLtiKeyMaterial #{self.pk}>"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.reset_loaded_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self.reset_loaded_values()
+
+    def _get_values(self):
+        # Read the instance dict directly, so deferred fields aren't loaded.
+        return {field: self.__dict__.get(field) for field in KEY_MATERIAL_FIELDS}
+
+    def reset_loaded_values(self):
+        """Consider the current values as the ones stored in the database."""
+        self._loaded_values = self._get_values()
+
+    def has_changed(self):
+        """Return True if any field changed since the instance was loaded."""
+        return self._loaded_values is None or self._loaded_values != self._get_values()
+
+    def has_key_material_changed(self):
+        """Return True if the fields the public JWK depends on changed since the instance was loaded."""
+        if self._loaded_values is None:
+            return True
+        values = self._get_values()
+        return any(
+            self._loaded_values[field] != values[field]
+            for field in self.JWK_SOURCE_FIELDS
+        )
+
+    def get_loaded_key(self):
+        """Return the `(private_key, kid)` pair loaded from the database, if any."""
+        if self._loaded_values is None:
+            return None
+        key = tuple(self._loaded_values[field] for field in self.JWK_SOURCE_FIELDS)
+        return key if all(key) else None
+
+    def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
+        self.reset_loaded_values()
+
+
+class ExternalLtiConfigurationPayload(models.Model):
+    """
+    Precomputed payload of a configuration (see `lti_store.payload`).
+
+    Payloads hold the key material of the configurations, so like it they are
+    kept out of their table, and only read by the lookups.
+    """
+
+    configuration = models.OneToOneField(
+        ExternalLtiConfiguration,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="payload",
+    )
+    # Serialized configuration, read by the lookups instead of its fields.
+    data = models.BinaryField()
+    # Version of the serialized fields, to detect stale payloads.
+    version = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"<ExternalLtiConfigurationPayload #{self.pk}>"
+
+
+class PlatformKeyQuerySet(models.QuerySet):
+    """
+    Queries on the platform keys.
+
+    Settings:
+
+        LTI_STORE_KEY_ROTATION_OVERLAP: How long retired keys stay published in
+            the public JWK, in seconds (86400).
+    """
+
+    def _retired_before(self):
+        overlap = getattr(settings, "LTI_STORE_KEY_ROTATION_OVERLAP", 86400)
+        return timezone.now() - timedelta(seconds=overlap)
+
+    def published(self):
+        """Keys in use, and retired keys still in their overlap window."""
+        return self.exclude(
+            state=LtiPlatformKey.State.RETIRED, retired_at__lt=self._retired_before()
+        ).order_by("created", "pk")
+
+    def expired(self):
+        """Retired keys whose overlap window is over."""
+        return self.filter(
+            state=LtiPlatformKey.State.RETIRED, retired_at__lt=self._retired_before()
+        )
+
+
+class LtiPlatformKey(models.Model):
+    """
+    Platform key of a LTI 1.3 configuration.
+
+    The active key signs the launches, and is mirrored in the private key fields
+    of the configuration. The next key is published ahead of its activation, and
+    retired keys stay published during the overlap window before being deleted.
+    """
+
+    class State(models.TextChoices):
+        ACTIVE = "active", _("Active")
+        NEXT = "next", _("Next")
+        RETIRED = "retired", _("Retired")
+
+    configuration = models.ForeignKey(
+        ExternalLtiConfiguration,
+        on_delete=models.CASCADE,
+        related_name="platform_keys",
+    )
+    state = models.CharField(max_length=10, choices=State.choices)
+    private_key = models.TextField()
+    private_key_id = models.CharField(max_length=255)
+    created = models.DateTimeField(auto_now_add=True)
+    retired_at = models.DateTimeField(null=True, blank=True)
+
+    objects = PlatformKeyQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["configuration", "private_key_id"],
+                name="unique_platform_key_id",
+            ),
+        ]
+
+    def __str__(self):
+        return f"<LtiPlatformKey #{self.id}: {self.private_key_id} ({self.state})>"
+
+
+class TombstoneManager(models.Manager):
+    """Manager of the configuration tombstones."""
+
+    def record(self, slug):
+        """Record that the configuration with the given slug is gone."""
+        self.update_or_create(slug=slug, defaults={"deleted": timezone.now()})
+
+    def deleted_since(self, since):
+        """Tombstones recorded at or after `since`, of slugs no configuration uses again."""
+        return self.filter(deleted__gte=since).exclude(
+            slug__in=ExternalLtiConfiguration.objects.values("slug")
+        )
+
+
+class LtiConfigurationTombstone(models.Model):
+    """
+    Record of a deleted, or renamed, configuration.
+
+    Lets the nodes syncing the configurations incrementally remove their copies
+    (see `lti_store.api.get_changes`).
+    """
+
+    slug = models.SlugField(max_length=80, unique=True)
+    deleted = models.DateTimeField(default=timezone.now, db_index=True)
+
+    objects = TombstoneManager()
+
+    def __str__(self):
+        return f"<LtiConfigurationTombstone: {self.slug}>"
@@ -0,0 +1,48 @@
+"""
+Precomputed payloads of the configurations.
+
+The serialized form of every configuration, without its ID, is stored as JSON
+bytes in `ExternalLtiConfigurationPayload`, written by `save()` and the bulk
+writes. The lookups only read and decode it, instead of loading the configuration
+and its key material and serializing them. Partial writes (`save(update_fields=...)`,
+`bulk_update()`) compute it from the stored configuration, since the fields they
+leave out may differ in memory.
+
+Payloads are encoded with orjson when it is installed, and with the standard
+json module otherwise; both decode each other's payloads. Their version is
+derived from the serialized fields, so the payloads stored before a field was
+added or removed are detected as stale, and rebuilt by the lookups until they
+are refreshed (see the `lti_store_refresh_payloads` management command).
+"""
+
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# Bump when the encoding of the payloads changes.
+PAYLOAD_FORMAT = 1
+
+
+def get_payload_version(fields):
+    """Return the version of the payloads holding the given fields."""
+    signature = ",".join([str(PAYLOAD_FORMAT), *sorted(fields)])
+    return zlib.crc32(signature.encode()) & 0x7FFFFFFF
+
+
+def encode_payload(serialized):
+    """Return a serialized configuration encoded as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(serialized)
+    return json.dumps(serialized, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def decode_payload(payload):
+    """Return the serialized configuration of a payload."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    # Some database drivers return binary columns as memoryviews.
+    return json.loads(bytes(payload))
@@ -1,11 +1,29 @@
 from typing import Dict
 
-from django.forms.models import model_to_dict
-
 from openedx_filters import PipelineStep
 
-from lti_store.models import ExternalLtiConfiguration
+from lti_store.api import (
+    aget_all_configurations,
+    aget_changes,
+    aget_configuration,
+    aget_configuration_summaries,
+    get_all_configurations,
+    get_changes,
+    get_configuration,
+    get_configuration_summaries,
+    parse_config_id,
+)
 from lti_store.apps import LtiStoreConfig
+from lti_store.instrumentation import (
+    MODE_LIST,
+    MODE_SINGLE,
+    MODE_SUMMARY,
+    MODE_SYNC,
+    ameasure_lookup,
+    measure_lookup,
+)
+from lti_store.routers import replica_reads
+from lti_store.snapshot import get_snapshot
 
 
 class GetLtiConfigurations(PipelineStep):
@@ -24,6 +42,26 @@ class GetLtiConfigurations(PipelineStep):
                 ]
             }
         }
+
+    When listing the configurations, callers only needing to show the tools
+    (e.g. the Studio tool picker) can pass `summary=True`, either as a filter
+    argument or in the context, to only get their slug, name and version.
+
+    Nodes keeping copies of the configurations can pass the cursor returned by
+    their previous call as `since` to only get the configurations changed since
+    then. The next cursor and the config IDs deleted since then are returned in
+    `context["lti_store_sync"]` (see `lti_store.api.get_changes`).
+
+    ASGI deployments can await `arun_filter`, which performs the same lookups
+    through Django's async ORM and the async cache API.
+
+    The lookups read from the replica configured for `lti_store.routers`, if any.
+    When `LTI_STORE_SNAPSHOT_PATH` is set, they are served from that snapshot file
+    instead, without database access, except for the `since` lookups
+    (see `lti_store.snapshot`).
+
+    Lookups can be measured by configuring `LTI_STORE_INSTRUMENTATION`
+    (see `lti_store.instrumentation`).
     """
 
     PLUGIN_PREFIX = LtiStoreConfig.name
@@ -31,25 +69,104 @@ class GetLtiConfigurations(PipelineStep):
     def run_filter(
         self, context: Dict, config_id: str, configurations: Dict, *args, **kwargs
     ):  # pylint: disable=arguments-differ, unused-argument
-        config = {}
-        if config_id:
-            _slug = config_id.split(":")[1]
-            try:
-                config_object = ExternalLtiConfiguration.objects.get(slug=_slug)
-                config = {
-                    f"{self.PLUGIN_PREFIX}:{config_object.slug}": model_to_dict(
-                        config_object
+        summary = self._get_option("summary", context, kwargs, False)
+        since = self._get_option("since", context, kwargs)
+        sync = None
+        with replica_reads(), measure_lookup(
+            self._get_mode(config_id, summary, since)
+        ) as lookup:
+            snapshot = get_snapshot() if since is None else None
+            if snapshot is not None:
+                config = self._lookup_snapshot(snapshot, config_id, summary)
+            elif config_id:
+                _slug = parse_config_id(config_id)
+                config = self._format_single(
+                    _slug, get_configuration(_slug) if _slug else None
+                )
+            elif since is not None:
+                sync = get_changes(since, summary=summary)
+                config = self._format_listing(sync["configurations"])
+            else:
+                config = self._format_listing(
+                    get_configuration_summaries()
+                    if summary
+                    else get_all_configurations()
+                )
+            lookup.count = len(config)
+
+        return self._build_result(context, config_id, configurations, config, sync)
+
+    async def arun_filter(
+        self, context: Dict, config_id: str, configurations: Dict, *args, **kwargs
+    ):  # pylint: disable=unused-argument
+        """Async version of `run_filter`."""
+        summary = self._get_option("summary", context, kwargs, False)
+        since = self._get_option("since", context, kwargs)
+        sync = None
+        with replica_reads():
+            async with ameasure_lookup(
+                self._get_mode(config_id, summary, since)
+            ) as lookup:
+                snapshot = get_snapshot() if since is None else None
+                if snapshot is not None:
+                    config = self._lookup_snapshot(snapshot, config_id, summary)
+                elif config_id:
+                    _slug = parse_config_id(config_id)
+                    config = self._format_single(
+                        _slug, await aget_configuration(_slug) if _slug else None
                     )
-                }
-            except ExternalLtiConfiguration.DoesNotExist:
-                config = {}
-        else:
-            config_objs = ExternalLtiConfiguration.objects.all()
-            config = {
-                f"{self.PLUGIN_PREFIX}:{c.slug}": model_to_dict(c) for c in config_objs
-            }
+                elif since is not None:
+                    sync = await aget_changes(since, summary=summary)
+                    config = self._format_listing(sync["configurations"])
+                else:
+                    config = self._format_listing(
+                        await aget_configuration_summaries()
+                        if summary
+                        else await aget_all_configurations()
+                    )
+                lookup.count = len(config)
+
+        return self._build_result(context, config_id, configurations, config, sync)
+
+    @staticmethod
+    def _get_option(name, context, kwargs, default=None):
+        """Return an option passed as a filter argument or in the context."""
+        return kwargs.get(name, (context or {}).get(name, default))
+
+    @staticmethod
+    def _get_mode(config_id, summary, since):
+        if config_id:
+            return MODE_SINGLE
+        if since is not None:
+            return MODE_SYNC
+        return MODE_SUMMARY if summary else MODE_LIST
 
+    def _lookup_snapshot(self, snapshot, config_id, summary):
+        if config_id:
+            _slug = parse_config_id(config_id)
+            return self._format_single(_slug, snapshot.get(_slug) if _slug else None)
+        return self._format_listing(snapshot.summaries() if summary else snapshot.all())
+
+    def _format_single(self, slug, serialized):
+        if serialized is None:
+            return {}
+        return {f"{self.PLUGIN_PREFIX}:{slug}": serialized}
+
+    def _format_listing(self, listing):
+        return {f"{self.PLUGIN_PREFIX}:{c['slug']}": c for c in listing}
+
+    def _build_result(self, context, config_id, configurations, config, sync=None):
         configurations.update(config)
+        if sync is not None:
+            context = {
+                **(context or {}),
+                "lti_store_sync": {
+                    "cursor": sync["cursor"],
+                    "deleted": [
+                        f"{self.PLUGIN_PREFIX}:{slug}" for slug in sync["deleted"]
+                    ],
+                },
+            }
         return {
             "configurations": configurations,
             "config_id": config_id,
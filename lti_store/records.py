@@ -0,0 +1,110 @@
+"""
+Immutable records of the resolved configurations.
+
+The configurations are cached as `ConfigurationRecord`s, built once per cache
+fill and handed out to every caller as is, instead of a copy of a dict per
+call. A record is a read-only dict, so callers indexing the configurations like
+dicts, or serializing them as JSON, keep working. Their nested dicts and lists
+(e.g. the public JWK) are read-only as well, since they are shared too.
+"""
+
+
+def _immutable(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is immutable")
+
+
+def freeze(value):
+    """Return a read-only version of a value, freezing the dicts and lists it holds."""
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, dict):
+        # Empty containers are shared, e.g. by the LTI 1.1 configurations.
+        return FrozenDict(value) if value else EMPTY_DICT
+    if isinstance(value, list):
+        return FrozenList(value) if value else EMPTY_LIST
+    return value
+
+
+def thaw(value):
+    """Return a mutable copy of a value frozen by `freeze`."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
+
+
+class FrozenDict(dict):
+    """Read-only dict, whose nested dicts and lists are read-only too."""
+
+    __slots__ = ()
+
+    # Keys whose values may be dicts or lists, None if any value may be.
+    nested_fields = None
+
+    def __init__(self, fields=()):
+        super().__init__(fields)
+        # Copied as is, only the dicts and lists held are replaced.
+        keys = dict.keys(self) if self.nested_fields is None else self.nested_fields
+        for key in keys:
+            value = dict.get(self, key)
+            if isinstance(value, (dict, list)):
+                dict.__setitem__(self, key, freeze(value))
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def copy(self):
+        """Return a mutable copy, including the nested dicts and lists."""
+        return thaw(self)
+
+    to_dict = copy
+
+
+class FrozenList(list):
+    """Read-only list, whose nested dicts and lists are read-only too."""
+
+    __slots__ = ()
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        for index, item in enumerate(list.__iter__(self)):
+            if isinstance(item, (dict, list)):
+                list.__setitem__(self, index, freeze(item))
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = clear = extend = insert = pop = remove = reverse = sort = _immutable
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)!r})"
+
+    def copy(self):
+        """Return a mutable copy, including the nested dicts and lists."""
+        return thaw(self)
+
+
+EMPTY_DICT = FrozenDict()
+EMPTY_LIST = FrozenList()
+
+
+class ConfigurationRecord(FrozenDict):
+    """
+    Read-only dict of the fields of a configuration to their values.
+
+    Use `to_dict()` or `copy()` to get a mutable copy.
+    """
+
+    __slots__ = ()
+
+    # Only the JSON fields of a configuration hold dicts and lists, so the other
+    # fields aren't checked on every cache fill.
+    nested_fields = ("lti_1p3_redirect_uris", "lti_1p3_public_jwk")
@@ -0,0 +1,139 @@
+"""
+Routing of the LTI store reads to a read replica.
+
+Configure the replica alias and add the router to the database routers:
+
+    LTI_STORE_REPLICA_DATABASE = "read_replica"
+    DATABASE_ROUTERS = [..., "lti_store.routers.LtiStoreReplicaRouter"]
+
+Only the reads made within `replica_reads()` go to the replica, which the
+`GetLtiConfigurations` pipeline step does for its lookups. Everything else,
+like the admin or the management commands, keeps reading from the primary.
+
+Once a write to the configurations is committed, reads stick to the primary for
+`LTI_STORE_REPLICA_STICKY_SECONDS`, in every process sharing the configuration
+cache, so the cache isn't filled with rows the replica doesn't have yet. The
+writes are detected by the signal receivers invalidating the cache (see
+`pin_primary()`), so the router itself has no side effect. When
+the replica can't be connected to, reads fall back to the primary and the
+replica isn't tried again for `LTI_STORE_REPLICA_RETRY_SECONDS`.
+"""
+
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, router
+
+from lti_store.cache import configuration_cache
+
+log = logging.getLogger(__name__)
+
+# Models holding the configurations, read together by the lookups.
+ROUTED_MODELS = {
+    "externallticonfiguration",
+    "externallticonfigurationpayload",
+    "externalltikeymaterial",
+}
+PRIMARY_PIN_KEY = "lti_store:primary-pinned"
+
+DEFAULT_STICKY_SECONDS = 5
+DEFAULT_RETRY_SECONDS = 30
+
+_replica_reads = contextvars.ContextVar("lti_store_replica_reads", default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Send the configuration reads made within this block to the replica."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class LtiStoreReplicaRouter:
+    """Database router sending the configuration lookups to a read replica."""
+
+    def __init__(self):
+        self._pinned_until = 0
+        self._replica_down_until = 0
+
+    @property
+    def replica(self):
+        return getattr(settings, "LTI_STORE_REPLICA_DATABASE", None)
+
+    @property
+    def primary(self):
+        return getattr(settings, "LTI_STORE_PRIMARY_DATABASE", DEFAULT_DB_ALIAS)
+
+    def _is_routed(self, model):
+        return (
+            self.replica is not None
+            and model._meta.app_label == "lti_store"
+            and model._meta.model_name in ROUTED_MODELS
+        )
+
+    def pin_primary(self):
+        """Stick the reads to the primary, in every process, for the sticky window."""
+        sticky_seconds = getattr(
+            settings, "LTI_STORE_REPLICA_STICKY_SECONDS", DEFAULT_STICKY_SECONDS
+        )
+        self._pinned_until = time.monotonic() + sticky_seconds
+        configuration_cache.shared.set(PRIMARY_PIN_KEY, True, timeout=sticky_seconds)
+
+    def is_primary_pinned(self):
+        if time.monotonic() < self._pinned_until:
+            return True
+        return configuration_cache.shared.get(PRIMARY_PIN_KEY) is not None
+
+    def is_replica_available(self):
+        if time.monotonic() < self._replica_down_until:
+            return False
+        try:
+            connections[self.replica].ensure_connection()
+        except DatabaseError:
+            log.warning(
+                "LTI store replica %r is unavailable, reading from the primary.",
+                self.replica,
+                exc_info=True,
+            )
+            self._replica_down_until = time.monotonic() + getattr(
+                settings, "LTI_STORE_REPLICA_RETRY_SECONDS", DEFAULT_RETRY_SECONDS
+            )
+            return False
+        return True
+
+    def db_for_read(self, model, **hints):
+        if not self._is_routed(model):
+            return None
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # Related objects are read from the database of their instance.
+            return instance._state.db
+        if not _replica_reads.get():
+            return None
+        if self.is_primary_pinned() or not self.is_replica_available():
+            return self.primary
+        return self.replica
+
+    def db_for_write(self, model, **hints):  # pylint: disable=unused-argument
+        if not self._is_routed(model):
+            return None
+        # Instances read from the replica are still written to the primary.
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):  # pylint: disable=unused-argument
+        if self._is_routed(type(obj1)) and self._is_routed(type(obj2)):
+            return True
+        return None
+
+
+def pin_primary():
+    """Stick the reads to the primary after a write, if the router is installed."""
+    for db_router in router.routers:
+        if isinstance(db_router, LtiStoreReplicaRouter) and db_router.replica:
+            db_router.pin_primary()
@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from lti_store.cache import configuration_cache
+from lti_store.keys import parsed_key_cache
+from lti_store.models import (
+    ExternalLtiConfiguration,
+    ExternalLtiConfigurationPayload,
+    ExternalLtiKeyMaterial,
+    LtiConfigurationTombstone,
+)
+from lti_store.routers import pin_primary
+
+
+@receiver(post_save, sender=ExternalLtiConfiguration)
+@receiver(post_delete, sender=ExternalLtiConfiguration)
+@receiver(post_save, sender=ExternalLtiKeyMaterial)
+@receiver(post_delete, sender=ExternalLtiKeyMaterial)
+def invalidate_configuration_cache(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate cached configurations and keys whenever one of them changes.
+
+    Once the change is committed, the lookups also stick to the primary database
+    for a while, when they are routed to a read replica (see `lti_store.routers`).
+    """
+    configuration_cache.invalidate()
+    parsed_key_cache.clear()
+    # Invalidate again once the change is visible to other connections, in case
+    # a concurrent request cached the old value in between.
+    transaction.on_commit(configuration_cache.invalidate)
+    transaction.on_commit(pin_primary, using=kwargs.get("using"))
+
+
+@receiver(post_save, sender=ExternalLtiKeyMaterial)
+@receiver(post_delete, sender=ExternalLtiKeyMaterial)
+def clear_configuration_payload(
+    sender, instance, using, **kwargs
+):  # pylint: disable=unused-argument
+    """
+    Clear the payload of a configuration when its key material is written.
+
+    The payload holds the key material, it is rebuilt on read, or by the
+    configuration when the key material is saved along with it.
+    """
+    ExternalLtiConfigurationPayload.objects.using(using).filter(
+        configuration_id=instance.pk
+    ).delete()
+
+
+@receiver(post_delete, sender=ExternalLtiConfiguration)
+def record_tombstone(
+    sender, instance, using, **kwargs
+):  # pylint: disable=unused-argument
+    """Record deleted configurations, for the nodes syncing them incrementally."""
+    LtiConfigurationTombstone.objects.db_manager(using).record(instance.slug)
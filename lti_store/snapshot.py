@@ -0,0 +1,235 @@
+"""
+Read-only snapshot of the configurations, served without database access.
+
+The `lti_store_write_snapshot` management command compiles every configuration
+into a single file:
+
+    header | configuration records | index
+
+The header holds the format of the records and where the index starts. The
+index maps every slug to the offset and length of its record, along with its
+summary. Workers memory-map the file and only decode the index and the records
+they look up.
+
+When `LTI_STORE_SNAPSHOT_PATH` is set, `GetLtiConfigurations` serves the
+configurations from the snapshot instead of the database. The file is written
+to a temporary file and renamed over the previous one, and workers reload it
+when it changes, checking at most every `LTI_STORE_SNAPSHOT_CHECK_INTERVAL`
+seconds (1).
+
+The snapshot holds the private keys and shared secrets of the configurations,
+so it is only readable by its owner, unless `LTI_STORE_SNAPSHOT_FILE_MODE` says
+otherwise (0o600).
+
+Records are encoded as compact JSON, or with msgpack when it is installed.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from lti_store.api import serialize_configuration
+from lti_store.models import ExternalLtiConfiguration
+from lti_store.records import ConfigurationRecord
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"LTISNAP"
+FORMAT_JSON = "json"
+FORMAT_MSGPACK = "msgpack"
+FORMAT_CODES = {FORMAT_JSON: b"j", FORMAT_MSGPACK: b"m"}
+# Magic, format code, index offset and index length.
+HEADER = struct.Struct(">7scQQ")
+
+DEFAULT_CHECK_INTERVAL = 1
+DEFAULT_FILE_MODE = 0o600
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot can't be written or read."""
+
+
+def _get_codec(snapshot_format):
+    """Return the `(encode, decode)` functions of a snapshot format."""
+    if snapshot_format == FORMAT_JSON:
+        return (
+            lambda value: json.dumps(
+                value, separators=(",", ":"), cls=DjangoJSONEncoder
+            ).encode(),
+            json.loads,
+        )
+    if snapshot_format == FORMAT_MSGPACK:
+        if msgpack is None:
+            raise SnapshotError("The msgpack format requires the msgpack package.")
+        return (
+            lambda value: msgpack.packb(value, use_bin_type=True, default=str),
+            lambda data: msgpack.unpackb(data, raw=False),
+        )
+    raise SnapshotError(f"Unknown snapshot format: {snapshot_format!r}.")
+
+
+def write_snapshot(path, snapshot_format=FORMAT_JSON):
+    """
+    Write a snapshot of every configuration to `path`, returning their number.
+
+    The snapshot is written next to `path` and renamed over it once complete,
+    so readers never see a partial file.
+    """
+    encode, _ = _get_codec(snapshot_format)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".lti_store_snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as output:
+            output.write(bytes(HEADER.size))
+            entries = []
+            offset = HEADER.size
+            configs = ExternalLtiConfiguration.objects.with_key_material().order_by(
+                "pk"
+            )
+            for config in configs.iterator():
+                record = encode(serialize_configuration(config))
+                output.write(record)
+                entries.append(
+                    [config.slug, offset, len(record), config.name, config.version]
+                )
+                offset += len(record)
+            index = encode({"configurations": entries})
+            output.write(index)
+            output.seek(0)
+            output.write(
+                HEADER.pack(MAGIC, FORMAT_CODES[snapshot_format], offset, len(index))
+            )
+            output.flush()
+            os.fsync(output.fileno())
+        os.chmod(
+            temp_path,
+            getattr(settings, "LTI_STORE_SNAPSHOT_FILE_MODE", DEFAULT_FILE_MODE),
+        )
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return len(entries)
+
+
+class Snapshot:
+    """Memory-mapped snapshot file, decoding the records on demand."""
+
+    def __init__(self, path):
+        with open(path, "rb") as snapshot_file:
+            self.stat = os.fstat(snapshot_file.fileno())
+            try:
+                self._mmap = mmap.mmap(
+                    snapshot_file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            except ValueError as exc:
+                raise SnapshotError(f"Empty snapshot file: {path}.") from exc
+
+        try:
+            magic, code, index_offset, index_length = HEADER.unpack_from(self._mmap)
+        except struct.error as exc:
+            raise SnapshotError(f"Truncated snapshot file: {path}.") from exc
+        formats = {code: name for name, code in FORMAT_CODES.items()}
+        if magic != MAGIC or code not in formats:
+            raise SnapshotError(f"Not a snapshot file: {path}.")
+        _, self._decode = _get_codec(formats[code])
+
+        try:
+            index = self._decode(self._mmap[index_offset : index_offset + index_length])
+        except ValueError as exc:
+            raise SnapshotError(f"Corrupted snapshot index: {path}.") from exc
+        self._records = {}
+        self._summaries = []
+        for slug, offset, length, name, version in index["configurations"]:
+            self._records[slug] = (offset, length)
+            self._summaries.append(
+                ConfigurationRecord({"slug": slug, "name": name, "version": version})
+            )
+
+    def __len__(self):
+        return len(self._records)
+
+    def _read(self, offset, length):
+        return ConfigurationRecord(self._decode(self._mmap[offset : offset + length]))
+
+    def get(self, slug):
+        """Return the serialized configuration with the given slug, or None."""
+        record = self._records.get(slug)
+        return None if record is None else self._read(*record)
+
+    def all(self):
+        """Return the list of every serialized configuration."""
+        return [self._read(*record) for record in self._records.values()]
+
+    def summaries(self):
+        """Return the list of every configuration summary."""
+        return list(self._summaries)
+
+
+class SnapshotLoader:
+    """Load the configured snapshot, reloading it when the file changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget the loaded snapshot."""
+        self._path = None
+        self._snapshot = None
+        self._next_check = 0
+
+    def get(self):
+        """Return the current `Snapshot`, or None if there's none to serve from."""
+        path = getattr(settings, "LTI_STORE_SNAPSHOT_PATH", None)
+        if not path:
+            return None
+        if path == self._path and time.monotonic() < self._next_check:
+            return self._snapshot
+
+        with self._lock:
+            if path != self._path:
+                self._path = path
+                self._snapshot = None
+            self._next_check = time.monotonic() + getattr(
+                settings, "LTI_STORE_SNAPSHOT_CHECK_INTERVAL", DEFAULT_CHECK_INTERVAL
+            )
+            self._reload_if_changed(path)
+            return self._snapshot
+
+    def _reload_if_changed(self, path):
+        try:
+            stat = os.stat(path)
+            current = self._snapshot
+            if current is not None and (
+                (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+                == (current.stat.st_ino, current.stat.st_mtime_ns, current.stat.st_size)
+            ):
+                return
+            # Readers still holding the previous snapshot keep their mapping.
+            self._snapshot = Snapshot(path)
+        except (OSError, SnapshotError):
+            # Keep serving the last snapshot loaded, if any.
+            log.warning("Could not load the snapshot %r.", path, exc_info=True)
+
+
+snapshot_loader = SnapshotLoader()
+
+
+def get_snapshot():
+    """Return the snapshot to serve the configurations from, if one is configured."""
+    return snapshot_loader.get()
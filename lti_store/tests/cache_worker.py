@@ -0,0 +1,26 @@
+"""
+Worker process of the cross-process cache tests.
+
+Kept apart from the test modules, which can't be imported before Django is set up.
+"""
+
+
+def run_worker(cache_location, requests, responses):
+    """Resolve a key once per request read from `requests`, until None is read."""
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+
+    settings.configure(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": cache_location,
+            }
+        },
+    )
+    from lti_store.cache import ConfigurationCache, request_memo
+
+    configuration_cache = ConfigurationCache()
+    for value in iter(requests.get, None):
+        with request_memo():
+            responses.put(configuration_cache.get("key", lambda: value))
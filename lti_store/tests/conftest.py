@@ -0,0 +1,22 @@
+import pytest
+from django.core.cache import cache
+
+from lti_store.cache import configuration_cache
+from lti_store.keys import key_memo, parsed_key_cache
+from lti_store.snapshot import snapshot_loader
+
+
+@pytest.fixture(autouse=True)
+def clear_configuration_cache():
+    """Make sure no test sees configurations, keys or snapshots cached by another one."""
+    cache.clear()
+    configuration_cache.reset()
+    key_memo.clear()
+    parsed_key_cache.clear()
+    snapshot_loader.reset()
+    yield
+    cache.clear()
+    configuration_cache.reset()
+    key_memo.clear()
+    parsed_key_cache.clear()
+    snapshot_loader.reset()
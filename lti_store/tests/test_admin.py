@@ -0,0 +1,111 @@
+from Cryptodome.PublicKey import RSA
+from django.test import TestCase
+
+from lti_store.admin import LtiConfigurationForm
+from lti_store.api import get_configuration
+from lti_store.models import (
+    ExternalLtiConfiguration,
+    ExternalLtiKeyMaterial,
+    LTIAdvantageAGS,
+    LTIVersion,
+)
+
+KEY_OBJ = RSA.generate(2048)
+PRIVATE_KEY = KEY_OBJ.export_key().decode()
+PUBLIC_KEY = KEY_OBJ.publickey().export_key().decode()
+
+
+def get_form_data(**fields):
+    return {
+        "name": "Tool",
+        "slug": "tool",
+        "version": LTIVersion.LTI_1P1,
+        "lti_1p1_launch_url": "http://tool.example.com/launch",
+        "lti_1p1_client_key": "key",
+        "lti_1p1_client_secret": "secret",
+        "lti_1p3_redirect_uris": "",
+        "lti_advantage_ags_mode": LTIAdvantageAGS.DECLARATIVE,
+        **fields,
+    }
+
+
+class TestLtiConfigurationForm(TestCase):
+    def test_blank_redirect_uris_are_saved_as_an_empty_list(self):
+        form = LtiConfigurationForm(data=get_form_data())
+
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        config = ExternalLtiConfiguration.objects.get(slug="tool")
+        self.assertEqual(config.lti_1p3_redirect_uris, [])
+
+    def test_redirect_uris(self):
+        form = LtiConfigurationForm(
+            data=get_form_data(lti_1p3_redirect_uris='["https://tool.example.com"]')
+        )
+
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(
+            form.save().lti_1p3_redirect_uris, ["https://tool.example.com"]
+        )
+
+    def create_lti_1p3_configuration(self):
+        form = LtiConfigurationForm(
+            data=get_form_data(
+                version=LTIVersion.LTI_1P3,
+                lti_1p3_private_key=PRIVATE_KEY,
+                lti_1p3_private_key_id="kid",
+                lti_1p3_tool_public_key=PUBLIC_KEY,
+            )
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        with self.captureOnCommitCallbacks(execute=True):
+            return form.save()
+
+    def test_key_material_is_saved(self):
+        self.create_lti_1p3_configuration()
+
+        key_material = ExternalLtiKeyMaterial.objects.get(configuration__slug="tool")
+        self.assertEqual(key_material.lti_1p3_private_key, PRIVATE_KEY)
+        self.assertEqual(key_material.lti_1p3_private_key_id, "kid")
+        self.assertEqual(key_material.lti_1p3_tool_public_key, PUBLIC_KEY)
+        self.assertEqual(key_material.lti_1p3_public_jwk["keys"][0]["kid"], "kid")
+
+    def test_key_material_is_shown_when_editing(self):
+        config = self.create_lti_1p3_configuration()
+
+        form = LtiConfigurationForm(
+            instance=ExternalLtiConfiguration.objects.get(pk=config.pk)
+        )
+
+        self.assertEqual(form.initial["lti_1p3_private_key"], PRIVATE_KEY)
+        self.assertEqual(form.initial["lti_1p3_private_key_id"], "kid")
+        self.assertEqual(form.initial["lti_1p3_tool_public_key"], PUBLIC_KEY)
+
+    def test_edited_key_material_is_saved_and_invalidates_the_configuration(self):
+        config = self.create_lti_1p3_configuration()
+        self.assertEqual(get_configuration("tool")["lti_1p3_private_key_id"], "kid")
+        new_private_key = RSA.generate(2048).export_key().decode()
+        instance = ExternalLtiConfiguration.objects.get(pk=config.pk)
+        data = get_form_data(
+            version=LTIVersion.LTI_1P3,
+            lti_1p3_client_id=instance.lti_1p3_client_id,
+            lti_1p3_private_key=new_private_key,
+            lti_1p3_private_key_id="new-kid",
+            lti_1p3_tool_public_key=PUBLIC_KEY,
+        )
+
+        form = LtiConfigurationForm(data=data, instance=instance)
+        self.assertTrue(form.is_valid(), form.errors)
+        with self.captureOnCommitCallbacks(execute=True):
+            form.save()
+
+        key_material = ExternalLtiKeyMaterial.objects.get(configuration=config)
+        self.assertEqual(key_material.lti_1p3_private_key_id, "new-kid")
+        self.assertEqual(key_material.lti_1p3_tool_public_key, PUBLIC_KEY)
+        self.assertIn(
+            "new-kid", [key["kid"] for key in key_material.lti_1p3_public_jwk["keys"]]
+        )
+        configuration = get_configuration("tool")
+        self.assertEqual(configuration["lti_1p3_private_key_id"], "new-kid")
+        self.assertEqual(configuration["lti_1p3_private_key"], new_private_key)
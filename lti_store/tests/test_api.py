@@ -0,0 +1,235 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+from asgiref.sync import ThreadSensitiveContext, async_to_sync
+
+from Cryptodome.PublicKey import RSA
+from ddt import data, ddt, unpack
+from django.db.models.query import QuerySet
+from django.test import TestCase, TransactionTestCase
+from jwkest.jwk import RSAKey
+
+from lti_store.api import (
+    aget_all_configurations,
+    aget_configuration,
+    aget_configuration_summaries,
+    get_configurations,
+    get_platform_signing_key,
+    get_tool_public_key,
+    parse_config_id,
+)
+from lti_store.apps import LtiStoreConfig as App
+from lti_store.cache import configuration_cache
+from lti_store.models import ExternalLtiConfiguration, LTIVersion
+
+PLATFORM_KEY = RSA.generate(2048)
+TOOL_KEY = RSA.generate(2048)
+
+
+@ddt
+class TestParseConfigId(TestCase):
+    @data(
+        (f"{App.name}:test", "test"),
+        ("test", None),
+        (f"{App.name}:", None),
+        ("", None),
+    )
+    @unpack
+    def test_parse_config_id(self, config_id, slug):
+        self.assertEqual(parse_config_id(config_id), slug)
+
+
+class TestGetConfigurations(TestCase):
+    def setUp(self):
+        super().setUp()
+        for slug in ("first", "second", "third"):
+            ExternalLtiConfiguration.objects.create(name=slug.title(), slug=slug)
+
+    def test_configurations_are_resolved_with_a_single_query(self):
+        config_ids = [f"{App.name}:third", f"{App.name}:first", f"{App.name}:second"]
+
+        with self.assertNumQueries(1):
+            configurations, missing = get_configurations(config_ids)
+
+        self.assertEqual(list(configurations), config_ids)
+        self.assertEqual(configurations[f"{App.name}:first"]["name"], "First")
+        self.assertEqual(missing, [])
+
+    def test_missing_and_malformed_config_ids_are_reported(self):
+        config_ids = [
+            f"{App.name}:unknown",
+            f"{App.name}:first",
+            "malformed",
+            f"{App.name}:unknown",
+        ]
+
+        configurations, missing = get_configurations(config_ids)
+
+        self.assertEqual(list(configurations), [f"{App.name}:first"])
+        self.assertEqual(missing, [f"{App.name}:unknown", "malformed"])
+
+    def test_only_uncached_configurations_are_queried(self):
+        get_configurations([f"{App.name}:first"])
+        configuration_cache.local.clear()
+
+        with self.assertNumQueries(1):
+            configurations, _ = get_configurations(
+                [f"{App.name}:first", f"{App.name}:second"]
+            )
+        with self.assertNumQueries(0):
+            get_configurations([f"{App.name}:first", f"{App.name}:second"])
+
+        self.assertEqual(len(configurations), 2)
+        self.assertEqual(
+            configuration_cache.stats(),
+            {"request_hits": 0, "local_hits": 2, "shared_hits": 1, "misses": 2},
+        )
+
+    def test_empty_input_does_not_query(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(get_configurations([]), ({}, []))
+
+
+class TestAsyncLookups(TestCase):
+    def setUp(self):
+        super().setUp()
+        for slug in ("first", "second"):
+            ExternalLtiConfiguration.objects.create(name=slug.title(), slug=slug)
+
+    async def test_aget_configuration(self):
+        config = await aget_configuration("first")
+
+        self.assertEqual(config["name"], "First")
+        self.assertIn("lti_1p3_private_key", config)
+        self.assertIsNone(await aget_configuration("unknown"))
+
+    async def test_aget_all_configurations(self):
+        configs = await aget_all_configurations()
+
+        self.assertEqual([c["slug"] for c in configs], ["first", "second"])
+
+    async def test_aget_configuration_summaries(self):
+        self.assertEqual(
+            await aget_configuration_summaries(),
+            [
+                {"slug": "first", "name": "First", "version": "lti_1p1"},
+                {"slug": "second", "name": "Second", "version": "lti_1p1"},
+            ],
+        )
+
+    def test_async_lookups_share_the_cache_with_sync_ones(self):
+        async_to_sync(aget_configuration)("first")
+
+        with self.assertNumQueries(0):
+            configs, _ = get_configurations([f"{App.name}:first"])
+        self.assertEqual(configs[f"{App.name}:first"]["name"], "First")
+
+
+class TestConcurrentAsyncLookups(TransactionTestCase):
+    reset_sequences = True
+    SLUGS = ["first", "second", "third", "fourth"]
+    DELAY = 0.2
+
+    def setUp(self):
+        super().setUp()
+        for slug in self.SLUGS:
+            ExternalLtiConfiguration.objects.create(name=slug.title(), slug=slug)
+
+    def test_concurrent_lookups_do_not_serialize_on_one_thread(self):
+        threads = set()
+        original_fetch_all = QuerySet._fetch_all  # pylint: disable=protected-access
+
+        def slow_fetch_all(queryset):
+            threads.add(threading.get_ident())
+            time.sleep(self.DELAY)
+            return original_fetch_all(queryset)
+
+        async def lookup(slug):
+            # The ASGI handler runs each request in its own context like this.
+            async with ThreadSensitiveContext():
+                return await aget_configuration(slug)
+
+        async def lookup_all():
+            return await asyncio.gather(*(lookup(slug) for slug in self.SLUGS))
+
+        with patch.object(QuerySet, "_fetch_all", slow_fetch_all):
+            start = time.perf_counter()
+            # Run the event loop like an ASGI server does, outside of async_to_sync,
+            # which would otherwise send all the queries to the test thread.
+            configs = asyncio.run(lookup_all())
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual([c["slug"] for c in configs], self.SLUGS)
+        self.assertEqual(len(threads), len(self.SLUGS))
+        self.assertLess(elapsed, self.DELAY * len(self.SLUGS))
+
+
+class TestSigningKeys(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.config = ExternalLtiConfiguration.objects.create(
+            name="Test",
+            slug="test",
+            version=LTIVersion.LTI_1P3,
+            lti_1p3_private_key=PLATFORM_KEY.export_key().decode(),
+            lti_1p3_tool_public_key=TOOL_KEY.publickey().export_key().decode(),
+        )
+
+    def test_get_platform_signing_key(self):
+        key = get_platform_signing_key("test")
+
+        self.assertIsInstance(key, RSAKey)
+        self.assertEqual(key.kid, self.config.lti_1p3_private_key_id)
+        self.assertEqual(key.key.n, PLATFORM_KEY.n)
+        self.assertTrue(key.key.has_private())
+
+    def test_get_tool_public_key(self):
+        key = get_tool_public_key("test")
+
+        self.assertIsInstance(key, RSAKey)
+        self.assertEqual(key.key.n, TOOL_KEY.n)
+        self.assertFalse(key.key.has_private())
+
+    def test_keys_are_served_from_cache_without_parsing(self):
+        platform_key = get_platform_signing_key("test")
+        tool_key = get_tool_public_key("test")
+
+        with patch.object(RSA, "import_key") as import_key_mock, self.assertNumQueries(
+            0
+        ):
+            self.assertIs(get_platform_signing_key("test"), platform_key)
+            self.assertIs(get_tool_public_key("test"), tool_key)
+
+        import_key_mock.assert_not_called()
+
+    def test_keys_are_invalidated_when_the_configuration_changes(self):
+        get_platform_signing_key("test")
+        new_key = RSA.generate(2048)
+
+        self.config.lti_1p3_private_key = new_key.export_key().decode()
+        self.config.save()
+
+        self.assertEqual(get_platform_signing_key("test").key.n, new_key.n)
+
+    def test_no_keys_for_unknown_or_lti_1p1_configurations(self):
+        ExternalLtiConfiguration.objects.create(name="LTI 1.1", slug="lti-1p1")
+
+        self.assertIsNone(get_platform_signing_key("unknown"))
+        self.assertIsNone(get_tool_public_key("unknown"))
+        self.assertIsNone(get_platform_signing_key("lti-1p1"))
+        self.assertIsNone(get_tool_public_key("lti-1p1"))
+
+    @patch("lti_store.api.get_keyset_fetcher")
+    def test_tool_public_key_from_keyset_url(self, get_keyset_fetcher_mock):
+        self.config.lti_1p3_tool_public_key = ""
+        self.config.lti_1p3_tool_keyset_url = "https://tool.example.com/jwks"
+        self.config.save()
+
+        key = get_tool_public_key("test", kid="tool-kid")
+
+        self.assertEqual(key, get_keyset_fetcher_mock().get_key.return_value)
+        get_keyset_fetcher_mock().get_key.assert_called_once_with(
+            "https://tool.example.com/jwks", "tool-kid"
+        )
@@ -0,0 +1,455 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from lti_store.api import get_all_configurations, get_configuration
+from lti_store.cache import (
+    NOT_FOUND,
+    VERSION_KEY,
+    ConfigurationCache,
+    LocalLRUCache,
+    configuration_cache,
+    configuration_key,
+    request_memo,
+)
+from lti_store.models import ExternalLtiConfiguration
+from lti_store.pipelines import GetLtiConfigurations
+from lti_store.apps import LtiStoreConfig as App
+
+
+class TestLocalLRUCache(TestCase):
+    def test_get_returns_default_for_unknown_keys(self):
+        local = LocalLRUCache(max_size=2, ttl=60)
+
+        self.assertIsNone(local.get("unknown"))
+        self.assertEqual(local.get("unknown", "default"), "default")
+
+    def test_least_recently_used_entry_is_evicted(self):
+        local = LocalLRUCache(max_size=2, ttl=60)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+
+        self.assertEqual(len(local), 2)
+        self.assertEqual(local.get("a"), 1)
+        self.assertIsNone(local.get("b"))
+        self.assertEqual(local.get("c"), 3)
+
+    @patch("lti_store.cache.time.monotonic")
+    def test_entries_expire_after_ttl(self, monotonic_mock):
+        local = LocalLRUCache(max_size=2, ttl=60)
+        monotonic_mock.return_value = 100
+        local.set("a", 1)
+
+        monotonic_mock.return_value = 159
+        self.assertEqual(local.get("a"), 1)
+        monotonic_mock.return_value = 160
+        self.assertIsNone(local.get("a"))
+        self.assertEqual(len(local), 0)
+
+    def test_nothing_is_stored_when_disabled(self):
+        local = LocalLRUCache(max_size=0, ttl=60)
+        local.set("a", 1)
+
+        self.assertIsNone(local.get("a"))
+
+
+class TestConfigurationCache(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = ConfigurationCache()
+
+    def test_miss_calls_loader_and_fills_both_tiers(self):
+        loader = Mock(return_value={"slug": "test"})
+
+        self.assertEqual(self.cache.get("key", loader), {"slug": "test"})
+        self.assertEqual(self.cache.get("key", loader), {"slug": "test"})
+
+        loader.assert_called_once_with()
+        self.assertEqual(cache.get(self.cache.versioned_key("key")), {"slug": "test"})
+        self.assertEqual(
+            self.cache.stats(),
+            {"request_hits": 0, "local_hits": 1, "shared_hits": 0, "misses": 1},
+        )
+
+    def test_shared_tier_is_used_when_local_tier_misses(self):
+        loader = Mock(return_value={"slug": "test"})
+        self.cache.get("key", loader)
+        self.cache.local.clear()
+
+        self.assertEqual(self.cache.get("key", loader), {"slug": "test"})
+
+        loader.assert_called_once_with()
+        self.assertEqual(
+            self.cache.stats(),
+            {"request_hits": 0, "local_hits": 0, "shared_hits": 1, "misses": 1},
+        )
+
+    def test_none_is_cached_as_missing(self):
+        loader = Mock(return_value=None)
+
+        self.assertIsNone(self.cache.get("key", loader))
+        self.assertIsNone(self.cache.get("key", loader))
+        self.cache.local.clear()
+        self.assertIsNone(self.cache.get("key", loader))
+
+        loader.assert_called_once_with()
+        self.assertEqual(self.cache.negative_hits(), {"key": 2})
+        self.assertEqual(cache.get(self.cache.versioned_key("key")), NOT_FOUND)
+
+    @override_settings(LTI_STORE_NEGATIVE_CACHE_TTL=30, LTI_STORE_CACHE_TIMEOUT=300)
+    @patch("lti_store.cache.time.monotonic")
+    def test_missing_keys_expire_after_the_negative_ttl(self, monotonic_mock):
+        monotonic_mock.return_value = 100
+        loader = Mock(return_value=None)
+        with patch.object(cache, "set", wraps=cache.set) as set_mock:
+            self.cache.get("key", loader)
+
+        set_mock.assert_called_once_with(
+            self.cache.versioned_key("key"), NOT_FOUND, timeout=30
+        )
+        monotonic_mock.return_value = 129
+        self.assertEqual(self.cache.local.get("key"), NOT_FOUND)
+        monotonic_mock.return_value = 130
+        self.assertIsNone(self.cache.local.get("key"))
+
+    @override_settings(LTI_STORE_NEGATIVE_CACHE_TTL=0)
+    def test_none_is_not_cached_when_the_negative_cache_is_disabled(self):
+        loader = Mock(return_value=None)
+
+        self.assertIsNone(self.cache.get("key", loader))
+        self.assertIsNone(self.cache.get("key", loader))
+
+        self.assertEqual(loader.call_count, 2)
+        self.assertEqual(self.cache.negative_hits(), {})
+
+    async def test_aget_caches_none_as_missing(self):
+        loader = AsyncMock(return_value=None)
+
+        self.assertIsNone(await self.cache.aget("key", loader))
+        self.cache.local.clear()
+        self.assertIsNone(await self.cache.aget("key", loader))
+
+        loader.assert_awaited_once_with()
+        self.assertEqual(self.cache.negative_hits(), {"key": 1})
+
+    def test_get_many_caches_missing_keys(self):
+        loader = Mock(return_value={"found": {"slug": "found"}})
+
+        self.assertEqual(
+            self.cache.get_many(["found", "missing"], loader),
+            {"found": {"slug": "found"}},
+        )
+        self.assertEqual(self.cache.get_many(["missing"], loader), {})
+        self.cache.local.clear()
+        self.assertEqual(self.cache.get_many(["missing"], loader), {})
+
+        loader.assert_called_once_with(["found", "missing"])
+        self.assertEqual(self.cache.negative_hits(), {"missing": 2})
+
+    def test_invalidate_bumps_version_and_clears_local_tier(self):
+        loader = Mock(return_value={"slug": "test"})
+        self.cache.get("key", loader)
+        version = self.cache.get_version()
+
+        self.cache.invalidate()
+
+        self.assertNotEqual(self.cache.get_version(), version)
+        self.assertEqual(len(self.cache.local), 0)
+        self.cache.get("key", loader)
+        self.assertEqual(loader.call_count, 2)
+
+    def test_invalidate_recreates_evicted_version(self):
+        self.cache.get_version()
+        cache.delete(VERSION_KEY)
+
+        self.cache.invalidate()
+
+        self.assertIsNotNone(cache.get(VERSION_KEY))
+
+    def test_value_loaded_during_invalidation_is_not_cached_locally(self):
+        def loader():
+            self.cache.invalidate()
+            return {"slug": "test"}
+
+        self.cache.get("key", loader)
+
+        self.assertEqual(len(self.cache.local), 0)
+
+    async def test_aget_calls_loader_and_fills_both_tiers(self):
+        loader = AsyncMock(return_value={"slug": "test"})
+
+        self.assertEqual(await self.cache.aget("key", loader), {"slug": "test"})
+        self.cache.local.clear()
+        self.assertEqual(await self.cache.aget("key", loader), {"slug": "test"})
+        self.assertEqual(await self.cache.aget("key", loader), {"slug": "test"})
+
+        loader.assert_awaited_once_with()
+        self.assertEqual(
+            self.cache.stats(),
+            {"request_hits": 0, "local_hits": 1, "shared_hits": 1, "misses": 1},
+        )
+
+    async def test_aget_shares_the_tiers_with_get(self):
+        self.cache.get("key", Mock(return_value={"slug": "test"}))
+        loader = AsyncMock()
+
+        self.assertEqual(await self.cache.aget("key", loader), {"slug": "test"})
+
+        loader.assert_not_awaited()
+
+    async def test_concurrent_aget_calls_do_not_wait_for_each_other(self):
+        async def loader():
+            await asyncio.sleep(0.2)
+            return {"slug": "test"}
+
+        start = time.perf_counter()
+        await asyncio.gather(*(self.cache.aget(f"key-{i}", loader) for i in range(5)))
+
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    @override_settings(LTI_STORE_LOCAL_CACHE_SIZE=1, LTI_STORE_LOCAL_CACHE_TTL=5)
+    def test_local_tier_is_built_from_settings(self):
+        self.assertEqual(self.cache.local.max_size, 1)
+        self.assertEqual(self.cache.local.ttl, 5)
+
+
+class TestRequestMemo(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = ConfigurationCache()
+
+    def test_values_are_memoized_within_the_block(self):
+        loader = Mock(return_value={"slug": "test"})
+
+        with request_memo():
+            self.cache.get("key", loader)
+            self.cache.local.clear()
+            self.cache.get("key", loader)
+
+        loader.assert_called_once_with()
+        self.assertEqual(self.cache.stats()["request_hits"], 1)
+
+    def test_missing_values_are_memoized_within_the_block(self):
+        loader = Mock(return_value=None)
+
+        with request_memo():
+            self.assertIsNone(self.cache.get("key", loader))
+            self.assertIsNone(self.cache.get("key", loader))
+
+        loader.assert_called_once_with()
+
+    @override_settings(LTI_STORE_NEGATIVE_CACHE_TTL=0)
+    def test_memo_is_dropped_when_the_block_exits(self):
+        loader = Mock(return_value=None)
+
+        with request_memo():
+            self.cache.get("key", loader)
+        self.cache.get("key", loader)
+
+        self.assertEqual(loader.call_count, 2)
+        self.assertEqual(self.cache.stats()["request_hits"], 0)
+
+    def test_get_many_memoizes_found_and_missing_values(self):
+        loader = Mock(return_value={"a": {"slug": "a"}})
+
+        with request_memo():
+            self.assertEqual(
+                self.cache.get_many(["a", "b"], loader), {"a": {"slug": "a"}}
+            )
+            self.assertEqual(
+                self.cache.get_many(["a", "b"], loader), {"a": {"slug": "a"}}
+            )
+            self.assertIsNone(self.cache.get("b", Mock()))
+
+        loader.assert_called_once_with(["a", "b"])
+        self.assertEqual(self.cache.stats()["request_hits"], 3)
+
+    def test_invalidate_clears_the_memo(self):
+        loader = Mock(return_value={"slug": "test"})
+
+        with request_memo():
+            self.cache.get("key", loader)
+            self.cache.invalidate()
+            self.cache.get("key", loader)
+
+        self.assertEqual(loader.call_count, 2)
+
+
+class TestRevalidation(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = ConfigurationCache()
+        self.loader = Mock(side_effect=[{"slug": "v1"}, {"slug": "v2"}])
+
+    def edit_on_another_node(self):
+        cache.set(VERSION_KEY, "edited", timeout=None)
+
+    def test_local_hits_cost_one_shared_get_per_request(self):
+        other_loader = Mock(return_value={"other": {"slug": "other"}})
+        with request_memo():
+            self.cache.get("key", self.loader)
+            self.cache.get_many(["other"], other_loader)
+
+        with patch.object(cache, "get", wraps=cache.get) as get_mock, request_memo():
+            self.cache.get("key", self.loader)
+            self.cache.get_many(["other"], other_loader)
+
+        get_mock.assert_called_once_with(VERSION_KEY)
+        self.assertEqual(self.cache.stats()["local_hits"], 2)
+
+    def test_changes_on_another_node_are_seen_from_the_next_request(self):
+        with request_memo():
+            self.assertEqual(self.cache.get("key", self.loader), {"slug": "v1"})
+            self.edit_on_another_node()
+            self.assertEqual(self.cache.get("key", self.loader), {"slug": "v1"})
+
+        with request_memo():
+            self.assertEqual(self.cache.get("key", self.loader), {"slug": "v2"})
+
+    async def test_async_lookups_revalidate_the_local_tier(self):
+        with request_memo():
+            await self.cache.aget("key", AsyncMock(return_value={"slug": "v1"}))
+        self.edit_on_another_node()
+
+        with request_memo():
+            value = await self.cache.aget("key", AsyncMock(return_value={"slug": "v2"}))
+
+        self.assertEqual(value, {"slug": "v2"})
+
+    @override_settings(LTI_STORE_GENERATION_CHECK_INTERVAL=1)
+    @patch("lti_store.cache.time.monotonic")
+    def test_local_tier_is_revalidated_periodically_outside_of_requests(
+        self, monotonic_mock
+    ):
+        monotonic_mock.return_value = 100
+        self.cache.get("key", self.loader)
+        self.edit_on_another_node()
+
+        monotonic_mock.return_value = 100.5
+        self.assertEqual(self.cache.get("key", self.loader), {"slug": "v1"})
+        monotonic_mock.return_value = 101
+        self.assertEqual(self.cache.get("key", self.loader), {"slug": "v2"})
+
+    def test_unchanged_version_keeps_the_local_tier(self):
+        with request_memo():
+            self.cache.get("key", self.loader)
+        with request_memo():
+            self.cache.get("key", self.loader)
+
+        self.loader.assert_called_once_with()
+        self.assertEqual(self.cache.stats()["local_hits"], 1)
+
+
+class TestConfigurationCacheInvalidation(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.filter_step = GetLtiConfigurations(
+            "org.openedx.xblock.lti_consumer.configuration.listed.v1", Mock("Pipeline")
+        )
+
+    def test_cached_configuration_is_served_without_queries(self):
+        ExternalLtiConfiguration.objects.create(name="Test", slug="test")
+        self.filter_step.run_filter({}, f"{App.name}:test", {})
+        self.filter_step.run_filter({}, "", {})
+
+        with self.assertNumQueries(0):
+            data = self.filter_step.run_filter({}, f"{App.name}:test", {})
+            self.filter_step.run_filter({}, "", {})
+
+        self.assertEqual(data["configurations"][f"{App.name}:test"]["name"], "Test")
+        self.assertEqual(
+            configuration_cache.stats(),
+            {"request_hits": 0, "local_hits": 2, "shared_hits": 0, "misses": 2},
+        )
+
+    def test_unknown_slugs_are_served_from_the_negative_cache(self):
+        self.filter_step.run_filter({}, f"{App.name}:deleted", {})
+
+        with self.assertNumQueries(0):
+            data = self.filter_step.run_filter({}, f"{App.name}:deleted", {})
+
+        self.assertEqual(data["configurations"], {})
+        self.assertEqual(
+            configuration_cache.negative_hits(), {configuration_key("deleted"): 1}
+        )
+
+    def test_creating_a_configuration_invalidates_the_negative_cache(self):
+        self.filter_step.run_filter({}, f"{App.name}:new", {})
+
+        ExternalLtiConfiguration.objects.create(name="New", slug="new")
+
+        data = self.filter_step.run_filter({}, f"{App.name}:new", {})
+        self.assertEqual(data["configurations"][f"{App.name}:new"]["name"], "New")
+
+    def test_save_invalidates_cached_configurations(self):
+        config = ExternalLtiConfiguration.objects.create(name="Test", slug="test")
+        self.filter_step.run_filter({}, f"{App.name}:test", {})
+        self.filter_step.run_filter({}, "", {})
+
+        config.name = "Renamed"
+        config.save()
+
+        single = self.filter_step.run_filter({}, f"{App.name}:test", {})
+        listing = self.filter_step.run_filter({}, "", {})
+        self.assertEqual(
+            single["configurations"][f"{App.name}:test"]["name"], "Renamed"
+        )
+        self.assertEqual(
+            listing["configurations"][f"{App.name}:test"]["name"], "Renamed"
+        )
+
+    def test_delete_invalidates_cached_configurations(self):
+        config = ExternalLtiConfiguration.objects.create(name="Test", slug="test")
+        self.filter_step.run_filter({}, f"{App.name}:test", {})
+        self.filter_step.run_filter({}, "", {})
+
+        config.delete()
+
+        self.assertEqual(
+            self.filter_step.run_filter({}, f"{App.name}:test", {})["configurations"],
+            {},
+        )
+        self.assertEqual(self.filter_step.run_filter({}, "", {})["configurations"], {})
+
+    def test_queryset_update_invalidates_cached_configurations(self):
+        ExternalLtiConfiguration.objects.create(name="Test", slug="test")
+        get_configuration("test")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ExternalLtiConfiguration.objects.filter(slug="test").update(
+                description="Updated"
+            )
+
+        self.assertEqual(get_configuration("test")["description"], "Updated")
+
+    def test_bulk_writes_invalidate_cached_configurations(self):
+        config = ExternalLtiConfiguration.objects.create(name="Test", slug="test")
+        get_all_configurations()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ExternalLtiConfiguration.objects.bulk_create(
+                [ExternalLtiConfiguration(name="Other", slug="other")]
+            )
+        self.assertEqual(len(get_all_configurations()), 2)
+
+        config.name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            ExternalLtiConfiguration.objects.bulk_update([config], ["name"])
+        self.assertEqual(get_configuration("test")["name"], "Renamed")
+
+    def test_returned_configurations_are_shared_immutable_records(self):
+        ExternalLtiConfiguration.objects.create(name="Test", slug="test")
+        data = self.filter_step.run_filter({}, f"{App.name}:test", {})
+        config = data["configurations"][f"{App.name}:test"]
+
+        with self.assertRaises(TypeError):
+            config["name"] = "Modified"
+
+        self.assertIs(
+            configuration_cache.get(configuration_key("test"), Mock()), config
+        )
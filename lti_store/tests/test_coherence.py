@@ -0,0 +1,58 @@
+import multiprocessing
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from lti_store.cache import ConfigurationCache
+from lti_store.tests.cache_worker import run_worker
+
+TIMEOUT = 30
+
+
+class TestCrossProcessCoherence(TestCase):
+    """Processes sharing a cache backend, each with its own local tier."""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        caches = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": directory.name,
+            }
+        }
+        settings_override = override_settings(CACHES=caches)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        context = multiprocessing.get_context("spawn")
+        self.workers = []
+        for _ in range(2):
+            requests, responses = context.Queue(), context.Queue()
+            process = context.Process(
+                target=run_worker, args=(directory.name, requests, responses)
+            )
+            process.start()
+            self.addCleanup(process.join, TIMEOUT)
+            self.addCleanup(requests.put, None)
+            self.workers.append((requests, responses))
+
+    def request(self, worker, value):
+        """Resolve the key in a worker, `value` being what its loader returns."""
+        requests, responses = self.workers[worker]
+        requests.put(value)
+        return responses.get(timeout=TIMEOUT)
+
+    def test_edits_are_seen_by_every_process_from_their_next_request(self):
+        self.assertEqual(self.request(0, "v1"), "v1")
+        self.assertEqual(self.request(1, "v1"), "v1")
+        # Served from the local tiers.
+        self.assertEqual(self.request(0, "v2"), "v1")
+        self.assertEqual(self.request(1, "v2"), "v1")
+
+        # An edit in another process, like an admin save.
+        ConfigurationCache().invalidate()
+
+        self.assertEqual(self.request(0, "v2"), "v2")
+        self.assertEqual(self.request(1, "v3"), "v2")
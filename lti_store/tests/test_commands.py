@@ -0,0 +1,325 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from Cryptodome.PublicKey import RSA
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from lti_store.api import get_configuration
+from lti_store.keys import jwks_etag
+from lti_store.models import (
+    ExternalLtiConfiguration,
+    LtiPlatformKey,
+    LTIVersion,
+    PregeneratedRsaKey,
+)
+
+KEY_OBJ = RSA.generate(2048)
+PRIVATE_KEY = KEY_OBJ.export_key().decode()
+PUBLIC_KEY = KEY_OBJ.publickey().export_key().decode()
+
+
+class CommandTestMixin:
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "configurations.jsonl")
+
+    def write_records(self, *records):
+        with open(self.path, "w", encoding="utf-8") as output:
+            for record in records:
+                output.write(
+                    (record if isinstance(record, str) else json.dumps(record)) + "\n"
+                )
+
+    def import_records(self, *records, **options):
+        self.write_records(*records)
+        stdout, stderr = StringIO(), StringIO()
+        options.setdefault("workers", 0)
+        call_command(
+            "lti_store_import", self.path, stdout=stdout, stderr=stderr, **options
+        )
+        return stdout.getvalue(), stderr.getvalue()
+
+
+def lti_1p1_record(slug, **fields):
+    return {
+        "name": slug.title(),
+        "slug": slug,
+        "version": LTIVersion.LTI_1P1,
+        "lti_1p1_launch_url": "https://tool.example.com/launch",
+        "lti_1p1_client_key": "key",
+        "lti_1p1_client_secret": "secret",
+        **fields,
+    }
+
+
+def lti_1p3_record(slug, **fields):
+    return {
+        "name": slug.title(),
+        "slug": slug,
+        "version": LTIVersion.LTI_1P3,
+        "lti_1p3_private_key": PRIVATE_KEY,
+        "lti_1p3_tool_public_key": PUBLIC_KEY,
+        **fields,
+    }
+
+
+class TestImportCommand(CommandTestMixin, TestCase):
+    def test_configurations_are_created(self):
+        stdout, stderr = self.import_records(
+            lti_1p1_record("first"), lti_1p3_record("second")
+        )
+
+        self.assertEqual(
+            stdout.strip(), "Created 2, updated 0, skipped 0 configurations."
+        )
+        self.assertEqual(stderr, "")
+        second = ExternalLtiConfiguration.objects.get(slug="second")
+        self.assertTrue(second.lti_1p3_client_id)
+        self.assertEqual(
+            second.lti_1p3_public_jwk["keys"][0]["kid"], second.lti_1p3_private_key_id
+        )
+        self.assertEqual(
+            second.lti_1p3_public_jwk_etag, jwks_etag(second.lti_1p3_public_jwk)
+        )
+
+    def test_keys_are_validated_in_worker_processes(self):
+        stdout, _ = self.import_records(
+            lti_1p3_record("first"), lti_1p3_record("second"), workers=2
+        )
+
+        self.assertEqual(
+            stdout.strip(), "Created 2, updated 0, skipped 0 configurations."
+        )
+        for config in ExternalLtiConfiguration.objects.all():
+            self.assertEqual(
+                config.lti_1p3_public_jwk["keys"][0]["kid"],
+                config.lti_1p3_private_key_id,
+            )
+
+    def test_missing_private_keys_are_taken_from_the_pool(self):
+        PregeneratedRsaKey.objects.create(private_key=PRIVATE_KEY)
+
+        self.import_records(lti_1p3_record("first", lti_1p3_private_key=""))
+
+        config = ExternalLtiConfiguration.objects.get()
+        self.assertEqual(config.lti_1p3_private_key, PRIVATE_KEY)
+        self.assertEqual(
+            config.lti_1p3_public_jwk["keys"][0]["kid"], config.lti_1p3_private_key_id
+        )
+        self.assertFalse(PregeneratedRsaKey.objects.exists())
+
+    def test_redirect_uris_of_older_exports_are_parsed(self):
+        self.import_records(
+            lti_1p3_record(
+                "first", lti_1p3_redirect_uris='["https://tool.example.com"]'
+            ),
+            lti_1p3_record("second", lti_1p3_redirect_uris=""),
+        )
+
+        self.assertEqual(
+            dict(
+                ExternalLtiConfiguration.objects.values_list(
+                    "slug", "lti_1p3_redirect_uris"
+                )
+            ),
+            {"first": ["https://tool.example.com"], "second": []},
+        )
+
+    def test_existing_configurations_are_updated_by_slug(self):
+        existing = ExternalLtiConfiguration.objects.create(**lti_1p1_record("first"))
+
+        stdout, _ = self.import_records(
+            lti_1p1_record("first", description="Updated"), lti_1p1_record("second")
+        )
+
+        self.assertEqual(
+            stdout.strip(), "Created 1, updated 1, skipped 0 configurations."
+        )
+        existing.refresh_from_db()
+        self.assertEqual(existing.description, "Updated")
+
+    def test_invalid_lines_are_skipped(self):
+        stdout, stderr = self.import_records(
+            lti_1p1_record("valid"),
+            "not json",
+            lti_1p1_record("unknown-field", unknown="value"),
+            lti_1p1_record("missing-field", lti_1p1_client_key=""),
+            lti_1p3_record("invalid-key", lti_1p3_private_key="invalid"),
+        )
+
+        self.assertEqual(
+            stdout.strip(), "Created 1, updated 0, skipped 4 configurations."
+        )
+        self.assertEqual(len(stderr.splitlines()), 4)
+        self.assertIn("Line 5 skipped", stderr)
+        self.assertIn("lti_1p3_private_key", stderr)
+        self.assertEqual(
+            list(ExternalLtiConfiguration.objects.values_list("slug", flat=True)),
+            ["valid"],
+        )
+
+    def test_configurations_are_written_in_batches(self):
+        records = [lti_1p1_record(f"config-{index}") for index in range(5)]
+
+        # Per batch: a lookup of the used names, a savepoint, a lookup of the existing
+        # slugs, the inserts of the configurations and of their payloads, and a release.
+        with self.assertNumQueries(18):
+            stdout, _ = self.import_records(*records, batch_size=2)
+
+        self.assertEqual(
+            stdout.strip(), "Created 5, updated 0, skipped 0 configurations."
+        )
+
+    def test_duplicate_names_are_skipped(self):
+        ExternalLtiConfiguration.objects.create(**lti_1p1_record("existing"))
+
+        stdout, stderr = self.import_records(
+            lti_1p1_record("first", name="Existing"),
+            lti_1p1_record("second", name="Shared"),
+            lti_1p1_record("third", name="Shared"),
+            lti_1p1_record("existing", description="Updated"),
+        )
+
+        self.assertEqual(
+            stdout.strip(), "Created 1, updated 1, skipped 2 configurations."
+        )
+        self.assertIn("Line 1 skipped", stderr)
+        self.assertIn("Line 3 skipped", stderr)
+        self.assertIn("Name already exists", stderr)
+        self.assertEqual(
+            dict(ExternalLtiConfiguration.objects.values_list("slug", "name")),
+            {"existing": "Existing", "second": "Shared"},
+        )
+
+    def test_pool_keys_are_only_taken_by_valid_configurations(self):
+        PregeneratedRsaKey.objects.create(private_key=PRIVATE_KEY)
+
+        self.import_records(
+            lti_1p3_record(
+                "invalid", lti_1p3_private_key="", lti_1p3_tool_public_key=""
+            ),
+            lti_1p3_record(
+                "invalid-key", lti_1p3_private_key="", lti_1p3_tool_public_key="bad"
+            ),
+            lti_1p3_record("valid", lti_1p3_private_key=""),
+        )
+
+        config = ExternalLtiConfiguration.objects.get()
+        self.assertEqual(config.slug, "valid")
+        self.assertEqual(config.lti_1p3_private_key, PRIVATE_KEY)
+        self.assertFalse(PregeneratedRsaKey.objects.exists())
+
+    def test_last_duplicate_slug_wins(self):
+        self.import_records(
+            lti_1p1_record("first", description="First"),
+            lti_1p1_record("first", description="Second"),
+        )
+
+        self.assertEqual(ExternalLtiConfiguration.objects.get().description, "Second")
+
+    def test_cache_is_invalidated(self):
+        ExternalLtiConfiguration.objects.create(**lti_1p1_record("first"))
+        get_configuration("first")
+
+        self.import_records(lti_1p1_record("first", description="Updated"))
+
+        self.assertEqual(get_configuration("first")["description"], "Updated")
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(CommandError):
+            self.import_records(lti_1p1_record("first"), batch_size=0)
+
+
+class TestExportCommand(CommandTestMixin, TestCase):
+    def test_configurations_are_exported_and_imported_back(self):
+        ExternalLtiConfiguration.objects.create(**lti_1p1_record("first"))
+        ExternalLtiConfiguration.objects.create(**lti_1p3_record("second"))
+        config_objs = ExternalLtiConfiguration.objects.with_key_material()
+        exported = {c.slug: c for c in config_objs}
+
+        call_command("lti_store_export", output=self.path, stderr=StringIO())
+        ExternalLtiConfiguration.objects.all().delete()
+        self.import_records(
+            *[json.loads(line) for line in open(self.path, encoding="utf-8")]
+        )
+
+        for slug, config in exported.items():
+            imported = ExternalLtiConfiguration.objects.get(slug=slug)
+            self.assertEqual(imported.name, config.name)
+            self.assertEqual(imported.lti_1p3_private_key, config.lti_1p3_private_key)
+            self.assertEqual(
+                imported.lti_1p3_private_key_id, config.lti_1p3_private_key_id
+            )
+            self.assertEqual(imported.lti_1p3_public_jwk, config.lti_1p3_public_jwk)
+
+    def test_platform_keys_stay_published_when_imported_back(self):
+        PregeneratedRsaKey.objects.bulk_create(
+            [
+                PregeneratedRsaKey(private_key=RSA.generate(2048).export_key().decode())
+                for _ in range(2)
+            ]
+        )
+        config = ExternalLtiConfiguration.objects.create(**lti_1p3_record("first"))
+        config.rotate_platform_key()
+        config.refresh_from_db()
+        public_jwk = config.lti_1p3_public_jwk
+        platform_keys = list(
+            LtiPlatformKey.objects.values_list("private_key_id", "state")
+        )
+
+        call_command("lti_store_export", output=self.path, stderr=StringIO())
+        self.import_records(
+            *[json.loads(line) for line in open(self.path, encoding="utf-8")]
+        )
+
+        config.refresh_from_db()
+        self.assertEqual(len(public_jwk["keys"]), 3)
+        self.assertEqual(config.lti_1p3_public_jwk, public_jwk)
+        self.assertEqual(
+            list(LtiPlatformKey.objects.values_list("private_key_id", "state")),
+            platform_keys,
+        )
+
+    def test_replaced_key_stays_published_when_imported(self):
+        config = ExternalLtiConfiguration.objects.create(**lti_1p3_record("first"))
+        previous_kid = config.lti_1p3_private_key_id
+
+        self.import_records(
+            lti_1p3_record(
+                "first",
+                lti_1p3_private_key=RSA.generate(2048).export_key().decode(),
+                lti_1p3_private_key_id="new",
+            )
+        )
+
+        config.refresh_from_db()
+        self.assertEqual(
+            [key["kid"] for key in config.lti_1p3_public_jwk["keys"]],
+            ["new", previous_kid],
+        )
+        self.assertEqual(
+            config.lti_1p3_public_jwk_etag, jwks_etag(config.lti_1p3_public_jwk)
+        )
+        self.assertEqual(
+            dict(LtiPlatformKey.objects.values_list("private_key_id", "state")),
+            {
+                "new": LtiPlatformKey.State.ACTIVE,
+                previous_kid: LtiPlatformKey.State.RETIRED,
+            },
+        )
+
+    def test_configurations_are_exported_to_stdout(self):
+        ExternalLtiConfiguration.objects.create(**lti_1p1_record("first"))
+        ExternalLtiConfiguration.objects.create(**lti_1p1_record("second"))
+        stdout = StringIO()
+
+        call_command("lti_store_export", stdout=stdout, batch_size=1)
+
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([record["slug"] for record in records], ["first", "second"])
+        self.assertNotIn("id", records[0])
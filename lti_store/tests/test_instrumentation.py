@@ -0,0 +1,155 @@
+import asyncio
+from unittest.mock import Mock
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+
+from lti_store.apps import LtiStoreConfig as App
+from lti_store.instrumentation import (
+    InMemoryExporter,
+    Instrumentation,
+    Measurement,
+    MetricsInstrumentation,
+    get_instrumentation,
+    measure_lookup,
+)
+from lti_store.models import ExternalLtiConfiguration
+from lti_store.pipelines import GetLtiConfigurations
+
+
+class RecordingInstrumentation(Instrumentation):
+    enabled = True
+
+    def __init__(self):
+        self.measurements = []
+
+    def record(self, measurement):
+        self.measurements.append(measurement)
+
+
+@override_settings(
+    LTI_STORE_INSTRUMENTATION="lti_store.tests.test_instrumentation.RecordingInstrumentation"
+)
+class TestPipelineInstrumentation(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.filter_step = GetLtiConfigurations(
+            "org.openedx.xblock.lti_consumer.configuration.listed.v1", Mock("Pipeline")
+        )
+        self.instrumentation = get_instrumentation()
+        self.instrumentation.measurements.clear()
+        ExternalLtiConfiguration.objects.create(name="First", slug="first")
+        ExternalLtiConfiguration.objects.create(name="Second", slug="second")
+
+    def test_single_lookups_are_measured(self):
+        self.filter_step.run_filter({}, f"{App.name}:first", {})
+        self.filter_step.run_filter({}, f"{App.name}:first", {})
+
+        first, second = self.instrumentation.measurements
+        self.assertEqual(
+            (first.mode, first.count, first.queries, first.cache_hit),
+            ("single", 1, 1, False),
+        )
+        self.assertEqual(
+            (second.mode, second.count, second.queries, second.cache_hit),
+            ("single", 1, 0, True),
+        )
+        self.assertGreater(first.duration, 0)
+
+    def test_list_lookups_are_measured(self):
+        self.filter_step.run_filter({}, "", {})
+
+        (measurement,) = self.instrumentation.measurements
+        self.assertEqual(
+            (measurement.mode, measurement.count, measurement.queries),
+            ("list", 2, 1),
+        )
+
+    def test_summary_lookups_are_measured(self):
+        self.filter_step.run_filter({}, "", {}, summary=True)
+
+        (measurement,) = self.instrumentation.measurements
+        self.assertEqual(
+            (measurement.mode, measurement.count, measurement.queries),
+            ("summary", 2, 1),
+        )
+
+    def test_unknown_configurations_are_measured(self):
+        self.filter_step.run_filter({}, f"{App.name}:unknown", {})
+
+        (measurement,) = self.instrumentation.measurements
+        self.assertEqual((measurement.count, measurement.cache_hit), (0, False))
+
+    def test_async_lookups_count_their_queries(self):
+        async_to_sync(self.filter_step.arun_filter)({}, "", {})
+        async_to_sync(self.filter_step.arun_filter)({}, f"{App.name}:first", {})
+
+        first, second = self.instrumentation.measurements
+        self.assertEqual(
+            (first.mode, first.count, first.queries, first.cache_hit),
+            ("list", 2, 1, False),
+        )
+        self.assertEqual(
+            (second.mode, second.count, second.queries, second.cache_hit),
+            ("single", 1, 1, False),
+        )
+
+    def test_concurrent_async_lookups_only_count_their_own_queries(self):
+        async def lookup_both():
+            # Both lookups run their queries in the same thread.
+            await asyncio.gather(
+                self.filter_step.arun_filter({}, f"{App.name}:first", {}),
+                self.filter_step.arun_filter({}, f"{App.name}:second", {}),
+            )
+
+        async_to_sync(lookup_both)()
+
+        self.assertEqual(
+            [measurement.queries for measurement in self.instrumentation.measurements],
+            [1, 1],
+        )
+
+
+class TestInstrumentation(TestCase):
+    def test_noop_instrumentation_by_default(self):
+        instrumentation = get_instrumentation()
+
+        self.assertIs(type(instrumentation), Instrumentation)
+        self.assertFalse(instrumentation.enabled)
+        with measure_lookup("single") as lookup:
+            lookup.count = 1
+
+    def test_failed_lookups_are_not_recorded(self):
+        instrumentation = RecordingInstrumentation()
+
+        with self.assertRaises(RuntimeError), override_settings(
+            LTI_STORE_INSTRUMENTATION="lti_store.tests.test_instrumentation.RecordingInstrumentation"
+        ):
+            instrumentation = get_instrumentation()
+            instrumentation.measurements.clear()
+            with measure_lookup("single"):
+                raise RuntimeError
+
+        self.assertEqual(instrumentation.measurements, [])
+
+    def test_metrics_instrumentation_reports_to_exporter(self):
+        exporter = InMemoryExporter()
+        instrumentation = MetricsInstrumentation(exporter, prefix="lti")
+
+        instrumentation.record(
+            Measurement(
+                mode="list", count=3, queries=1, cache_hit=False, duration=0.002
+            )
+        )
+
+        tags = {"mode": "list", "cache": "miss"}
+        self.assertEqual(
+            exporter.metrics,
+            [
+                ("increment", "lti.calls", 1, tags),
+                ("histogram", "lti.configurations", 3, tags),
+                ("histogram", "lti.queries", 1, tags),
+                ("histogram", "lti.duration", 2.0, tags),
+            ],
+        )
+        self.assertEqual(exporter.values("lti.queries"), [1])
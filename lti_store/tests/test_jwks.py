@@ -0,0 +1,230 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Cryptodome.PublicKey import RSA
+from ddt import data, ddt, unpack
+from django.test import SimpleTestCase
+from jwkest.jwk import KEYS, RSAKey
+
+from lti_store.jwks import KeysetError, KeysetFetcher, parse_cache_control
+
+FIRST_KEY = RSA.generate(2048)
+SECOND_KEY = RSA.generate(2048)
+
+
+def dump_jwks(**keys):
+    jwks = KEYS()
+    for kid, key in keys.items():
+        jwks.append(RSAKey(kid=kid, key=key.publickey()))
+    return jwks.dump_jwks()
+
+
+class StubKeysetServer:
+    """Local HTTP server publishing a JWKS, recording the requests it receives."""
+
+    def __init__(self):
+        self.body = dump_jwks(first=FIRST_KEY)
+        self.etag = '"v1"'
+        self.cache_control = "max-age=300"
+        self.status = 200
+        self.delay = 0
+        self.requests = []
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # pylint: disable=invalid-name
+                stub.requests.append(dict(self.headers))
+                time.sleep(stub.delay)
+                if stub.status != 200:
+                    self.send_response(stub.status)
+                    self.end_headers()
+                    return
+                if self.headers.get("If-None-Match") == stub.etag:
+                    self.send_response(304)
+                    self.send_header("Cache-Control", stub.cache_control)
+                    self.end_headers()
+                    return
+                body = stub.body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", stub.etag)
+                self.send_header("Cache-Control", stub.cache_control)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/jwks"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@ddt
+class TestParseCacheControl(SimpleTestCase):
+    @data(
+        ("max-age=60", {"max-age": 60}),
+        (
+            'public, max-age="60", stale-while-revalidate=30',
+            {"public": None, "max-age": 60, "stale-while-revalidate": 30},
+        ),
+        ("No-Cache", {"no-cache": None}),
+        (None, {}),
+    )
+    @unpack
+    def test_parse_cache_control(self, header, directives):
+        self.assertEqual(parse_cache_control(header), directives)
+
+
+@ddt
+class TestKeysetFetcher(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = StubKeysetServer()
+        self.addCleanup(self.server.close)
+        self.fetcher = KeysetFetcher(timeout=2, stale_while_revalidate=0)
+
+    def test_key_is_looked_up_by_kid(self):
+        self.server.body = dump_jwks(first=FIRST_KEY, second=SECOND_KEY)
+
+        self.assertEqual(
+            self.fetcher.get_key(self.server.url, "first").key.n, FIRST_KEY.n
+        )
+        self.assertEqual(
+            self.fetcher.get_key(self.server.url, "second").key.n, SECOND_KEY.n
+        )
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_only_key_is_returned_without_kid(self):
+        self.assertEqual(self.fetcher.get_key(self.server.url).key.n, FIRST_KEY.n)
+
+    def test_fresh_keyset_is_served_from_memory(self):
+        first = self.fetcher.get_keyset(self.server.url)
+
+        self.assertIs(self.fetcher.get_keyset(self.server.url), first)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_expired_keyset_is_revalidated_with_etag(self):
+        self.server.cache_control = "max-age=0"
+        first = self.fetcher.get_keyset(self.server.url)
+
+        second = self.fetcher.get_keyset(self.server.url)
+
+        self.assertIs(second, first)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(self.server.requests[1]["If-None-Match"], '"v1"')
+
+    def test_changed_keyset_replaces_the_cached_one(self):
+        self.server.cache_control = "no-cache"
+        self.fetcher.get_keyset(self.server.url)
+        self.server.body = dump_jwks(second=SECOND_KEY)
+        self.server.etag = '"v2"'
+
+        keyset = self.fetcher.get_keyset(self.server.url)
+
+        self.assertIsNone(keyset.get_key("first"))
+        self.assertEqual(keyset.etag, '"v2"')
+
+    def test_stale_keyset_is_served_while_refreshed_in_background(self):
+        self.server.cache_control = "max-age=0, stale-while-revalidate=60"
+        first = self.fetcher.get_keyset(self.server.url)
+        self.server.body = dump_jwks(second=SECOND_KEY)
+        self.server.etag = '"v2"'
+        self.server.delay = 0.2
+
+        started = time.monotonic()
+        self.assertIs(self.fetcher.get_keyset(self.server.url), first)
+        self.assertLess(time.monotonic() - started, self.server.delay)
+
+        # Wait for the background refresh to complete.
+        deadline = time.monotonic() + 2
+        while self.fetcher.get_keyset(self.server.url) is first:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        keyset = self.fetcher.get_keyset(self.server.url)
+        self.assertIsNotNone(keyset.get_key("second"))
+
+    def test_burst_of_stale_reads_queues_a_single_background_refresh(self):
+        self.server.cache_control = "max-age=0, stale-while-revalidate=60"
+        self.fetcher.get_keyset(self.server.url)
+        self.server.delay = 0.2
+
+        futures = [
+            self.fetcher.refresh_in_background(self.server.url) for _ in range(10)
+        ]
+
+        self.assertIsNotNone(futures[0])
+        self.assertEqual(futures[1:], [None] * 9)
+        futures[0].result()
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_concurrent_fetches_are_deduplicated(self):
+        self.server.delay = 0.2
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            keysets = list(
+                executor.map(
+                    lambda _: self.fetcher.get_keyset(self.server.url), range(10)
+                )
+            )
+
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertTrue(all(keyset is keysets[0] for keyset in keysets))
+
+    def test_unknown_kid_triggers_a_rate_limited_refresh(self):
+        self.fetcher.min_refresh_interval = 0
+        self.fetcher.get_keyset(self.server.url)
+        self.server.body = dump_jwks(first=FIRST_KEY, second=SECOND_KEY)
+        self.server.etag = '"v2"'
+
+        self.assertEqual(
+            self.fetcher.get_key(self.server.url, "second").key.n, SECOND_KEY.n
+        )
+        self.assertEqual(len(self.server.requests), 2)
+
+        self.fetcher.min_refresh_interval = 60
+        self.assertIsNone(self.fetcher.get_key(self.server.url, "unknown"))
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_fetch_error_without_cached_keyset_raises(self):
+        self.server.status = 500
+
+        with self.assertRaises(KeysetError):
+            self.fetcher.get_keyset(self.server.url)
+
+    def test_invalid_keyset_raises(self):
+        self.server.body = "not a keyset"
+
+        with self.assertRaises(KeysetError):
+            self.fetcher.get_keyset(self.server.url)
+
+    @data(
+        '{"keys": [{"kty": "RSA", "kid": "first", "n": "!!", "e": "AQAB"}]}',
+        '{"keys": 5}',
+    )
+    def test_undeserializable_keys_raise(self, body):
+        self.server.body = body
+
+        with self.assertRaises(KeysetError):
+            self.fetcher.get_keyset(self.server.url)
+
+    def test_fetch_error_with_cached_keyset_serves_stale_keys(self):
+        self.server.cache_control = "max-age=0"
+        first = self.fetcher.get_keyset(self.server.url)
+        self.server.status = 500
+
+        self.assertIs(self.fetcher.get_keyset(self.server.url), first)
+        # The failed fetch is not retried right away.
+        self.assertIs(self.fetcher.get_keyset(self.server.url), first)
+        self.assertEqual(len(self.server.requests), 2)
@@ -0,0 +1,119 @@
+from Cryptodome.PublicKey import RSA
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from lti_store.api import get_configuration
+from lti_store.models import (
+    ExternalLtiConfiguration,
+    ExternalLtiKeyMaterial,
+    LTIVersion,
+)
+
+KEY_OBJ = RSA.generate(2048)
+PRIVATE_KEY = KEY_OBJ.export_key().decode()
+PUBLIC_KEY = KEY_OBJ.publickey().export_key().decode()
+
+
+class TestKeyMaterial(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.config = ExternalLtiConfiguration.objects.create(
+            name="Tool",
+            slug="tool",
+            version=LTIVersion.LTI_1P3,
+            lti_1p3_private_key=PRIVATE_KEY,
+            lti_1p3_tool_public_key=PUBLIC_KEY,
+        )
+
+    def test_key_material_is_stored_in_its_own_table(self):
+        key_material = ExternalLtiKeyMaterial.objects.get(configuration=self.config)
+
+        self.assertEqual(key_material.lti_1p3_private_key, PRIVATE_KEY)
+        self.assertEqual(key_material.lti_1p3_tool_public_key, PUBLIC_KEY)
+        self.assertEqual(
+            key_material.lti_1p3_public_jwk["keys"][0]["kid"],
+            key_material.lti_1p3_private_key_id,
+        )
+
+    def test_key_material_is_only_loaded_when_used(self):
+        with self.assertNumQueries(1):
+            config = ExternalLtiConfiguration.objects.get(pk=self.config.pk)
+            self.assertEqual(config.name, "Tool")
+
+        with self.assertNumQueries(1):
+            self.assertEqual(config.lti_1p3_private_key, PRIVATE_KEY)
+            self.assertEqual(config.lti_1p3_tool_public_key, PUBLIC_KEY)
+
+    def test_key_material_can_be_loaded_with_the_configuration(self):
+        with self.assertNumQueries(1):
+            config = ExternalLtiConfiguration.objects.with_key_material().get(
+                pk=self.config.pk
+            )
+            self.assertEqual(config.lti_1p3_private_key, PRIVATE_KEY)
+
+    def test_unchanged_key_material_is_not_saved(self):
+        config = ExternalLtiConfiguration.objects.with_key_material().get(
+            pk=self.config.pk
+        )
+
+        config.description = "Updated"
+        # The configuration and its payload are written, not the key material.
+        with self.assertNumQueries(2):
+            config.save()
+
+    def test_changed_key_material_is_saved(self):
+        config = ExternalLtiConfiguration.objects.get(pk=self.config.pk)
+
+        config.lti_1p3_tool_public_key = ""
+        config.lti_1p3_tool_keyset_url = "https://tool.example.com/jwks"
+        config.save()
+
+        self.assertEqual(
+            ExternalLtiKeyMaterial.objects.get().lti_1p3_tool_public_key, ""
+        )
+
+    def test_key_material_is_validated_with_the_configuration(self):
+        self.config.lti_1p3_tool_public_key = "invalid"
+
+        with self.assertRaises(ValidationError) as context:
+            self.config.full_clean()
+
+        self.assertIn("lti_1p3_tool_public_key", context.exception.message_dict)
+
+    def test_configuration_without_key_material(self):
+        config = ExternalLtiConfiguration.objects.create(name="LTI 1.1", slug="lti-1p1")
+
+        self.assertEqual(config.lti_1p3_private_key, "")
+        self.assertEqual(config.lti_1p3_public_jwk, {})
+        self.assertFalse(
+            ExternalLtiKeyMaterial.objects.filter(configuration=config).exists()
+        )
+        self.assertEqual(get_configuration("lti-1p1")["lti_1p3_private_key"], "")
+
+    def test_key_material_is_bulk_written_with_the_configurations(self):
+        configs = ExternalLtiConfiguration.objects.bulk_create(
+            [
+                ExternalLtiConfiguration(
+                    name="First", slug="first", lti_1p3_tool_public_key=PUBLIC_KEY
+                ),
+                ExternalLtiConfiguration(name="Second", slug="second"),
+            ]
+        )
+        configs[0].lti_1p3_tool_public_key = ""
+        configs[1].lti_1p3_tool_public_key = PUBLIC_KEY
+
+        ExternalLtiConfiguration.objects.bulk_update(configs, ["name"])
+
+        self.assertEqual(
+            dict(
+                ExternalLtiKeyMaterial.objects.filter(
+                    configuration__slug__in=["first", "second"]
+                ).values_list("configuration__slug", "lti_1p3_tool_public_key")
+            ),
+            {"first": "", "second": PUBLIC_KEY},
+        )
+
+    def test_key_material_is_deleted_with_the_configuration(self):
+        self.config.delete()
+
+        self.assertFalse(ExternalLtiKeyMaterial.objects.exists())
@@ -0,0 +1,95 @@
+from io import StringIO
+from unittest.mock import patch
+
+from Cryptodome.PublicKey import RSA
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from lti_store.models import PregeneratedRsaKey
+
+PRIVATE_KEY = RSA.generate(2048).export_key().decode()
+
+
+@patch("lti_store.models.generate_private_key", return_value=PRIVATE_KEY)
+class TestKeyPool(TestCase):
+    def test_take_returns_pooled_keys_first(self, generate_mock):
+        PregeneratedRsaKey.objects.create(private_key="first")
+        PregeneratedRsaKey.objects.create(private_key="second")
+
+        self.assertEqual(PregeneratedRsaKey.objects.take_many(2), ["first", "second"])
+
+        self.assertFalse(PregeneratedRsaKey.objects.exists())
+        generate_mock.assert_not_called()
+
+    def test_take_generates_keys_when_pool_is_empty(self, generate_mock):
+        PregeneratedRsaKey.objects.create(private_key="pooled")
+
+        self.assertEqual(
+            PregeneratedRsaKey.objects.take_many(2), ["pooled", PRIVATE_KEY]
+        )
+        generate_mock.assert_called_once_with()
+
+    @override_settings(LTI_STORE_KEY_POOL_SIZE=3)
+    def test_refill_fills_pool_to_its_size(self, generate_mock):
+        PregeneratedRsaKey.objects.create(private_key="pooled")
+
+        self.assertEqual(PregeneratedRsaKey.objects.refill(), 2)
+        self.assertEqual(PregeneratedRsaKey.objects.refill(), 0)
+
+        self.assertEqual(PregeneratedRsaKey.objects.count(), 3)
+        self.assertEqual(generate_mock.call_count, 2)
+
+    def test_fill_key_pool_command(
+        self, generate_mock
+    ):  # pylint: disable=unused-argument
+        stdout = StringIO()
+
+        call_command("lti_store_fill_key_pool", size=2, workers=0, stdout=stdout)
+
+        self.assertEqual(PregeneratedRsaKey.objects.count(), 2)
+        self.assertEqual(
+            stdout.getvalue().strip(), "Generated 2 keys, the pool holds 2 keys."
+        )
+
+
+class TestKeyPoolGeneration(TestCase):
+    def test_refill_generates_valid_keys_in_worker_processes(self):
+        PregeneratedRsaKey.objects.refill(size=2, workers=2)
+
+        for key in PregeneratedRsaKey.objects.all():
+            self.assertTrue(RSA.import_key(key.private_key).has_private())
+
+
+@override_settings(
+    LTI_STORE_KEY_POOL_BACKGROUND_REFILL=True,
+    LTI_STORE_KEY_POOL_LOW_WATER_MARK=2,
+    LTI_STORE_KEY_POOL_SIZE=3,
+)
+@patch("lti_store.models.generate_private_key", return_value=PRIVATE_KEY)
+class TestKeyPoolBackgroundRefill(TransactionTestCase):
+    def test_pool_is_refilled_under_low_water_mark(self, generate_mock):
+        PregeneratedRsaKey.objects.create(private_key="first")
+        PregeneratedRsaKey.objects.create(private_key="second")
+
+        with patch.object(
+            PregeneratedRsaKey.objects, "refill_in_background"
+        ) as refill_mock:
+            PregeneratedRsaKey.objects.take()
+            refill_mock.assert_called_once_with()
+
+        PregeneratedRsaKey.objects.refill_in_background().join()
+        self.assertEqual(PregeneratedRsaKey.objects.count(), 3)
+        self.assertEqual(generate_mock.call_count, 2)
+
+    def test_pool_is_not_refilled_above_low_water_mark(
+        self, generate_mock
+    ):  # pylint: disable=unused-argument
+        for index in range(3):
+            PregeneratedRsaKey.objects.create(private_key=str(index))
+
+        with patch.object(
+            PregeneratedRsaKey.objects, "refill_in_background"
+        ) as refill_mock:
+            PregeneratedRsaKey.objects.take()
+
+        refill_mock.assert_not_called()
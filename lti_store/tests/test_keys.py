@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+from Cryptodome.PublicKey import RSA
+from django.test import TestCase
+
+from lti_store.keys import KeyMemo, ParsedKeyCache, import_rsa_key
+from lti_store.models import ExternalLtiConfiguration, LTIVersion
+
+KEY_OBJ = RSA.generate(2048)
+PRIVATE_KEY = KEY_OBJ.export_key().decode()
+PUBLIC_KEY = KEY_OBJ.publickey().export_key().decode()
+
+
+class TestKeyMemo(TestCase):
+    def test_each_pem_is_parsed_once(self):
+        memo = KeyMemo()
+
+        with patch.object(RSA, "import_key", wraps=RSA.import_key) as import_key_mock:
+            first = memo.import_key(PRIVATE_KEY)
+            second = memo.import_key(PRIVATE_KEY)
+            memo.import_key(PRIVATE_KEY.encode())
+
+        import_key_mock.assert_called_once_with(PRIVATE_KEY)
+        self.assertIs(first, second)
+        self.assertEqual(first.n, KEY_OBJ.n)
+
+    def test_least_recently_used_key_is_evicted(self):
+        memo = KeyMemo(max_size=1)
+        memo.import_key(PRIVATE_KEY)
+        memo.import_key(PUBLIC_KEY)
+
+        with patch.object(RSA, "import_key", wraps=RSA.import_key) as import_key_mock:
+            memo.import_key(PRIVATE_KEY)
+
+        self.assertEqual(len(memo), 1)
+        import_key_mock.assert_called_once_with(PRIVATE_KEY)
+
+    def test_invalid_pem_raises_and_is_not_memoized(self):
+        memo = KeyMemo()
+
+        with self.assertRaises(ValueError):
+            memo.import_key("invalid-key")
+        self.assertEqual(len(memo), 0)
+
+
+class TestParsedKeyCache(TestCase):
+    def test_key_is_built_once(self):
+        keys = ParsedKeyCache()
+
+        first = keys.get("kid", PRIVATE_KEY, kid="kid")
+
+        self.assertIs(keys.get("kid", PRIVATE_KEY, kid="kid"), first)
+        self.assertEqual(first.kid, "kid")
+        self.assertEqual(first.key.n, KEY_OBJ.n)
+
+    def test_key_is_rebuilt_when_the_pem_changes(self):
+        keys = ParsedKeyCache()
+        other_key = RSA.generate(2048)
+        keys.get("kid", PRIVATE_KEY, kid="kid")
+
+        key = keys.get("kid", other_key.export_key().decode(), kid="kid")
+
+        self.assertEqual(key.key.n, other_key.n)
+        self.assertEqual(len(keys), 1)
+
+    def test_least_recently_used_key_is_evicted(self):
+        keys = ParsedKeyCache(max_size=1)
+        keys.get("private", PRIVATE_KEY)
+        keys.get("public", PUBLIC_KEY)
+
+        self.assertEqual(len(keys), 1)
+
+
+class TestKeyParsingInModel(TestCase):
+    def test_full_clean_and_save_parse_each_key_once(self):
+        config = ExternalLtiConfiguration(
+            name="Test",
+            slug="test",
+            version=LTIVersion.LTI_1P3,
+            lti_1p3_private_key=PRIVATE_KEY,
+            lti_1p3_tool_public_key=PUBLIC_KEY,
+        )
+
+        with patch.object(RSA, "import_key", wraps=RSA.import_key) as import_key_mock:
+            config.full_clean()
+            config.save()
+            config.full_clean()
+
+        self.assertEqual(import_key_mock.call_count, 2)
+        self.assertEqual(import_rsa_key(PRIVATE_KEY).n, KEY_OBJ.n)
@@ -0,0 +1,87 @@
+import asyncio
+from unittest.mock import Mock
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from lti_store.cache import configuration_cache
+from lti_store.middleware import RequestCacheMiddleware
+
+
+# Missing values are only memoized for the request, not in the cache tiers.
+@override_settings(LTI_STORE_NEGATIVE_CACHE_TTL=0)
+class TestRequestCacheMiddleware(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.request = RequestFactory().get("/")
+        self.loader = Mock(return_value=None)
+
+    def resolve(self):
+        return configuration_cache.get("key", self.loader)
+
+    def test_sync_request_resolves_each_key_once(self):
+        def view(request):
+            for _ in range(3):
+                self.resolve()
+            return HttpResponse()
+
+        middleware = RequestCacheMiddleware(view)
+        self.assertFalse(iscoroutinefunction(middleware))
+
+        middleware(self.request)
+
+        self.loader.assert_called_once_with()
+
+    def test_memo_is_dropped_when_the_request_ends(self):
+        def view(request):
+            self.resolve()
+            return HttpResponse()
+
+        middleware = RequestCacheMiddleware(view)
+        middleware(self.request)
+        middleware(self.request)
+
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_memo_is_dropped_when_the_view_raises(self):
+        def view(request):
+            self.resolve()
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            RequestCacheMiddleware(view)(self.request)
+        self.resolve()
+
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_async_request_resolves_each_key_once(self):
+        async def view(request):
+            self.resolve()
+            # Sync code called from the async view shares the same memo.
+            await sync_to_async(self.resolve)()
+            await asyncio.gather(*(sync_to_async(self.resolve)() for _ in range(3)))
+            return HttpResponse()
+
+        middleware = RequestCacheMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        async_to_sync(middleware)(self.request)
+
+        self.loader.assert_called_once_with()
+
+    def test_concurrent_async_requests_do_not_share_memo(self):
+        async def view(request):
+            self.resolve()
+            await asyncio.sleep(0)
+            self.resolve()
+            return HttpResponse()
+
+        middleware = RequestCacheMiddleware(view)
+
+        async def handle_two_requests():
+            await asyncio.gather(middleware(self.request), middleware(self.request))
+
+        async_to_sync(handle_two_requests)()
+
+        self.assertEqual(self.loader.call_count, 2)
@@ -0,0 +1,209 @@
+from importlib import import_module
+
+from ddt import data, ddt, unpack
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from lti_store.models import ExternalLtiConfiguration, ExternalLtiConfigurationPayload
+from lti_store.payload import decode_payload
+
+APP = "lti_store"
+
+
+@override_settings(MIGRATION_MODULES={})
+class MigrationTestCase(TransactionTestCase):
+    """
+    Migrate the tables of the app back to `migrate_from`, to test the next migrations.
+
+    The tables are migrated to the latest state again after every test.
+    """
+
+    migrate_from = None
+
+    def setUp(self):
+        super().setUp()
+        latest = MigrationExecutor(connection).loader.graph.leaf_nodes(APP)
+        # The test database is created from the models, in the latest state.
+        MigrationExecutor(connection).migrate(latest, fake=True)
+        self.addCleanup(self.migrate, latest[0][1])
+        self.apps = self.migrate(self.migrate_from)
+
+    def migrate(self, name):
+        """Migrate the app to the migration `name`, returning the apps of that state."""
+        executor = MigrationExecutor(connection)
+        executor.migrate([(APP, name)])
+        executor.loader.build_graph()
+        return executor.loader.project_state((APP, name)).apps
+
+
+class TestKeyMaterialMigration(MigrationTestCase):
+    migrate_from = "0007_public_jwk_etag"
+
+    def setUp(self):
+        super().setUp()
+        ExternalLtiConfiguration = self.apps.get_model(APP, "ExternalLtiConfiguration")
+        ExternalLtiConfiguration.objects.create(
+            name="LTI 1.3",
+            slug="lti-1p3",
+            version="lti_1p3",
+            lti_1p3_private_key="private key",
+            lti_1p3_private_key_id="kid",
+            lti_1p3_tool_public_key="public key",
+            lti_1p3_public_jwk={"keys": [{"kid": "kid"}]},
+            lti_1p3_public_jwk_etag="etag",
+        )
+        ExternalLtiConfiguration.objects.create(name="LTI 1.1", slug="lti-1p1")
+
+    def test_key_material_is_moved_to_its_own_table(self):
+        apps = self.migrate("0008_key_material")
+
+        ExternalLtiKeyMaterial = apps.get_model(APP, "ExternalLtiKeyMaterial")
+        key_material = ExternalLtiKeyMaterial.objects.get()
+        self.assertEqual(key_material.configuration.slug, "lti-1p3")
+        self.assertEqual(
+            (
+                key_material.lti_1p3_private_key,
+                key_material.lti_1p3_private_key_id,
+                key_material.lti_1p3_tool_public_key,
+                key_material.lti_1p3_public_jwk,
+                key_material.lti_1p3_public_jwk_etag,
+            ),
+            ("private key", "kid", "public key", {"keys": [{"kid": "kid"}]}, "etag"),
+        )
+
+    def test_key_material_is_restored_when_migrating_back(self):
+        self.migrate("0008_key_material")
+        apps = self.migrate(self.migrate_from)
+
+        ExternalLtiConfiguration = apps.get_model(APP, "ExternalLtiConfiguration")
+        config = ExternalLtiConfiguration.objects.get(slug="lti-1p3")
+        self.assertEqual(config.lti_1p3_private_key, "private key")
+        self.assertEqual(config.lti_1p3_public_jwk, {"keys": [{"kid": "kid"}]})
+        self.assertEqual(config.lti_1p3_public_jwk_etag, "etag")
+        config = ExternalLtiConfiguration.objects.get(slug="lti-1p1")
+        self.assertEqual(config.lti_1p3_private_key, "")
+        self.assertEqual(config.lti_1p3_public_jwk, {})
+
+
+@ddt
+class TestParseRedirectUris(SimpleTestCase):
+    @data(
+        ("", []),
+        ("  ", []),
+        ("[]", []),
+        ('["https://a.com", "https://b.com"]', ["https://a.com", "https://b.com"]),
+        ('"https://a.com"', ["https://a.com"]),
+        ('["https://a.com", ""]', ["https://a.com"]),
+        ('{"uri": "https://a.com"}', []),
+        ("https://a.com, https://b.com", ["https://a.com", "https://b.com"]),
+        ("https://a.com\nhttps://b.com\n", ["https://a.com", "https://b.com"]),
+        ('["https://a.com", "https://b.com"', ["https://a.com", "https://b.com"]),
+    )
+    @unpack
+    def test_parse_redirect_uris(self, value, uris):
+        migration = import_module(f"{APP}.migrations.0009_redirect_uris_json")
+
+        self.assertEqual(migration.parse_redirect_uris(value), uris)
+
+
+class TestRedirectUrisMigration(MigrationTestCase):
+    migrate_from = "0008_key_material"
+
+    def test_redirect_uris_are_converted_to_lists(self):
+        ExternalLtiConfiguration = self.apps.get_model(APP, "ExternalLtiConfiguration")
+        values = {
+            "blank": "",
+            "json": '["https://a.com"]',
+            "separated": "https://a.com,https://b.com",
+            "invalid": "[https://a.com",
+        }
+        for slug, value in values.items():
+            ExternalLtiConfiguration.objects.create(
+                name=slug, slug=slug, lti_1p3_redirect_uris=value
+            )
+
+        apps = self.migrate("0009_redirect_uris_json")
+
+        ExternalLtiConfiguration = apps.get_model(APP, "ExternalLtiConfiguration")
+        self.assertEqual(
+            dict(
+                ExternalLtiConfiguration.objects.values_list(
+                    "slug", "lti_1p3_redirect_uris"
+                )
+            ),
+            {
+                "blank": [],
+                "json": ["https://a.com"],
+                "separated": ["https://a.com", "https://b.com"],
+                "invalid": ["https://a.com"],
+            },
+        )
+
+        apps = self.migrate(self.migrate_from)
+
+        ExternalLtiConfiguration = apps.get_model(APP, "ExternalLtiConfiguration")
+        self.assertEqual(
+            dict(
+                ExternalLtiConfiguration.objects.values_list(
+                    "slug", "lti_1p3_redirect_uris"
+                )
+            ),
+            {
+                "blank": "[]",
+                "json": '["https://a.com"]',
+                "separated": '["https://a.com", "https://b.com"]',
+                "invalid": '["https://a.com"]',
+            },
+        )
+
+
+class TestConfigurationPayloadMigration(MigrationTestCase):
+    migrate_from = "0010_sync_timestamps"
+
+    def setUp(self):
+        super().setUp()
+        ExternalLtiConfiguration = self.apps.get_model(APP, "ExternalLtiConfiguration")
+        ExternalLtiKeyMaterial = self.apps.get_model(APP, "ExternalLtiKeyMaterial")
+        config = ExternalLtiConfiguration.objects.create(
+            name="LTI 1.3",
+            slug="lti-1p3",
+            version="lti_1p3",
+            lti_1p3_redirect_uris=["https://a.com"],
+        )
+        ExternalLtiKeyMaterial.objects.create(
+            configuration=config,
+            lti_1p3_private_key="private key",
+            lti_1p3_private_key_id="kid",
+            lti_1p3_public_jwk={"keys": [{"kid": "kid"}]},
+        )
+        ExternalLtiConfiguration.objects.create(name="LTI 1.1", slug="lti-1p1")
+
+    def test_payloads_are_computed(self):
+        self.migrate("0011_configuration_payload")
+
+        # The tables are in the state of the current models.
+        configs = ExternalLtiConfiguration.objects.with_key_material()
+        self.assertEqual(configs.count(), 2)
+        self.assertFalse(configs.stale_payloads().exists())
+        for config in configs:
+            serialized = config.serialize()
+            del serialized["id"]
+            self.assertEqual(decode_payload(config.payload.data), serialized)
+            self.assertEqual(
+                config.payload.version,
+                ExternalLtiConfiguration.get_payload_version(),
+            )
+
+    def test_payloads_are_dropped_when_migrating_back(self):
+        self.migrate("0011_configuration_payload")
+        apps = self.migrate(self.migrate_from)
+
+        with self.assertRaises(LookupError):
+            apps.get_model(APP, "ExternalLtiConfigurationPayload")
+        self.assertNotIn(
+            ExternalLtiConfigurationPayload._meta.db_table,
+            connection.introspection.table_names(),
+        )
+        ExternalLtiConfiguration = apps.get_model(APP, "ExternalLtiConfiguration")
+        self.assertEqual(ExternalLtiConfiguration.objects.count(), 2)
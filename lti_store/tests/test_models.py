@@ -4,7 +4,12 @@ from ddt import ddt, data
 from Cryptodome.PublicKey import RSA
 from django.core.exceptions import ValidationError
 from django.test import TestCase
-from lti_store.models import ExternalLtiConfiguration, LTIVersion, MESSAGES
+from lti_store.models import (
+    ExternalLtiConfiguration,
+    LTIVersion,
+    MESSAGES,
+    PregeneratedRsaKey,
+)
 
 
 @ddt
@@ -47,22 +52,28 @@ class LTIConfigurationTestCase(TestCase):
         )
 
     def test_1p3_missing_private_key(self):
-        """Test clean method on a LTI 1.3 configuration with missing private key."""
-        with self.assertRaises(ValidationError) as exc:
-            ExternalLtiConfiguration(
-                **self.REQUIRED_FIELDS,
-                version=LTIVersion.LTI_1P3,
-                lti_1p3_tool_public_key=self.PUBLIC_KEY,
-            ).clean()
+        """Test clean method accepts a LTI 1.3 configuration with missing private key."""
+        ExternalLtiConfiguration(
+            **self.REQUIRED_FIELDS,
+            version=LTIVersion.LTI_1P3,
+            lti_1p3_tool_public_key=self.PUBLIC_KEY,
+        ).clean()
+
+    def test_1p3_save_takes_missing_private_key_from_pool(self):
+        """Test save method on a LTI 1.3 configuration with missing private key."""
+        PregeneratedRsaKey.objects.create(private_key=self.PRIVATE_KEY)
 
+        config = ExternalLtiConfiguration.objects.create(
+            **self.REQUIRED_FIELDS,
+            version=LTIVersion.LTI_1P3,
+            lti_1p3_tool_public_key=self.PUBLIC_KEY,
+        )
+
+        self.assertEqual(config.lti_1p3_private_key, self.PRIVATE_KEY)
         self.assertEqual(
-            str(exc.exception),
-            str(
-                {
-                    "lti_1p3_private_key": [MESSAGES["required"]],
-                },
-            ),
+            config.lti_1p3_public_jwk["keys"][0]["kid"], config.lti_1p3_private_key_id
         )
+        self.assertFalse(PregeneratedRsaKey.objects.exists())
 
     def test_1p3_invalid_private_key(self):
         """Test clean method on a LTI 1.3 configuration with invalid private key."""
@@ -102,7 +113,9 @@ class LTIConfigurationTestCase(TestCase):
             ),
         )
 
-    @data("invalid-redirect-uris", '{"test": "test"}')
+    @data(
+        "invalid-redirect-uris", '{"test": "test"}', {"test": "test"}, ["https://a", 1]
+    )
     def test_1p3_invalid_redirect_uris(self, value):
         """Test clean method on a LTI 1.3 configuration with invalid redirect URIs."""
         with self.assertRaises(ValidationError) as exc:
@@ -123,6 +136,16 @@ class LTIConfigurationTestCase(TestCase):
             ),
         )
 
+    def test_1p3_valid_redirect_uris(self):
+        """Test clean method on a LTI 1.3 configuration with a list of redirect URIs."""
+        ExternalLtiConfiguration(
+            **self.REQUIRED_FIELDS,
+            version=LTIVersion.LTI_1P3,
+            lti_1p3_private_key=self.PRIVATE_KEY,
+            lti_1p3_tool_public_key=self.PUBLIC_KEY,
+            lti_1p3_redirect_uris=["https://tool.example.com/launch"],
+        ).full_clean()
+
     def test_1p3_missing_public_key_and_keyset_url(self):
         """Test clean method on a LTI 1.3 configuration with missing public key or keyset URL."""
         with self.assertRaises(ValidationError) as exc:
@@ -142,10 +165,10 @@ class LTIConfigurationTestCase(TestCase):
             ),
         )
 
-    @patch("lti_store.models.json.loads")
+    @patch("lti_store.keys.json.loads")
     @patch.object(RSA, "import_key")
-    @patch("lti_store.models.RSAKey")
-    @patch("lti_store.models.jwk.KEYS")
+    @patch("lti_store.keys.RSAKey")
+    @patch("lti_store.keys.jwk.KEYS")
     @patch("lti_store.models.uuid.uuid4")
     def test_1p3_save(
         self,
@@ -177,3 +200,73 @@ class LTIConfigurationTestCase(TestCase):
         keys_mock().append.assert_called_once_with(rsakey_mock())
         keys_mock().dump_jwks.assert_called_once_with()
         loads_mock.assert_called_once_with(keys_mock().dump_jwks())
+
+    def create_1p3_config(self):
+        return ExternalLtiConfiguration.objects.create(
+            **self.REQUIRED_FIELDS,
+            version=LTIVersion.LTI_1P3,
+            lti_1p3_private_key=self.PRIVATE_KEY,
+            lti_1p3_tool_public_key=self.PUBLIC_KEY,
+        )
+
+    def test_1p3_save_skips_jwk_when_key_material_is_unchanged(self):
+        """Test save method doesn't parse the private key when it didn't change."""
+        self.create_1p3_config()
+        config = ExternalLtiConfiguration.objects.get(slug=self.REQUIRED_FIELDS["slug"])
+        public_jwk = config.lti_1p3_public_jwk
+
+        with patch.object(RSA, "import_key") as rsa_import_key_mock:
+            config.description = "Updated description"
+            config.save()
+            config.lti_advantage_enable_nrps = True
+            config.save()
+
+        rsa_import_key_mock.assert_not_called()
+        config.refresh_from_db()
+        self.assertEqual(config.lti_1p3_public_jwk, public_jwk)
+
+    @data("lti_1p3_private_key", "lti_1p3_private_key_id")
+    def test_1p3_save_regenerates_jwk_when_key_material_changes(self, field):
+        """Test save method regenerates the public JWK when the key material changes."""
+        config = self.create_1p3_config()
+        new_values = {
+            "lti_1p3_private_key": RSA.generate(2048).export_key().decode(),
+            "lti_1p3_private_key_id": "new-key-id",
+        }
+
+        setattr(config, field, new_values[field])
+        config.save()
+
+        config = ExternalLtiConfiguration.objects.get(pk=config.pk)
+        self.assertEqual(
+            config.lti_1p3_public_jwk["keys"][0]["kid"], config.lti_1p3_private_key_id
+        )
+        if field == "lti_1p3_private_key":
+            self.assertEqual(
+                RSA.import_key(config.lti_1p3_private_key).n,
+                RSA.import_key(new_values[field]).n,
+            )
+
+    def test_1p3_save_with_update_fields_persists_regenerated_jwk(self):
+        """Test save method adds the regenerated JWK to the updated fields."""
+        config = self.create_1p3_config()
+
+        config.lti_1p3_private_key_id = ""
+        config.save(update_fields=["lti_1p3_private_key_id"])
+
+        config.refresh_from_db()
+        self.assertNotEqual(config.lti_1p3_private_key_id, "")
+        self.assertEqual(
+            config.lti_1p3_public_jwk["keys"][0]["kid"], config.lti_1p3_private_key_id
+        )
+
+    def test_1p3_save_generates_jwk_when_switching_from_1p1(self):
+        """Test save method generates the public JWK of a configuration switched to LTI 1.3."""
+        config = ExternalLtiConfiguration.objects.create(**self.REQUIRED_FIELDS)
+        config = ExternalLtiConfiguration.objects.get(pk=config.pk)
+
+        config.version = LTIVersion.LTI_1P3
+        config.lti_1p3_private_key = self.PRIVATE_KEY
+        config.save()
+
+        self.assertIn("keys", config.lti_1p3_public_jwk)
@@ -0,0 +1,174 @@
+from io import StringIO
+from unittest.mock import patch
+
+from Cryptodome.PublicKey import RSA
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from lti_store.api import get_all_configurations, get_configuration
+from lti_store.models import (
+    ExternalLtiConfiguration,
+    ExternalLtiConfigurationPayload,
+    ExternalLtiKeyMaterial,
+    LTIVersion,
+)
+from lti_store.payload import decode_payload, encode_payload
+
+TOOL_KEY = RSA.generate(2048).publickey().export_key().decode()
+
+
+def get_payload(slug):
+    payload = ExternalLtiConfigurationPayload.objects.get(configuration__slug=slug)
+    return decode_payload(payload.data)
+
+
+def get_serialized(slug):
+    serialized = (
+        ExternalLtiConfiguration.objects.with_key_material().get(slug=slug).serialize()
+    )
+    del serialized["id"]
+    return serialized
+
+
+class TestPayload(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.config = ExternalLtiConfiguration.objects.create(
+            name="Test",
+            slug="test",
+            version=LTIVersion.LTI_1P3,
+            lti_1p3_tool_public_key=TOOL_KEY,
+        )
+
+    def test_payload_is_computed_on_save(self):
+        self.assertEqual(get_payload("test"), get_serialized("test"))
+        self.assertEqual(
+            self.config.payload.version, ExternalLtiConfiguration.get_payload_version()
+        )
+        self.assertFalse(ExternalLtiConfiguration.objects.stale_payloads().exists())
+
+    def test_configurations_are_listed_without_their_payload(self):
+        with CaptureQueriesContext(connection) as queries:
+            list(ExternalLtiConfiguration.objects.all())
+
+        self.assertNotIn("payload", queries[0]["sql"])
+
+    def test_payload_is_updated_with_the_fields(self):
+        config = ExternalLtiConfiguration.objects.get(slug="test")
+        config.description = "Updated"
+        config.lti_1p3_tool_public_key = ""
+        config.lti_1p3_tool_keyset_url = "https://tool.example.com/jwks"
+        config.save(update_fields=["description", "lti_1p3_tool_public_key"])
+
+        payload = get_payload("test")
+        self.assertEqual(payload["description"], "Updated")
+        self.assertEqual(payload["lti_1p3_tool_public_key"], "")
+        self.assertEqual(payload, get_serialized("test"))
+
+    def test_partial_saves_store_the_payload_of_the_saved_fields(self):
+        config = ExternalLtiConfiguration.objects.get(slug="test")
+        config.description = "Unsaved"
+        config.name = "Renamed"
+        config.save(update_fields=["name"])
+
+        self.assertEqual(get_payload("test"), get_serialized("test"))
+        self.assertEqual(get_configuration("test")["name"], "Renamed")
+        self.assertEqual(get_configuration("test")["description"], "")
+
+    def test_payload_is_cleared_when_the_key_material_is_saved(self):
+        key_material = ExternalLtiKeyMaterial.objects.get(configuration=self.config)
+        key_material.lti_1p3_tool_public_key = ""
+        key_material.save()
+
+        self.assertTrue(ExternalLtiConfiguration.objects.stale_payloads().exists())
+        self.assertEqual(get_configuration("test")["lti_1p3_tool_public_key"], "")
+
+    def test_bulk_writes_compute_payloads(self):
+        ExternalLtiConfiguration.objects.bulk_create(
+            [
+                ExternalLtiConfiguration(
+                    name="Other", slug="other", lti_1p1_launch_url="http://a"
+                )
+            ]
+        )
+        self.config.name = "Renamed"
+        ExternalLtiConfiguration.objects.bulk_update([self.config], ["name"])
+
+        self.assertEqual(get_payload("other"), get_serialized("other"))
+        self.assertEqual(get_payload("test")["name"], "Renamed")
+
+    def test_lookups_only_read_the_payload(self):
+        with CaptureQueriesContext(connection) as queries:
+            config = get_configuration("test")
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("keymaterial", queries[0]["sql"])
+        self.assertNotIn("lti_1p3_tool_public_key", queries[0]["sql"])
+        self.assertEqual(config, {"id": self.config.pk, **get_serialized("test")})
+
+    @patch("lti_store.payload.orjson", None)
+    def test_json_fallback(self):
+        payload = encode_payload({"name": "Tést", "lti_1p3_redirect_uris": ["a"]})
+
+        self.assertEqual(
+            payload, '{"name":"Tést","lti_1p3_redirect_uris":["a"]}'.encode()
+        )
+        self.assertEqual(decode_payload(memoryview(payload))["name"], "Tést")
+
+
+class TestStalePayloads(TestCase):
+    def setUp(self):
+        super().setUp()
+        for slug in ("first", "second"):
+            ExternalLtiConfiguration.objects.create(
+                name=slug.title(), slug=slug, lti_1p1_launch_url="http://a"
+            )
+
+    def test_update_clears_the_payloads(self):
+        ExternalLtiConfiguration.objects.filter(slug="first").update(name="Updated")
+
+        self.assertEqual(
+            list(
+                ExternalLtiConfiguration.objects.stale_payloads().values_list(
+                    "slug", flat=True
+                )
+            ),
+            ["first"],
+        )
+        with self.assertNumQueries(2):
+            configs = get_all_configurations()
+        self.assertEqual([c["name"] for c in configs], ["Updated", "Second"])
+
+    def test_payloads_of_another_version_are_stale(self):
+        ExternalLtiConfigurationPayload.objects.filter(
+            configuration__slug="second"
+        ).update(version=0)
+
+        self.assertEqual(ExternalLtiConfiguration.objects.stale_payloads().count(), 1)
+        self.assertEqual(get_configuration("second")["name"], "Second")
+
+    def test_refresh_payloads(self):
+        ExternalLtiConfiguration.objects.update(description="Updated")
+        modified = ExternalLtiConfiguration.objects.get(slug="first").modified
+
+        self.assertEqual(
+            ExternalLtiConfiguration.objects.refresh_payloads(batch_size=1), 2
+        )
+
+        self.assertEqual(get_payload("first"), get_serialized("first"))
+        self.assertFalse(ExternalLtiConfiguration.objects.stale_payloads().exists())
+        # Refreshing the payloads doesn't report the configurations as modified.
+        self.assertEqual(
+            ExternalLtiConfiguration.objects.get(slug="first").modified, modified
+        )
+
+    def test_refresh_payloads_command(self):
+        ExternalLtiConfiguration.objects.filter(slug="first").update(name="Updated")
+        stdout = StringIO()
+
+        call_command("lti_store_refresh_payloads", stdout=stdout)
+
+        self.assertEqual(stdout.getvalue().strip(), "Refreshed 1 payloads.")
+        self.assertEqual(get_payload("first")["name"], "Updated")
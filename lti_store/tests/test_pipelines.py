@@ -90,3 +90,70 @@ class TestGetLtiConfigurations(TestCase):
         assert jwk_data['keys'][0]['kid'] == lti_config.lti_1p3_private_key_id
 
         lti_config.delete()
+
+    def test_filter_returns_configuration_summaries_when_requested(self):
+        ExternalLtiConfiguration.objects.create(
+            name="First Config", slug="first-config", description="Long description"
+        )
+        expected = {
+            f"{App.name}:first-config": {
+                "slug": "first-config",
+                "name": "First Config",
+                "version": "lti_1p1",
+            },
+        }
+
+        self.assertEqual(
+            self.filter_step.run_filter({}, "", {}, summary=True)["configurations"],
+            expected,
+        )
+        self.assertEqual(
+            self.filter_step.run_filter({"summary": True}, "", {})["configurations"],
+            expected,
+        )
+
+    def test_filter_returns_a_full_configuration_in_summary_mode(self):
+        ExternalLtiConfiguration.objects.create(
+            name="First Config", slug="first-config", description="Long description"
+        )
+
+        data = self.filter_step.run_filter(
+            {}, f"{App.name}:first-config", {}, summary=True
+        )
+
+        config_data = data["configurations"][f"{App.name}:first-config"]
+        self.assertEqual(config_data["description"], "Long description")
+
+    async def test_arun_filter_returns_a_single_configuration(self):
+        await ExternalLtiConfiguration.objects.acreate(name="Test", slug="test")
+
+        data = await self.filter_step.arun_filter({}, f"{App.name}:test", {})
+
+        self.assertEqual(list(data["configurations"]), [f"{App.name}:test"])
+        self.assertEqual(data["configurations"][f"{App.name}:test"]["name"], "Test")
+        self.assertEqual(data["config_id"], f"{App.name}:test")
+
+    async def test_arun_filter_returns_configurations_unmodified_if_id_is_not_found(
+        self,
+    ):
+        data = await self.filter_step.arun_filter({}, f"{App.name}:unknown", {"a": {}})
+
+        self.assertEqual(data["configurations"], {"a": {}})
+
+    async def test_arun_filter_lists_configurations(self):
+        await ExternalLtiConfiguration.objects.acreate(name="First", slug="first")
+        await ExternalLtiConfiguration.objects.acreate(name="Second", slug="second")
+
+        data = await self.filter_step.arun_filter({}, "", {})
+        summaries = await self.filter_step.arun_filter({"summary": True}, "", {})
+
+        self.assertEqual(
+            list(data["configurations"]), [f"{App.name}:first", f"{App.name}:second"]
+        )
+        self.assertIn(
+            "lti_1p3_private_key", data["configurations"][f"{App.name}:first"]
+        )
+        self.assertEqual(
+            summaries["configurations"][f"{App.name}:first"],
+            {"slug": "first", "name": "First", "version": "lti_1p1"},
+        )
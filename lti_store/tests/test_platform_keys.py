@@ -0,0 +1,205 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from Cryptodome.PublicKey import RSA
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from lti_store.api import get_configuration
+from lti_store.models import (
+    ExternalLtiConfiguration,
+    LtiPlatformKey,
+    LTIVersion,
+    PregeneratedRsaKey,
+)
+
+KEY_OBJ = RSA.generate(2048)
+PRIVATE_KEY = KEY_OBJ.export_key().decode()
+PUBLIC_KEY = KEY_OBJ.publickey().export_key().decode()
+POOL_KEYS = [RSA.generate(2048).export_key().decode() for _ in range(6)]
+
+
+def published_kids(config):
+    config.refresh_from_db()
+    return [key["kid"] for key in config.lti_1p3_public_jwk["keys"]]
+
+
+def key_states(config):
+    return dict(
+        LtiPlatformKey.objects.filter(configuration=config).values_list(
+            "private_key_id", "state"
+        )
+    )
+
+
+class TestPlatformKeys(TestCase):
+    def setUp(self):
+        super().setUp()
+        PregeneratedRsaKey.objects.bulk_create(
+            [PregeneratedRsaKey(private_key=key) for key in POOL_KEYS]
+        )
+        self.config = ExternalLtiConfiguration.objects.create(
+            name="Tool",
+            slug="tool",
+            version=LTIVersion.LTI_1P3,
+            lti_1p3_private_key=PRIVATE_KEY,
+            lti_1p3_private_key_id="initial",
+            lti_1p3_tool_public_key=PUBLIC_KEY,
+        )
+
+    def test_active_key_is_recorded_on_save(self):
+        self.assertEqual(key_states(self.config), {"initial": "active"})
+        self.assertEqual(published_kids(self.config), ["initial"])
+
+    def test_rotation_retires_the_active_key_and_publishes_a_next_key(self):
+        self.config.rotate_platform_key()
+
+        states = key_states(self.config)
+        active = self.config.lti_1p3_private_key_id
+        (next_kid,) = [kid for kid, state in states.items() if state == "next"]
+        self.assertEqual(self.config.lti_1p3_private_key, POOL_KEYS[0])
+        self.assertEqual(
+            states, {"initial": "retired", active: "active", next_kid: "next"}
+        )
+        self.assertEqual(published_kids(self.config), [active, "initial", next_kid])
+
+    def test_rotation_activates_the_published_next_key(self):
+        self.config.rotate_platform_key()
+        (next_key,) = LtiPlatformKey.objects.filter(state=LtiPlatformKey.State.NEXT)
+
+        self.config.rotate_platform_key()
+
+        self.assertEqual(self.config.lti_1p3_private_key_id, next_key.private_key_id)
+        self.assertEqual(self.config.lti_1p3_private_key, next_key.private_key)
+        self.assertEqual(len(published_kids(self.config)), 4)
+
+    @override_settings(LTI_STORE_KEY_ROTATION_OVERLAP=0)
+    def test_retired_keys_are_dropped_after_the_overlap_window(self):
+        self.config.rotate_platform_key()
+        self.config.rotate_platform_key()
+
+        self.assertNotIn("initial", key_states(self.config))
+        self.assertNotIn("initial", published_kids(self.config))
+
+    @override_settings(LTI_STORE_KEY_ROTATION_OVERLAP=3600)
+    def test_expired_keys_are_pruned(self):
+        self.config.rotate_platform_key()
+        active = self.config.lti_1p3_private_key_id
+
+        self.config.prune_platform_keys()
+        self.assertIn("initial", published_kids(self.config))
+
+        later = timezone.now() + timedelta(seconds=3601)
+        with patch("django.utils.timezone.now", return_value=later):
+            self.config.prune_platform_keys()
+
+        self.assertNotIn("initial", key_states(self.config))
+        self.assertNotIn("initial", published_kids(self.config))
+        self.assertEqual(published_kids(self.config)[0], active)
+        self.assertEqual(
+            get_configuration("tool")["lti_1p3_public_jwk"],
+            self.config.lti_1p3_public_jwk,
+        )
+
+    def test_replaced_key_stays_published(self):
+        config = ExternalLtiConfiguration.objects.get(pk=self.config.pk)
+
+        config.lti_1p3_private_key = POOL_KEYS[0]
+        config.lti_1p3_private_key_id = "replacement"
+        config.save()
+
+        self.assertEqual(
+            key_states(config), {"initial": "retired", "replacement": "active"}
+        )
+        self.assertEqual(published_kids(config), ["replacement", "initial"])
+
+    def test_key_saved_before_the_key_table_is_recorded_as_retired(self):
+        LtiPlatformKey.objects.all().delete()
+        config = ExternalLtiConfiguration.objects.get(pk=self.config.pk)
+
+        config.rotate_platform_key()
+
+        self.assertEqual(key_states(config)["initial"], "retired")
+        self.assertIn("initial", published_kids(config))
+
+
+class TestRotateKeysCommand(TestCase):
+    def setUp(self):
+        super().setUp()
+        for slug in ("first", "second"):
+            ExternalLtiConfiguration.objects.create(
+                name=slug,
+                slug=slug,
+                version=LTIVersion.LTI_1P3,
+                lti_1p3_private_key=PRIVATE_KEY,
+                lti_1p3_tool_public_key=PUBLIC_KEY,
+            )
+
+    def rotate_keys(self, *slugs, **options):
+        stdout = StringIO()
+        options.setdefault("workers", 0)
+        call_command("lti_store_rotate_keys", *slugs, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def test_every_configuration_is_rotated(self):
+        stdout = self.rotate_keys(all=True, workers=2)
+
+        self.assertEqual(stdout.strip(), "Rotated the keys of 2 configurations.")
+        for config in ExternalLtiConfiguration.objects.all():
+            self.assertNotEqual(config.lti_1p3_private_key, PRIVATE_KEY)
+            self.assertEqual(len(config.lti_1p3_public_jwk["keys"]), 3)
+
+    def test_configurations_are_rotated_by_slug(self):
+        self.rotate_keys("first")
+
+        self.assertEqual(
+            ExternalLtiConfiguration.objects.get(slug="second").lti_1p3_private_key,
+            PRIVATE_KEY,
+        )
+        self.assertNotEqual(
+            ExternalLtiConfiguration.objects.get(slug="first").lti_1p3_private_key,
+            PRIVATE_KEY,
+        )
+
+    def test_keys_are_generated_up_front(self):
+        self.rotate_keys(all=True)
+
+        self.assertEqual(PregeneratedRsaKey.objects.count(), 0)
+        self.rotate_keys(all=True)
+        self.assertEqual(PregeneratedRsaKey.objects.count(), 0)
+
+    def test_unknown_slug(self):
+        with self.assertRaises(CommandError):
+            self.rotate_keys("first", "unknown")
+
+    @override_settings(LTI_STORE_KEY_ROTATION_OVERLAP=3600)
+    def test_expired_keys_are_pruned(self):
+        self.rotate_keys("first")
+        first = ExternalLtiConfiguration.objects.get(slug="first")
+        kids = published_kids(first)
+
+        self.assertEqual(
+            self.rotate_keys(prune=True).strip(), "Pruned the keys of 0 configurations."
+        )
+        self.assertEqual(published_kids(first), kids)
+
+        later = timezone.now() + timedelta(seconds=3601)
+        with patch("django.utils.timezone.now", return_value=later):
+            stdout = self.rotate_keys(prune=True)
+
+        self.assertEqual(stdout.strip(), "Pruned the keys of 1 configurations.")
+        self.assertEqual(published_kids(first), [kids[0], kids[2]])
+        self.assertEqual(
+            LtiPlatformKey.objects.filter(state=LtiPlatformKey.State.RETIRED).count(),
+            0,
+        )
+
+    def test_prune_applies_to_every_configuration(self):
+        with self.assertRaises(CommandError):
+            self.rotate_keys("first", prune=True)
+
+    def test_slugs_or_all_are_required(self):
+        with self.assertRaises(CommandError):
+            self.rotate_keys()
@@ -0,0 +1,107 @@
+import json
+import pickle
+
+from django.db import models
+from django.test import TestCase
+
+from lti_store.api import get_configuration
+from lti_store.cache import configuration_cache
+from lti_store.models import ExternalLtiConfiguration, ExternalLtiKeyMaterial
+from lti_store.records import ConfigurationRecord, FrozenDict
+
+
+class TestConfigurationRecord(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.fields = {
+            "slug": "test",
+            "name": "Test",
+            "lti_1p3_public_jwk": {"keys": [{"kid": "first"}]},
+        }
+        self.record = ConfigurationRecord(self.fields)
+
+    def test_mapping_access(self):
+        self.assertEqual(self.record["name"], "Test")
+        self.assertEqual(self.record.get("missing", "default"), "default")
+        self.assertIn("slug", self.record)
+        self.assertNotIn("missing", self.record)
+        self.assertEqual(list(self.record), ["slug", "name", "lti_1p3_public_jwk"])
+        self.assertEqual(len(self.record), 3)
+        self.assertEqual(dict(self.record.items()), self.fields)
+        with self.assertRaises(KeyError):
+            self.record["missing"]  # pylint: disable=pointless-statement
+
+    def test_records_compare_equal_to_dicts(self):
+        self.assertEqual(self.record, self.fields)
+        self.assertEqual(self.fields, self.record)
+        self.assertNotEqual(self.record, {**self.fields, "name": "Other"})
+
+    def test_records_are_immutable(self):
+        with self.assertRaises(TypeError):
+            self.record["name"] = (
+                "Modified"  # pylint: disable=unsupported-assignment-operation
+            )
+        with self.assertRaises(AttributeError):
+            self.record.name = "Modified"
+        with self.assertRaises(TypeError):
+            self.record.update(name="Modified")
+        self.assertFalse(hasattr(self.record, "__dict__"))
+
+    def test_nested_values_are_immutable(self):
+        public_jwk = self.record["lti_1p3_public_jwk"]
+
+        with self.assertRaises(TypeError):
+            public_jwk["keys"] = []
+        with self.assertRaises(TypeError):
+            public_jwk["keys"].append({"kid": "second"})
+        with self.assertRaises(TypeError):
+            public_jwk["keys"][0]["kid"] = "second"
+        self.assertEqual(public_jwk, self.fields["lti_1p3_public_jwk"])
+
+    def test_nested_fields_are_the_json_fields(self):
+        json_fields = {
+            field.name
+            for model in (ExternalLtiConfiguration, ExternalLtiKeyMaterial)
+            for field in model._meta.concrete_fields
+            if isinstance(field, models.JSONField)
+        }
+
+        self.assertEqual(set(ConfigurationRecord.nested_fields), json_fields)
+
+    def test_other_dicts_are_frozen_too(self):
+        nested = FrozenDict({"a": {"b": [{"c": 1}]}})
+
+        with self.assertRaises(TypeError):
+            nested["a"]["b"][0]["c"] = 2
+
+    def test_copies_are_mutable(self):
+        for copy in (self.record.to_dict(), self.record.copy()):
+            copy["name"] = "Modified"
+            copy["lti_1p3_public_jwk"]["keys"].append({"kid": "second"})
+
+            self.assertIs(type(copy), dict)
+        self.assertEqual(self.record, self.fields)
+
+    def test_records_are_json_serializable(self):
+        self.assertEqual(json.loads(json.dumps(self.record)), self.fields)
+
+    def test_pickling(self):
+        unpickled = pickle.loads(pickle.dumps(self.record))
+
+        self.assertEqual(unpickled, self.record)
+        self.assertIsInstance(unpickled, ConfigurationRecord)
+        with self.assertRaises(TypeError):
+            unpickled["lti_1p3_public_jwk"]["keys"].append({})
+
+    def test_cached_configurations_are_records(self):
+        ExternalLtiConfiguration.objects.create(name="Test", slug="test")
+
+        config = get_configuration("test")
+
+        self.assertIsInstance(config, ConfigurationRecord)
+        self.assertIs(get_configuration("test"), config)
+        # The shared tier holds pickled records.
+        configuration_cache.local.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_configuration("test"), config)
+        self.assertIsInstance(get_configuration("test"), ConfigurationRecord)
@@ -0,0 +1,175 @@
+from unittest.mock import Mock, patch
+
+from django.db import OperationalError, connections
+from django.test import TestCase, override_settings
+
+from lti_store.apps import LtiStoreConfig as App
+from lti_store.models import ExternalLtiConfiguration, ExternalLtiKeyMaterial
+from lti_store.pipelines import GetLtiConfigurations
+from lti_store.routers import (
+    PRIMARY_PIN_KEY,
+    LtiStoreReplicaRouter,
+    replica_reads,
+)
+from lti_store.cache import configuration_cache
+
+ROUTER = "lti_store.routers.LtiStoreReplicaRouter"
+
+
+@override_settings(LTI_STORE_REPLICA_DATABASE="replica")
+class TestLtiStoreReplicaRouter(TestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        super().setUp()
+        self.router = LtiStoreReplicaRouter()
+        configuration_cache.shared.delete(PRIMARY_PIN_KEY)
+
+    def test_reads_go_to_the_replica_within_replica_reads(self):
+        self.assertIsNone(self.router.db_for_read(ExternalLtiConfiguration))
+        with replica_reads():
+            self.assertEqual(
+                self.router.db_for_read(ExternalLtiConfiguration), "replica"
+            )
+            self.assertEqual(self.router.db_for_read(ExternalLtiKeyMaterial), "replica")
+
+    def test_other_models_are_not_routed(self):
+        with replica_reads():
+            self.assertIsNone(
+                self.router.db_for_read(Mock(_meta=Mock(app_label="auth")))
+            )
+
+    @override_settings(LTI_STORE_REPLICA_DATABASE=None)
+    def test_nothing_is_routed_without_a_replica(self):
+        with replica_reads():
+            self.assertIsNone(self.router.db_for_read(ExternalLtiConfiguration))
+        self.assertIsNone(self.router.db_for_write(ExternalLtiConfiguration))
+
+    def test_related_objects_are_read_from_the_database_of_their_instance(self):
+        instance = ExternalLtiConfiguration()
+        instance._state.db = "default"
+
+        with replica_reads():
+            self.assertEqual(
+                self.router.db_for_read(ExternalLtiKeyMaterial, instance=instance),
+                "default",
+            )
+
+    def test_writes_go_to_the_primary(self):
+        instance = ExternalLtiConfiguration()
+        instance._state.db = "replica"
+
+        self.assertEqual(
+            self.router.db_for_write(ExternalLtiConfiguration, instance=instance),
+            "default",
+        )
+        # Routing a write doesn't pin the primary, the write might not happen.
+        self.assertFalse(self.router.is_primary_pinned())
+
+    @patch("lti_store.routers.time.monotonic")
+    def test_reads_stick_to_the_primary_after_a_write(self, monotonic_mock):
+        monotonic_mock.return_value = 100
+        self.router.pin_primary()
+
+        with replica_reads():
+            monotonic_mock.return_value = 104
+            self.assertEqual(
+                self.router.db_for_read(ExternalLtiConfiguration), "default"
+            )
+            monotonic_mock.return_value = 105
+            configuration_cache.shared.delete(PRIMARY_PIN_KEY)
+            self.assertEqual(
+                self.router.db_for_read(ExternalLtiConfiguration), "replica"
+            )
+
+    def test_other_processes_stick_to_the_primary_after_a_write(self):
+        LtiStoreReplicaRouter().pin_primary()
+
+        with replica_reads():
+            self.assertEqual(
+                self.router.db_for_read(ExternalLtiConfiguration), "default"
+            )
+
+    @override_settings(LTI_STORE_REPLICA_RETRY_SECONDS=30)
+    @patch("lti_store.routers.time.monotonic")
+    def test_reads_fall_back_to_the_primary_when_the_replica_is_unavailable(
+        self, monotonic_mock
+    ):
+        monotonic_mock.return_value = 100
+        with patch.object(
+            connections["replica"],
+            "ensure_connection",
+            side_effect=OperationalError("unable to open database file"),
+        ) as ensure_connection_mock, replica_reads():
+            self.assertEqual(
+                self.router.db_for_read(ExternalLtiConfiguration), "default"
+            )
+            monotonic_mock.return_value = 129
+            self.assertEqual(
+                self.router.db_for_read(ExternalLtiConfiguration), "default"
+            )
+            ensure_connection_mock.assert_called_once_with()
+
+            ensure_connection_mock.side_effect = None
+            monotonic_mock.return_value = 130
+            self.assertEqual(
+                self.router.db_for_read(ExternalLtiConfiguration), "replica"
+            )
+
+    def test_relations_between_the_routed_models_are_allowed(self):
+        config = ExternalLtiConfiguration()
+        config._state.db = "replica"
+        key_material = ExternalLtiKeyMaterial()
+        key_material._state.db = "default"
+
+        self.assertTrue(self.router.allow_relation(config, key_material))
+
+
+@override_settings(LTI_STORE_REPLICA_DATABASE="replica", DATABASE_ROUTERS=[ROUTER])
+class TestPipelineReplicaReads(TestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        super().setUp()
+        ExternalLtiConfiguration.objects.create(name="Primary", slug="test")
+        # Let the replica lag behind the primary.
+        ExternalLtiConfiguration.objects.using("replica").create(
+            name="Replica", slug="test"
+        )
+        configuration_cache.shared.delete(PRIMARY_PIN_KEY)
+        self.filter_step = GetLtiConfigurations(
+            "org.openedx.xblock.lti_consumer.configuration.listed.v1", Mock()
+        )
+
+    def get_name(self):
+        configurations = self.filter_step.run_filter({}, f"{App.name}:test", {})[
+            "configurations"
+        ]
+        return configurations[f"{App.name}:test"]["name"]
+
+    def test_pipeline_reads_from_the_replica(self):
+        with patch.object(
+            LtiStoreReplicaRouter, "is_primary_pinned", return_value=False
+        ):
+            self.assertEqual(self.get_name(), "Replica")
+
+        # Other reads stay on the primary.
+        self.assertEqual(
+            ExternalLtiConfiguration.objects.get(slug="test").name, "Primary"
+        )
+
+    def test_pipeline_reads_from_the_primary_after_a_write(self):
+        config = ExternalLtiConfiguration.objects.get(slug="test")
+        config.name = "Updated"
+        with self.captureOnCommitCallbacks(execute=True):
+            config.save()
+            self.assertIsNone(configuration_cache.shared.get(PRIMARY_PIN_KEY))
+
+        self.assertEqual(self.get_name(), "Updated")
+
+    def test_reads_without_writes_dont_pin_the_primary(self):
+        # The lookup of get_or_create() is routed as a write.
+        with self.captureOnCommitCallbacks(execute=True):
+            ExternalLtiConfiguration.objects.get_or_create(slug="test")
+
+        self.assertIsNone(configuration_cache.shared.get(PRIMARY_PIN_KEY))
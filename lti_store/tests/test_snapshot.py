@@ -0,0 +1,209 @@
+import os
+import stat
+import tempfile
+from io import StringIO
+from unittest import skipIf, skipUnless
+from unittest.mock import Mock, patch
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from lti_store.api import serialize_configuration
+from lti_store.apps import LtiStoreConfig as App
+from lti_store.models import ExternalLtiConfiguration, LTIVersion
+from lti_store.pipelines import GetLtiConfigurations
+from lti_store.snapshot import (
+    FORMAT_MSGPACK,
+    Snapshot,
+    SnapshotError,
+    get_snapshot,
+    msgpack,
+    write_snapshot,
+)
+
+
+class SnapshotTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "snapshot.bin")
+        self.first = ExternalLtiConfiguration.objects.create(
+            name="First", slug="first", lti_1p1_launch_url="http://first"
+        )
+        self.second = ExternalLtiConfiguration.objects.create(
+            name="Second", slug="second", version=LTIVersion.LTI_1P3
+        )
+
+
+class TestSnapshot(SnapshotTestCase):
+    def test_configurations_are_looked_up_by_slug(self):
+        self.assertEqual(write_snapshot(self.path), 2)
+        snapshot = Snapshot(self.path)
+
+        self.assertEqual(len(snapshot), 2)
+        self.assertEqual(snapshot.get("first"), serialize_configuration(self.first))
+        self.assertEqual(snapshot.get("second")["version"], LTIVersion.LTI_1P3)
+        self.assertIsNone(snapshot.get("missing"))
+
+    def test_listings(self):
+        write_snapshot(self.path)
+        snapshot = Snapshot(self.path)
+
+        self.assertEqual([c["slug"] for c in snapshot.all()], ["first", "second"])
+        self.assertEqual(
+            snapshot.summaries(),
+            [
+                {"slug": "first", "name": "First", "version": LTIVersion.LTI_1P1},
+                {"slug": "second", "name": "Second", "version": LTIVersion.LTI_1P3},
+            ],
+        )
+
+    @skipUnless(msgpack, "msgpack is not installed")
+    def test_msgpack_format(self):
+        write_snapshot(self.path, FORMAT_MSGPACK)
+
+        self.assertEqual(
+            Snapshot(self.path).get("first"), serialize_configuration(self.first)
+        )
+
+    @skipIf(msgpack, "msgpack is installed")
+    def test_msgpack_format_requires_msgpack(self):
+        with self.assertRaises(SnapshotError):
+            write_snapshot(self.path, FORMAT_MSGPACK)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), [])
+
+    def test_snapshot_is_only_readable_by_its_owner(self):
+        write_snapshot(self.path)
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+    @override_settings(LTI_STORE_SNAPSHOT_FILE_MODE=0o640)
+    def test_file_mode_setting(self):
+        write_snapshot(self.path)
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o640)
+
+    def test_invalid_files_are_rejected(self):
+        for content in (b"", b"LTISNAP", b"not a snapshot" * 4):
+            with open(self.path, "wb") as snapshot_file:
+                snapshot_file.write(content)
+            with self.assertRaises(SnapshotError):
+                Snapshot(self.path)
+
+
+class TestSnapshotLoader(SnapshotTestCase):
+    def test_no_snapshot_without_path(self):
+        self.assertIsNone(get_snapshot())
+
+    def test_snapshot_is_reloaded_when_replaced(self):
+        write_snapshot(self.path)
+        with override_settings(
+            LTI_STORE_SNAPSHOT_PATH=self.path, LTI_STORE_SNAPSHOT_CHECK_INTERVAL=0
+        ):
+            previous = get_snapshot()
+            self.assertIs(get_snapshot(), previous)
+
+            ExternalLtiConfiguration.objects.filter(slug="first").update(name="Updated")
+            write_snapshot(self.path)
+            current = get_snapshot()
+
+        self.assertEqual(current.get("first")["name"], "Updated")
+        # Readers holding the previous snapshot can still use it.
+        self.assertEqual(previous.get("first")["name"], "First")
+
+    def test_changes_are_checked_at_most_every_interval(self):
+        write_snapshot(self.path)
+        with override_settings(
+            LTI_STORE_SNAPSHOT_PATH=self.path, LTI_STORE_SNAPSHOT_CHECK_INTERVAL=60
+        ):
+            previous = get_snapshot()
+            write_snapshot(self.path)
+
+            with patch("lti_store.snapshot.os.stat") as stat_mock:
+                self.assertIs(get_snapshot(), previous)
+            stat_mock.assert_not_called()
+
+    def test_last_snapshot_is_kept_when_the_file_is_invalid(self):
+        write_snapshot(self.path)
+        with override_settings(
+            LTI_STORE_SNAPSHOT_PATH=self.path, LTI_STORE_SNAPSHOT_CHECK_INTERVAL=0
+        ):
+            previous = get_snapshot()
+            with open(self.path, "wb") as snapshot_file:
+                snapshot_file.write(b"corrupted")
+
+            with self.assertLogs("lti_store.snapshot", "WARNING"):
+                self.assertIs(get_snapshot(), previous)
+
+    def test_missing_file(self):
+        with override_settings(LTI_STORE_SNAPSHOT_PATH=self.path), self.assertLogs(
+            "lti_store.snapshot", "WARNING"
+        ):
+            self.assertIsNone(get_snapshot())
+
+
+class TestPipelineSnapshot(SnapshotTestCase):
+    def setUp(self):
+        super().setUp()
+        write_snapshot(self.path)
+        # The snapshot is served even if the database changed or is unavailable.
+        ExternalLtiConfiguration.objects.all().delete()
+        self.filter_step = GetLtiConfigurations(
+            "org.openedx.xblock.lti_consumer.configuration.listed.v1", Mock()
+        )
+        settings_override = override_settings(LTI_STORE_SNAPSHOT_PATH=self.path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_run_filter_single_configuration(self):
+        with self.assertNumQueries(0):
+            data = self.filter_step.run_filter({}, f"{App.name}:first", {})
+
+        self.assertEqual(
+            data["configurations"],
+            {f"{App.name}:first": serialize_configuration(self.first)},
+        )
+
+    def test_run_filter_listing(self):
+        with self.assertNumQueries(0):
+            data = self.filter_step.run_filter({}, "", {})
+            summaries = self.filter_step.run_filter({"summary": True}, "", {})
+
+        self.assertEqual(len(data["configurations"]), 2)
+        self.assertEqual(
+            summaries["configurations"][f"{App.name}:second"],
+            {"slug": "second", "name": "Second", "version": LTIVersion.LTI_1P3},
+        )
+
+    async def test_arun_filter(self):
+        data = await self.filter_step.arun_filter({}, f"{App.name}:second", {})
+        missing = await self.filter_step.arun_filter({}, f"{App.name}:missing", {})
+
+        self.assertEqual(list(data["configurations"]), [f"{App.name}:second"])
+        self.assertEqual(missing["configurations"], {})
+
+    def test_sync_lookups_read_the_database(self):
+        with self.assertNumQueries(2):
+            data = self.filter_step.run_filter({"since": "2020-01-01T00:00:00"}, "", {})
+
+        self.assertEqual(data["configurations"], {})
+
+
+class TestWriteSnapshotCommand(SnapshotTestCase):
+    def test_snapshot_is_written(self):
+        stdout = StringIO()
+
+        call_command("lti_store_write_snapshot", self.path, stdout=stdout)
+
+        self.assertEqual(
+            stdout.getvalue().strip(), f"Wrote 2 configurations to {self.path}."
+        )
+        self.assertEqual(Snapshot(self.path).get("second")["name"], "Second")
+
+    @skipIf(msgpack, "msgpack is installed")
+    def test_missing_msgpack(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                "lti_store_write_snapshot", self.path, "--format", FORMAT_MSGPACK
+            )
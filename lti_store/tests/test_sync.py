@@ -0,0 +1,199 @@
+from datetime import timedelta
+from unittest.mock import Mock
+
+from Cryptodome.PublicKey import RSA
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from lti_store.api import aget_changes, get_changes, parse_cursor
+from lti_store.apps import LtiStoreConfig as App
+from lti_store.models import (
+    ExternalLtiConfiguration,
+    LtiConfigurationTombstone,
+    LTIVersion,
+)
+from lti_store.pipelines import GetLtiConfigurations
+
+TOOL_KEY = RSA.generate(2048).publickey().export_key().decode()
+
+
+class TestTimestamps(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.config = ExternalLtiConfiguration.objects.create(name="Test", slug="test")
+        self.before = timezone.now()
+
+    def assert_modified(self):
+        self.config.refresh_from_db()
+        self.assertGreaterEqual(self.config.modified, self.before)
+        self.assertLess(self.config.created, self.before)
+
+    def test_timestamps_are_set_on_create(self):
+        self.assertIsNotNone(self.config.created)
+        self.assertLessEqual(self.config.created, self.config.modified)
+
+    def test_save_bumps_modified(self):
+        self.config.description = "Updated"
+        self.config.save(update_fields=["description"])
+
+        self.assert_modified()
+
+    def test_key_material_writes_bump_modified(self):
+        self.config.lti_1p3_tool_public_key = TOOL_KEY
+        self.config.save(update_fields=["lti_1p3_tool_public_key"])
+
+        self.assert_modified()
+
+    def test_bulk_update_bumps_modified(self):
+        self.config.description = "Updated"
+        ExternalLtiConfiguration.objects.bulk_update([self.config], ["description"])
+
+        self.assert_modified()
+
+    def test_update_bumps_modified(self):
+        ExternalLtiConfiguration.objects.filter(slug="test").update(description="New")
+
+        self.assert_modified()
+
+
+class TestTombstones(TestCase):
+    def test_deleted_configurations_are_recorded(self):
+        config = ExternalLtiConfiguration.objects.create(name="Test", slug="test")
+        ExternalLtiConfiguration.objects.create(name="Other", slug="other")
+
+        config.delete()
+        ExternalLtiConfiguration.objects.filter(slug="other").delete()
+
+        self.assertEqual(
+            sorted(LtiConfigurationTombstone.objects.values_list("slug", flat=True)),
+            ["other", "test"],
+        )
+
+    def test_renamed_configurations_are_recorded(self):
+        config = ExternalLtiConfiguration.objects.create(name="Test", slug="test")
+        config = ExternalLtiConfiguration.objects.get(pk=config.pk)
+
+        config.slug = "renamed"
+        config.save()
+        config.save()
+
+        self.assertEqual(
+            list(LtiConfigurationTombstone.objects.values_list("slug", flat=True)),
+            ["test"],
+        )
+
+    def test_recreated_slugs_are_not_reported_as_deleted(self):
+        ExternalLtiConfiguration.objects.create(name="Test", slug="test").delete()
+        since = timezone.now() - timedelta(minutes=1)
+
+        self.assertEqual(
+            list(LtiConfigurationTombstone.objects.deleted_since(since)),
+            list(LtiConfigurationTombstone.objects.all()),
+        )
+        ExternalLtiConfiguration.objects.create(name="Test", slug="test")
+        self.assertFalse(LtiConfigurationTombstone.objects.deleted_since(since))
+
+
+@override_settings(LTI_STORE_SYNC_OVERLAP=0)
+class TestGetChanges(TestCase):
+    def setUp(self):
+        super().setUp()
+        for slug in ("first", "second", "third"):
+            ExternalLtiConfiguration.objects.create(name=slug.title(), slug=slug)
+
+    def test_full_sync_without_cursor(self):
+        changes = get_changes()
+
+        self.assertEqual(
+            [c["slug"] for c in changes["configurations"]],
+            ["first", "second", "third"],
+        )
+        self.assertEqual(changes["deleted"], [])
+        self.assertEqual(parse_cursor(changes["cursor"]).year, timezone.now().year)
+
+    def test_only_changes_after_the_cursor_are_returned(self):
+        cursor = get_changes()["cursor"]
+        ExternalLtiConfiguration.objects.filter(slug="second").update(name="Updated")
+        ExternalLtiConfiguration.objects.create(name="Fourth", slug="fourth")
+        ExternalLtiConfiguration.objects.get(slug="third").delete()
+
+        # The payload cleared by `update()` is rebuilt from the configuration.
+        with self.assertNumQueries(3):
+            changes = get_changes(cursor)
+
+        self.assertEqual(
+            [(c["slug"], c["name"]) for c in changes["configurations"]],
+            [("second", "Updated"), ("fourth", "Fourth")],
+        )
+        self.assertIn("lti_1p3_private_key", changes["configurations"][0])
+        self.assertEqual(changes["deleted"], ["third"])
+        self.assertEqual(get_changes(changes["cursor"])["configurations"], [])
+
+    def test_summaries_of_the_changes(self):
+        cursor = get_changes()["cursor"]
+        ExternalLtiConfiguration.objects.filter(slug="first").update(name="Updated")
+
+        self.assertEqual(
+            get_changes(cursor, summary=True)["configurations"],
+            [{"slug": "first", "name": "Updated", "version": LTIVersion.LTI_1P1}],
+        )
+
+    @override_settings(LTI_STORE_SYNC_OVERLAP=60)
+    def test_cursor_overlaps_the_previous_sync(self):
+        cursor = get_changes()["cursor"]
+
+        self.assertEqual(len(get_changes(cursor)["configurations"]), 3)
+
+    def test_invalid_cursor(self):
+        for cursor in ("yesterday", 42):
+            with self.assertRaises(ValueError):
+                get_changes(cursor)
+
+    async def test_aget_changes(self):
+        cursor = (await aget_changes())["cursor"]
+        await ExternalLtiConfiguration.objects.filter(slug="first").aupdate(
+            name="Updated"
+        )
+        await (await ExternalLtiConfiguration.objects.aget(slug="third")).adelete()
+
+        changes = await aget_changes(cursor)
+
+        self.assertEqual([c["name"] for c in changes["configurations"]], ["Updated"])
+        self.assertEqual(changes["deleted"], ["third"])
+
+
+@override_settings(LTI_STORE_SYNC_OVERLAP=0)
+class TestPipelineSync(TestCase):
+    def setUp(self):
+        super().setUp()
+        ExternalLtiConfiguration.objects.create(name="First", slug="first")
+        ExternalLtiConfiguration.objects.create(name="Second", slug="second")
+        self.filter_step = GetLtiConfigurations(
+            "org.openedx.xblock.lti_consumer.configuration.listed.v1", Mock()
+        )
+
+    def test_run_filter_returns_the_changes_since_the_cursor(self):
+        cursor = self.filter_step.run_filter({}, "", {}, since=get_changes()["cursor"])[
+            "context"
+        ]["lti_store_sync"]["cursor"]
+        ExternalLtiConfiguration.objects.filter(slug="first").update(name="Updated")
+        ExternalLtiConfiguration.objects.get(slug="second").delete()
+
+        data = self.filter_step.run_filter({"since": cursor}, "", {})
+
+        self.assertEqual(list(data["configurations"]), [f"{App.name}:first"])
+        self.assertEqual(
+            data["context"]["lti_store_sync"]["deleted"], [f"{App.name}:second"]
+        )
+        self.assertEqual(data["context"]["since"], cursor)
+
+    async def test_arun_filter_returns_the_changes_since_the_cursor(self):
+        cursor = (await aget_changes())["cursor"]
+        await ExternalLtiConfiguration.objects.filter(slug="second").aupdate(
+            name="Updated"
+        )
+
+        data = await self.filter_step.arun_filter({}, "", {}, since=cursor)
+
+        self.assertEqual(list(data["configurations"]), [f"{App.name}:second"])
+        self.assertEqual(data["context"]["lti_store_sync"]["deleted"], [])
@@ -0,0 +1,132 @@
+import gzip
+import json
+
+from Cryptodome.PublicKey import RSA
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from lti_store.models import ExternalLtiConfiguration, LTIVersion
+
+KEY_OBJ = RSA.generate(2048)
+PRIVATE_KEY = KEY_OBJ.export_key().decode()
+PUBLIC_KEY = KEY_OBJ.publickey().export_key().decode()
+
+
+def create_1p3_config(slug, **fields):
+    return ExternalLtiConfiguration.objects.create(
+        name=slug.title(),
+        slug=slug,
+        version=LTIVersion.LTI_1P3,
+        lti_1p3_private_key=PRIVATE_KEY,
+        lti_1p3_private_key_id=f"{slug}-key",
+        lti_1p3_tool_public_key=PUBLIC_KEY,
+        **fields,
+    )
+
+
+@override_settings(ROOT_URLCONF="lti_store.tests.urls")
+class TestPlatformJwksView(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.config = create_1p3_config("first")
+        self.url = reverse("lti_store:platform-jwks-detail", args=["first"])
+
+    def test_keyset_is_served(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), self.config.lti_1p3_public_jwk)
+        self.assertEqual(response["ETag"], f'"{self.config.lti_1p3_public_jwk_etag}"')
+        self.assertEqual(response["Cache-Control"], "public, max-age=300")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_keyset_is_gzipped_when_accepted(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(
+            json.loads(gzip.decompress(response.content)),
+            self.config.lti_1p3_public_jwk,
+        )
+        self.assertEqual(
+            response["ETag"], f'"{self.config.lti_1p3_public_jwk_etag}-gzip"'
+        )
+        response = self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(LTI_STORE_JWKS_GZIP=False, LTI_STORE_JWKS_MAX_AGE=60)
+    def test_gzip_can_be_disabled(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertFalse(response.has_header("Vary"))
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+
+    def test_keyset_is_served_from_the_cache(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_changes_with_the_keys(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.config.rotate_platform_key()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["keys"]), 3)
+
+    def test_unknown_and_lti_1p1_configurations_are_not_found(self):
+        ExternalLtiConfiguration.objects.create(name="LTI 1.1", slug="lti-1p1")
+
+        for slug in ("unknown", "lti-1p1"):
+            url = reverse("lti_store:platform-jwks-detail", args=[slug])
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_only_safe_methods_are_allowed(self):
+        self.assertEqual(self.client.head(self.url).status_code, 200)
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+
+
+@override_settings(ROOT_URLCONF="lti_store.tests.urls")
+class TestAllPlatformJwksView(TestCase):
+    def setUp(self):
+        super().setUp()
+        create_1p3_config("first")
+        create_1p3_config("second")
+        ExternalLtiConfiguration.objects.create(name="LTI 1.1", slug="lti-1p1")
+        self.url = reverse("lti_store:platform-jwks")
+
+    def test_keys_of_every_configuration_are_served(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(
+            [key["kid"] for key in response.json()["keys"]],
+            ["first-key", "second-key"],
+        )
+
+    def test_etag_changes_when_a_configuration_changes(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        create_1p3_config("third")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["keys"]), 3)
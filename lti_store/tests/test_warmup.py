@@ -0,0 +1,146 @@
+from io import StringIO
+from itertools import chain, repeat
+from unittest.mock import patch
+
+from Cryptodome.PublicKey import RSA
+from django.apps import apps
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+
+from lti_store.api import (
+    get_all_configurations,
+    get_configuration,
+    get_configuration_summaries,
+    get_platform_signing_key,
+)
+from lti_store.apps import WARM_UP_DISPATCH_UID
+from lti_store.cache import configuration_cache
+from lti_store.keys import parsed_key_cache
+from lti_store.models import ExternalLtiConfiguration, LTIVersion
+from lti_store.warmup import warm_up_cache
+
+PLATFORM_KEY = RSA.generate(2048)
+TOOL_KEY = RSA.generate(2048)
+
+
+class TestWarmUpCache(TestCase):
+    def setUp(self):
+        super().setUp()
+        for slug in ("first", "second", "third"):
+            ExternalLtiConfiguration.objects.create(name=slug.title(), slug=slug)
+        configuration_cache.reset()
+
+    def test_configurations_and_listings_are_cached(self):
+        with patch("lti_store.warmup.BATCH_SIZE", 2), self.assertNumQueries(2):
+            result = warm_up_cache()
+
+        self.assertEqual((result.configurations, result.complete), (3, True))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_configuration("second")["name"], "Second")
+            self.assertEqual(len(get_all_configurations()), 3)
+            self.assertEqual(
+                get_configuration_summaries()[0],
+                {"slug": "first", "name": "First", "version": "lti_1p1"},
+            )
+
+    def test_configurations_are_cached_in_the_shared_tier(self):
+        warm_up_cache()
+        configuration_cache.local.clear()
+
+        with self.assertNumQueries(0):
+            get_configuration("first")
+        self.assertEqual(configuration_cache.stats()["shared_hits"], 1)
+
+    def test_warm_up_stops_at_the_limit(self):
+        result = warm_up_cache(limit=2)
+
+        self.assertEqual((result.configurations, result.complete), (2, False))
+        with self.assertNumQueries(0):
+            get_configuration("second")
+        with self.assertNumQueries(1):
+            get_configuration("third")
+        # An incomplete listing is never cached.
+        with self.assertNumQueries(1):
+            get_all_configurations()
+
+    @patch("lti_store.warmup.time.monotonic")
+    def test_warm_up_stops_after_the_time_limit(self, monotonic_mock):
+        # The second batch would start after the time limit.
+        monotonic_mock.side_effect = chain([100, 100], repeat(106))
+
+        with patch("lti_store.warmup.BATCH_SIZE", 1):
+            result = warm_up_cache(time_limit=5)
+
+        self.assertEqual((result.configurations, result.complete), (1, False))
+
+    def test_keys_are_parsed_when_requested(self):
+        ExternalLtiConfiguration.objects.create(
+            name="LTI 1.3",
+            slug="lti-1p3",
+            version=LTIVersion.LTI_1P3,
+            lti_1p3_private_key=PLATFORM_KEY.export_key().decode(),
+            lti_1p3_tool_public_key=TOOL_KEY.publickey().export_key().decode(),
+        )
+        parsed_key_cache.clear()
+
+        self.assertEqual(warm_up_cache(keys=False).keys, 0)
+        self.assertEqual(warm_up_cache(keys=True).keys, 2)
+
+        with patch("lti_store.keys.RSAKey") as rsa_key_mock:
+            get_platform_signing_key("lti-1p3")
+        rsa_key_mock.assert_not_called()
+
+
+class TestWarmUpOnStartup(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.app_config = apps.get_app_config("lti_store")
+        self.addCleanup(request_started.disconnect, dispatch_uid=WARM_UP_DISPATCH_UID)
+
+    @patch("lti_store.warmup.warm_up_cache")
+    def test_cache_is_only_warmed_up_when_enabled(self, warm_up_mock):
+        self.app_config.ready()
+        request_started.send(sender=None)
+        warm_up_mock.assert_not_called()
+
+        with override_settings(LTI_STORE_WARM_UP_ON_STARTUP=True):
+            self.app_config.ready()
+        warm_up_mock.assert_not_called()
+        request_started.send(sender=None)
+        warm_up_mock.assert_called_once_with()
+
+    @patch("lti_store.warmup.warm_up_cache")
+    def test_cache_is_warmed_up_by_the_first_request_only(self, warm_up_mock):
+        with override_settings(LTI_STORE_WARM_UP_ON_STARTUP=True):
+            self.app_config.ready()
+
+        for _ in range(3):
+            request_started.send(sender=None)
+
+        warm_up_mock.assert_called_once_with()
+
+    @patch("lti_store.warmup.warm_up_cache", side_effect=OperationalError)
+    def test_warm_up_errors_do_not_fail_the_request(self, _):
+        with override_settings(LTI_STORE_WARM_UP_ON_STARTUP=True):
+            self.app_config.ready()
+
+        with self.assertLogs("lti_store.apps", "WARNING"):
+            request_started.send(sender=None)
+
+
+class TestWarmCacheCommand(TestCase):
+    def test_configurations_are_loaded(self):
+        ExternalLtiConfiguration.objects.create(name="Test", slug="test")
+        configuration_cache.reset()
+        stdout = StringIO()
+
+        call_command("lti_store_warm_cache", "--limit", "10", stdout=stdout)
+
+        self.assertEqual(
+            stdout.getvalue().strip(),
+            "Loaded 1 configurations and 0 keys into the cache.",
+        )
+        with self.assertNumQueries(0):
+            get_configuration("test")
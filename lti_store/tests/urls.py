@@ -0,0 +1,5 @@
+from django.urls import include, path
+
+urlpatterns = [
+    path("api/lti_store/", include("lti_store.urls")),
+]
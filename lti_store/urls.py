@@ -0,0 +1,14 @@
+"""
+URLs of the LTI store, mounted under `api/lti_store/` in the LMS.
+"""
+
+from django.urls import path
+
+from lti_store import views
+
+app_name = "lti_store"
+
+urlpatterns = [
+    path("jwks/", views.all_platform_jwks, name="platform-jwks"),
+    path("jwks/<slug:slug>/", views.platform_jwks, name="platform-jwks-detail"),
+]
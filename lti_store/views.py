@@ -0,0 +1,122 @@
+"""
+Views publishing the platform public keys of the LTI 1.3 configurations.
+
+Tools poll these keysets, so every response is built from a cached document
+holding the serialized keyset, its gzipped version and the ETag computed when
+the keys changed. A poll answered from the cache costs no query and no
+serialization, and a revalidation with a matching ETag returns 304.
+"""
+
+import gzip
+import hashlib
+import re
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.views.decorators.http import require_safe
+
+from lti_store.cache import ALL_JWKS_KEY, configuration_cache, jwks_key
+from lti_store.keys import serialize_jwks
+from lti_store.models import ExternalLtiKeyMaterial, LTIVersion
+
+DEFAULT_JWKS_MAX_AGE = 300
+
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+@dataclass(frozen=True)
+class JwksDocument:
+    """A serialized JWK keyset, ready to be served."""
+
+    etag: str
+    body: bytes
+    gzipped_body: bytes
+
+    @classmethod
+    def build(cls, jwks, etag):
+        body = serialize_jwks(jwks)
+        return cls(etag=etag, body=body, gzipped_body=gzip.compress(body, mtime=0))
+
+
+def load_jwks_document(slug):
+    """Return the JWKS document of a LTI 1.3 configuration, or None if it doesn't exist."""
+    row = (
+        ExternalLtiKeyMaterial.objects.filter(
+            configuration__slug=slug, configuration__version=LTIVersion.LTI_1P3
+        )
+        .values_list("lti_1p3_public_jwk", "lti_1p3_public_jwk_etag")
+        .first()
+    )
+    if row is None:
+        return None
+    return JwksDocument.build(*row)
+
+
+def load_all_jwks_document():
+    """Return the JWKS document merging the keys of every LTI 1.3 configuration."""
+    rows = (
+        ExternalLtiKeyMaterial.objects.filter(configuration__version=LTIVersion.LTI_1P3)
+        .order_by("configuration__slug")
+        .values_list("lti_1p3_public_jwk", "lti_1p3_public_jwk_etag")
+    )
+    keys = []
+    etag = hashlib.sha256()
+    for public_jwk, public_jwk_etag in rows:
+        keys.extend(public_jwk.get("keys", []))
+        etag.update(public_jwk_etag.encode())
+    return JwksDocument.build({"keys": keys}, etag.hexdigest())
+
+
+def jwks_response(request, document):
+    """
+    Serve a JWKS document, gzipped if enabled and accepted by the client.
+
+    Settings:
+
+        LTI_STORE_JWKS_MAX_AGE: Max age of the keysets in the caches of the tools,
+            in seconds (300).
+        LTI_STORE_JWKS_GZIP: Whether to gzip the keysets for the clients accepting it (True).
+    """
+    gzip_enabled = getattr(settings, "LTI_STORE_JWKS_GZIP", True)
+    if gzip_enabled and ACCEPTS_GZIP.search(
+        request.META.get("HTTP_ACCEPT_ENCODING", "")
+    ):
+        # Each encoding is a different representation, with its own strong ETag.
+        response = HttpResponse(document.gzipped_body, content_type="application/json")
+        response["Content-Encoding"] = "gzip"
+        etag = f'"{document.etag}-gzip"'
+    else:
+        response = HttpResponse(document.body, content_type="application/json")
+        etag = f'"{document.etag}"'
+
+    response["ETag"] = etag
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=getattr(settings, "LTI_STORE_JWKS_MAX_AGE", DEFAULT_JWKS_MAX_AGE),
+    )
+    if gzip_enabled:
+        patch_vary_headers(response, ("Accept-Encoding",))
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+@require_safe
+def platform_jwks(request, slug):
+    """Serve the platform public keys of a LTI 1.3 configuration."""
+    document = configuration_cache.get(jwks_key(slug), lambda: load_jwks_document(slug))
+    if document is None:
+        raise Http404
+    return jwks_response(request, document)
+
+
+@require_safe
+def all_platform_jwks(request):
+    """Serve the platform public keys of every LTI 1.3 configuration."""
+    document = configuration_cache.get(ALL_JWKS_KEY, load_all_jwks_document)
+    return jwks_response(request, document)
@@ -0,0 +1,127 @@
+"""
+Warm-up of the configuration cache.
+
+Loads the serialized configurations, and optionally their parsed keys, into
+the cache tiers, so the first requests served after a deploy don't all miss at
+once. The warm-up is bounded in number of configurations and in time, so a huge
+table can't stall the boot of a worker.
+
+Settings:
+    LTI_STORE_WARM_UP_ON_STARTUP: Warm the cache up on the first request served
+        by every process (False).
+    LTI_STORE_WARM_UP_LIMIT: Maximum number of configurations loaded (1000).
+    LTI_STORE_WARM_UP_TIME_LIMIT: Time after which no more batches are loaded,
+        in seconds (5).
+    LTI_STORE_WARM_UP_KEYS: Also parse and cache the LTI 1.3 keys (False).
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from lti_store.api import (
+    SUMMARY_FIELDS,
+    get_platform_signing_key,
+    get_tool_public_key,
+    load_records,
+)
+from lti_store.cache import (
+    ALL_CONFIGURATIONS_KEY,
+    SUMMARIES_KEY,
+    configuration_cache,
+    configuration_key,
+)
+from lti_store.models import ExternalLtiConfiguration, LTIVersion
+from lti_store.records import ConfigurationRecord
+
+log = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+
+DEFAULT_WARM_UP_LIMIT = 1000
+DEFAULT_WARM_UP_TIME_LIMIT = 5
+
+
+@dataclass
+class WarmUpResult:
+    """Outcome of a cache warm-up."""
+
+    configurations: int = 0
+    keys: int = 0
+    # Whether every configuration was loaded, within the limits.
+    complete: bool = False
+
+
+def warm_up_cache(limit=None, time_limit=None, keys=None):
+    """
+    Load the serialized configurations into the cache tiers, in batches.
+
+    Stops after `limit` configurations, or before the first batch starting
+    after `time_limit` seconds. When every configuration was loaded, the
+    listings are cached too. Arguments left to None are read from the settings.
+    """
+    if limit is None:
+        limit = getattr(settings, "LTI_STORE_WARM_UP_LIMIT", DEFAULT_WARM_UP_LIMIT)
+    if time_limit is None:
+        time_limit = getattr(
+            settings, "LTI_STORE_WARM_UP_TIME_LIMIT", DEFAULT_WARM_UP_TIME_LIMIT
+        )
+    if keys is None:
+        keys = getattr(settings, "LTI_STORE_WARM_UP_KEYS", False)
+
+    deadline = time.monotonic() + time_limit
+    result = WarmUpResult()
+    serialized = []
+    last_pk = 0
+    while result.configurations < limit and time.monotonic() < deadline:
+        batch_size = min(BATCH_SIZE, limit - result.configurations)
+        config_objs = ExternalLtiConfiguration.objects.filter(pk__gt=last_pk)
+        batch = load_records(config_objs.order_by("pk")[:batch_size])
+        values = configuration_cache.fill(
+            lambda: {  # pylint: disable=cell-var-from-loop
+                configuration_key(record["slug"]): record for record in batch
+            }
+        )
+        serialized.extend(values.values())
+        result.configurations += len(batch)
+        if len(batch) < batch_size:
+            result.complete = True
+            break
+        last_pk = batch[-1]["id"]
+
+    if result.complete:
+        configuration_cache.fill(
+            lambda: {
+                ALL_CONFIGURATIONS_KEY: serialized,
+                SUMMARIES_KEY: [
+                    ConfigurationRecord(
+                        (field, config[field]) for field in SUMMARY_FIELDS
+                    )
+                    for config in serialized
+                ],
+            }
+        )
+    if keys:
+        result.keys = _warm_up_keys(serialized, deadline)
+    return result
+
+
+def _warm_up_keys(configs, deadline):
+    parsed = 0
+    for config in configs:
+        if time.monotonic() >= deadline:
+            break
+        if config["version"] != LTIVersion.LTI_1P3:
+            continue
+        try:
+            parsed += get_platform_signing_key(config["slug"]) is not None
+            # Keysets published by the tools are only fetched on demand.
+            if config["lti_1p3_tool_public_key"]:
+                parsed += get_tool_public_key(config["slug"]) is not None
+        except Exception:  # pylint: disable=broad-except
+            log.warning(
+                "Could not parse the keys of %r.", config["slug"], exc_info=True
+            )
+    return parsed
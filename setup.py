@@ -148,6 +148,7 @@ setup(
     ),
     include_package_data=True,
     install_requires=load_requirements(Path('requirements/base.in')),
+    extras_require={"msgpack": ["msgpack"], "orjson": ["orjson"]},
     options={'bdist_wheel': {'universal': True}},
     python_requires=">=3.11",
     license="AGPL 3.0",
@@ -1,10 +1,45 @@
 DEBUG = True
 
+SECRET_KEY = 'insecure-test-key'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': 'testdb.sqlite',
-    }
+    },
+    # Replica used by the tests of lti_store.routers.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': 'testdb_replica.sqlite',
+    },
 }
 
-INSTALLED_APPS = ["lti_store"]
+INSTALLED_APPS = [
+    # Required by the tests of lti_store.admin.
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.messages',
+    'django.contrib.sessions',
+    'lti_store',
+]
+
+MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+]
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]